@@ -0,0 +1,198 @@
+"""
+Backtests SingleByDeltaStrategy and SpreadsByDeltaStrategy over a year of synthetic 1-minute SPX put chains, the
+strategies running on a simulated clock. Reports how long generating the history and each backtest took, how many
+simulated minutes ran per second, and each backtest's P&L, drawdown and fills.
+
+Usage:
+
+    python -m benchmarks.bench_backtest [trading days] [strategies]
+"""
+
+import datetime as dt
+import logging
+import math
+import sys
+import time
+
+import numpy as np
+from basetypes.Backtest.backtestEngine import Backtest
+from basetypes.Backtest.chainHistory import (
+    COLUMNS,
+    PUT,
+    ChainHistory,
+    HistoricalMarket,
+    epoch_days,
+)
+from basetypes.Broker.simulatedMarket import EASTERN, TICK, expiration_close
+from basetypes.Strategy import helpers
+from basetypes.Strategy.singlebydeltastrategy import SingleByDeltaStrategy
+from basetypes.Strategy.spreadsbydeltastrategy import SpreadsByDeltaStrategy
+from scipy.special import ndtr
+
+SYMBOL = "$SPX.X"
+FIRST_DAY = dt.date(2022, 1, 3)
+MINUTES_PER_DAY = 390
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+
+
+def trading_days(count: int) -> list[dt.date]:
+    days = []
+    day = FIRST_DAY
+
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day += dt.timedelta(days=1)
+
+    return days
+
+
+def synthetic_history(
+    days: int,
+    price: float = 4500.0,
+    volatility: float = 0.18,
+    skew: float = 0.6,
+    strikes: int = 40,
+    step: float = 5.0,
+    seed: int = 0,
+) -> ChainHistory:
+    """A minute by minute random walk, with the puts below the price for every weekday expiring within a week."""
+    rng = np.random.default_rng(seed)
+    columns: dict[str, list] = {
+        column: []
+        for column in (
+            "times",
+            "underlying",
+            "putcall",
+            "expiration",
+            "strike",
+            "bid",
+            "ask",
+            "delta",
+        )
+    }
+    counts = []
+    minute_years = 60 / SECONDS_PER_YEAR
+
+    for day in trading_days(days):
+        opening = dt.datetime.combine(day, dt.time(9, 30), EASTERN).timestamp()
+        times = opening + 60 * np.arange(MINUTES_PER_DAY)
+        returns = (
+            volatility * math.sqrt(minute_years) * rng.standard_normal(MINUTES_PER_DAY)
+        )
+        prices = price * np.exp(np.cumsum(returns))
+        price = float(prices[-1])
+
+        expirations = [
+            day + dt.timedelta(days=offset)
+            for offset in range(7)
+            if (day + dt.timedelta(days=offset)).weekday() < 5
+        ]
+        closes = np.array([expiration_close(e).timestamp() for e in expirations])
+
+        # Minutes x expirations x strikes
+        years = np.maximum(closes[None, :] - times[:, None], 60)[:, :, None] / (
+            SECONDS_PER_YEAR
+        )
+        tops = np.floor(prices / step) * step
+        grid = tops[:, None] - step * np.arange(strikes)[::-1][None, :]
+        underlying = prices[:, None, None]
+        strike = np.broadcast_to(grid[:, None, :], years.shape[:2] + (strikes,))
+        vols = volatility + skew * ((strike - underlying) / underlying) ** 2
+
+        mids = helpers.black_price(underlying, strike, 0.0, years, True, vols)
+        half_spread = np.maximum(mids * 0.01, TICK / 2)
+        bids = np.maximum(np.floor((mids - half_spread) / TICK) * TICK, 0.0)
+        asks = np.maximum(np.ceil((mids + half_spread) / TICK) * TICK, TICK)
+        d1 = (np.log(underlying / strike) + 0.5 * vols ** 2 * years) / (
+            vols * np.sqrt(years)
+        )
+
+        shape = strike.shape
+        columns["times"].append(times.astype(np.int64))
+        columns["underlying"].append(prices)
+        columns["putcall"].append(np.full(shape, PUT, dtype=np.int8).ravel())
+        columns["expiration"].append(
+            np.broadcast_to(
+                np.array([epoch_days(e) for e in expirations], dtype=np.int32)[
+                    None, :, None
+                ],
+                shape,
+            ).ravel()
+        )
+        columns["strike"].append(strike.ravel())
+        columns["bid"].append(np.round(bids, 2).ravel())
+        columns["ask"].append(np.round(asks, 2).ravel())
+        columns["delta"].append((ndtr(d1) - 1).ravel())
+        counts.append(np.full(MINUTES_PER_DAY, shape[1] * shape[2]))
+
+    return ChainHistory(
+        SYMBOL,
+        times=np.concatenate(columns["times"]),
+        underlying=np.concatenate(columns["underlying"]),
+        volatility=np.full(days * MINUTES_PER_DAY, volatility * 100),
+        offsets=np.concatenate([[0], np.cumsum(np.concatenate(counts))]),
+        **{
+            column: np.concatenate(columns[column])
+            for column in ("putcall", "expiration", "strike", "bid", "ask", "delta")
+        },
+    )
+
+
+def run(days: int, names: list[str]) -> None:
+    logging.getLogger("autotrader").setLevel(logging.ERROR)
+
+    began = time.perf_counter()
+    history = synthetic_history(days)
+    print(
+        "{} snapshots, {:.1f}M contract rows, {:.0f} MB, generated in {:.1f}s".format(
+            len(history),
+            len(history.strike) / 1e6,
+            sum(getattr(history, column).nbytes for column in COLUMNS) / 1e6,
+            time.perf_counter() - began,
+        )
+    )
+
+    start = dt.datetime.combine(FIRST_DAY, dt.time(), dt.timezone.utc)
+    end = dt.datetime.combine(trading_days(days)[-1], dt.time(23), dt.timezone.utc)
+    strategies = {
+        "single": lambda: SingleByDeltaStrategy(strategy_name="single"),
+        "spreads": lambda: SpreadsByDeltaStrategy(strategy_name="spreads"),
+    }
+
+    print(
+        "{:<8} {:>10} {:>12} {:>10} {:>10} {:>10} {:>8} {:>8}".format(
+            "",
+            "seconds",
+            "minutes/s",
+            "P&L",
+            "drawdown",
+            "placed",
+            "filled",
+            "loops",
+        )
+    )
+
+    for name in names:
+        report = Backtest(
+            [strategies[name]()], HistoricalMarket({SYMBOL: history}), start, end
+        ).run()
+        print(
+            "{:<8} {:>10.1f} {:>12.0f} {:>10.0f} {:>10.0f} {:>10} {:>8} {:>8}".format(
+                name,
+                report.elapsed_seconds,
+                (end - start).total_seconds() / 60 / report.elapsed_seconds,
+                report.profit,
+                report.drawdown()[0],
+                report.fills.placed,
+                report.fills.filled,
+                report.loops,
+            )
+        )
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 252,
+        sys.argv[2].split(",") if len(sys.argv) > 2 else ["single", "spreads"],
+    )
@@ -0,0 +1,62 @@
+"""
+Compares the scalar py_vollib delta path SingleByDeltaStrategy used per strike against the vectorized
+helpers.calculate_delta_vectorized, on a synthetic 500-strike SPX put chain.
+
+Usage:
+
+    python -m benchmarks.bench_greeks [strikes]
+"""
+
+import sys
+import time
+import warnings
+
+import numpy as np
+from basetypes.Strategy import helpers
+
+UNDERLYING = 4500.0
+RATE = 0.02
+DTE = 30.0
+
+
+def build_chain(count: int):
+    """Puts priced off a volatility smile, rounded to cents like a real quote, worthless strikes dropped."""
+    strikes = np.linspace(4000.0, 4700.0, count)
+    vols = 0.15 + 0.6 * ((strikes - UNDERLYING) / UNDERLYING) ** 2
+    prices = helpers.black_price(UNDERLYING, strikes, RATE, DTE / 365, True, vols)
+    prices = np.round(prices, 2)
+    priced = prices >= 0.05
+
+    return strikes[priced], prices[priced]
+
+
+def run(count: int) -> None:
+    strikes, prices = build_chain(count)
+
+    start = time.perf_counter()
+    scalar = [
+        helpers.calculate_delta(UNDERLYING, strike, RATE, DTE, "PUT", None, price)
+        for strike, price in zip(strikes, prices)
+    ]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = helpers.calculate_delta_vectorized(
+        UNDERLYING, strikes, RATE, DTE, "PUT", None, prices
+    )
+    vectorized_seconds = time.perf_counter() - start
+
+    print("strikes:           {:>10}".format(len(strikes)))
+    print("scalar py_vollib:  {:>10.2f} ms".format(scalar_seconds * 1000))
+    print("vectorized numpy:  {:>10.2f} ms".format(vectorized_seconds * 1000))
+    print("speedup:           {:>10.1f}x".format(scalar_seconds / vectorized_seconds))
+    print(
+        "max delta diff:    {:>10.2e}".format(
+            np.max(np.abs(np.array(scalar) - vectorized))
+        )
+    )
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore", DeprecationWarning)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,116 @@
+"""
+Compares the legacy dict-of-Strike option chain against the array-backed ColumnarExpirationDate on a synthetic full
+SPX put chain: translation time, memory held, and the time to scan every expiration for strikes in a delta range.
+
+Usage:
+
+    python -m benchmarks.bench_option_chain [expirations] [strikes]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from basetypes.Broker.tdaBroker import TdaBroker
+
+
+def build_raw_chain(expirations: int, strikes: int) -> dict:
+    """A TDA putExpDateMap with PM-settled contracts every 5 points around 4500."""
+    chain = {}
+
+    for days in range(1, expirations + 1):
+        key = "2022-{:02d}-{:02d}:{}".format(1 + days // 28, 1 + days % 28, days)
+        chain[key] = {}
+
+        for index in range(strikes):
+            strike = 4500.0 - 5 * (strikes // 2) + 5 * index
+            moneyness = (strike - 4500.0) / 4500.0
+            chain[key]["{:.1f}".format(strike)] = [
+                {
+                    "strikePrice": strike,
+                    "multiplier": 100.0,
+                    "bid": max(0.05, 50 + 600 * moneyness),
+                    "ask": max(0.1, 51 + 600 * moneyness),
+                    "delta": -min(0.99, max(0.001, 0.5 + 5 * moneyness)),
+                    "gamma": 0.001,
+                    "theta": -1.5,
+                    "vega": 2.5,
+                    "rho": -0.1,
+                    "symbol": "SPXW_{}P{}".format(key[:10], int(strike)),
+                    "description": "SPXW {} {} Put (Weekly)".format(key[:10], strike),
+                    "putCall": "PUT",
+                    "settlementType": "P",
+                    "expirationType": "W",
+                }
+            ]
+
+    return chain
+
+
+def measure(translate, raw: dict):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    chain = translate(raw)
+    seconds = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return chain, seconds, size
+
+
+def run(expirations: int, strikes: int) -> None:
+    raw = build_raw_chain(expirations, strikes)
+
+    legacy, legacy_seconds, legacy_bytes = measure(
+        TdaBroker.translate_option_chain, raw
+    )
+    columnar, columnar_seconds, columnar_bytes = measure(
+        TdaBroker.translate_option_chain_columnar, raw
+    )
+
+    # Scan: every strike with -0.10 <= delta <= -0.05, per expiration
+    start = time.perf_counter()
+    legacy_hits = sum(
+        1
+        for expiry in legacy
+        for details in expiry.strikes.values()
+        if -0.10 <= details.delta <= -0.05
+    )
+    legacy_scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columnar_hits = sum(
+        int(np.count_nonzero((expiry.delta >= -0.10) & (expiry.delta <= -0.05)))
+        for expiry in columnar
+    )
+    columnar_scan = time.perf_counter() - start
+
+    assert legacy_hits == columnar_hits
+
+    print("contracts:       {:>10}".format(expirations * strikes))
+    print("                 {:>10} {:>10}".format("legacy", "columnar"))
+    print(
+        "translate (ms):  {:>10.1f} {:>10.1f}".format(
+            legacy_seconds * 1000, columnar_seconds * 1000
+        )
+    )
+    print(
+        "memory (KiB):    {:>10.0f} {:>10.0f}".format(
+            legacy_bytes / 1024, columnar_bytes / 1024
+        )
+    )
+    print(
+        "delta scan (ms): {:>10.2f} {:>10.2f}".format(
+            legacy_scan * 1000, columnar_scan * 1000
+        )
+    )
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 40,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 400,
+    )
@@ -0,0 +1,135 @@
+"""
+Compares writing order updates with session.merge on every order, leg and activity (the old update_order behavior)
+against ormDatabase's bulk INSERT ... ON CONFLICT DO UPDATE path, on orders with several legs and activities, one
+order per transaction and in a single batch.
+
+Usage:
+
+    python -m benchmarks.bench_order_upsert [orders] [legs]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Database.ormDatabase import ormDatabase
+
+
+def build_order(legs: int) -> baseModels.Order:
+    order = baseModels.Order()
+    order.strategy_id = 1
+    order.order_id = 1
+    order.price = 1.1
+    order.status = "WORKING"
+    order.legs = []
+    order.activities = []
+
+    for leg_id in range(legs):
+        leg = baseModels.OrderLeg()
+        leg.leg_id = leg_id
+        leg.symbol = "SPX"
+        leg.quantity = 1
+        order.legs.append(leg)
+
+        activity = baseModels.OrderActivity()
+        activity.activity_type = "EXECUTION"
+        activity.quantity = 1
+        activity.execution_legs = []
+        order.activities.append(activity)
+
+        for _ in range(2):
+            execution_leg = baseModels.ExecutionLeg()
+            execution_leg.leg_id = leg_id
+            execution_leg.price = 1.1
+            activity.execution_legs.append(execution_leg)
+
+    return order
+
+
+def merge_orders(db: ormDatabase, orders: list[baseModels.Order]) -> None:
+    """The old update_order, merging the order, its legs and its activities."""
+    session = db.session_factory()
+
+    try:
+        for order in orders:
+            session.merge(order)
+
+            for leg in order.legs:
+                session.merge(leg)
+
+            for activity in order.activities:
+                session.merge(activity)
+
+        session.commit()
+    finally:
+        db.session_factory.remove()
+
+
+def mark_filled(orders: list[baseModels.Order], price: float) -> None:
+    for order in orders:
+        order.status = "FILLED"
+        order.price = price
+
+
+def measure(db: ormDatabase, count: int, legs: int, merge: bool) -> dict[str, float]:
+    orders = [build_order(legs) for _ in range(count)]
+    db.write_orders([baseRR.CreateDatabaseOrderRequest(order) for order in orders])
+
+    def write(batch):
+        if merge:
+            merge_orders(db, batch)
+        else:
+            db.upsert_orders(batch)
+
+    results = {}
+
+    mark_filled(orders, 1.2)
+    start = time.perf_counter()
+    for order in orders:
+        write([order])
+    results["one per commit"] = count / (time.perf_counter() - start)
+
+    mark_filled(orders, 1.3)
+    start = time.perf_counter()
+    write(orders)
+    results["one batch"] = count / (time.perf_counter() - start)
+
+    return results
+
+
+def run(count: int, legs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        old = ormDatabase(os.path.join(tmp, "merge.db"))
+        merged = measure(old, count, legs, merge=True)
+        old.close()
+
+        new = ormDatabase(os.path.join(tmp, "upsert.db"))
+        upserted = measure(new, count, legs, merge=False)
+        new.close()
+
+    print(
+        "{} orders, {} legs and {} activities with 2 execution legs each".format(
+            count, legs, legs
+        )
+    )
+    print(
+        "{:<16} {:>16} {:>16} {:>9}".format(
+            "", "merge orders/s", "upsert orders/s", "speedup"
+        )
+    )
+    for name in merged:
+        print(
+            "{:<16} {:>16.1f} {:>16.1f} {:>8.2f}x".format(
+                name, merged[name], upserted[name], upserted[name] / merged[name]
+            )
+        )
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+    )
@@ -0,0 +1,110 @@
+"""
+Compares ormDatabase operations/second when building an engine and session factory per call (the old behavior)
+against the long-lived, pooled engine and scoped session factory, for order creates, updates and active order reads.
+
+Usage:
+
+    python -m benchmarks.bench_orm_database [operations]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from typing import Callable
+
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Database.ormDatabase import ormDatabase
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+
+def build_order(strategy_id: int, status: str) -> baseModels.Order:
+    order = baseModels.Order()
+    order.strategy_id = strategy_id
+    order.order_id = 1
+    order.price = 1.1
+    order.status = status
+    order.legs = []
+    order.activities = []
+
+    return order
+
+
+def per_call_engine(db: ormDatabase, operation: Callable) -> Callable:
+    """Wraps an operation so it creates and disposes its own engine, like every method used to."""
+
+    def call(request):
+        db.engine = create_engine(db.connection_string)
+        db.session_factory = scoped_session(
+            sessionmaker(bind=db.engine, expire_on_commit=False)
+        )
+
+        try:
+            return operation(request)
+        finally:
+            db.session_factory.remove()
+            db.engine.dispose()
+
+    return call
+
+
+def measure(db: ormDatabase, operations: int, per_call: bool) -> dict[str, float]:
+    """Runs creates, then updates of the created orders, then reads, returning operations/second for each."""
+    create, update, read = db.create_order, db.update_order, db.read_active_orders
+
+    if per_call:
+        create = per_call_engine(db, create)
+        update = per_call_engine(db, update)
+        read = per_call_engine(db, read)
+
+    results = {}
+    ids = []
+
+    start = time.perf_counter()
+    for _ in range(operations):
+        response = create(baseRR.CreateDatabaseOrderRequest(build_order(1, "WORKING")))
+        ids.append(response.id)
+    results["create"] = operations / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for id in ids:
+        order = build_order(1, "WORKING")
+        order.id = id
+        order.price = 1.2
+        update(baseRR.UpdateDatabaseOrderRequest(order))
+    results["update"] = operations / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(operations):
+        read(baseRR.ReadOpenDatabaseOrdersRequest(1))
+    results["read"] = operations / (time.perf_counter() - start)
+
+    return results
+
+
+def run(operations: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        old = ormDatabase(os.path.join(tmp, "percall.db"))
+        per_call = measure(old, operations, per_call=True)
+
+        new = ormDatabase(os.path.join(tmp, "pooled.db"))
+        pooled = measure(new, operations, per_call=False)
+        new.close()
+
+    print(
+        "{:<8} {:>16} {:>16} {:>9}".format(
+            "", "per-call ops/s", "pooled ops/s", "speedup"
+        )
+    )
+    for name in per_call:
+        print(
+            "{:<8} {:>16.1f} {:>16.1f} {:>8.2f}x".format(
+                name, per_call[name], pooled[name], pooled[name] / per_call[name]
+            )
+        )
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
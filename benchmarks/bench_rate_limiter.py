@@ -0,0 +1,96 @@
+"""
+Saturates a RateLimiter with polling threads, strategies reading chains and accounts plus Telegram /balances, while
+one thread places orders, then reports how long the orders waited for a token. Compares a single FIFO queue, every
+call at the same priority, against prioritized order entry.
+
+Usage:
+
+    python -m benchmarks.bench_rate_limiter [pollers] [seconds] [requests per second]
+"""
+
+import statistics
+import sys
+import threading
+import time
+
+from basetypes.Broker.rateLimiter import (
+    PRIORITY_ORDER_ENTRY,
+    PRIORITY_POLLING,
+    RateLimiter,
+)
+
+ORDER_INTERVAL_SECONDS = 0.25
+
+
+def measure(
+    pollers: int, seconds: float, rate: float, prioritized: bool
+) -> tuple[list[float], list[float]]:
+    """Runs the load for a while, returning the order waits and the poll waits."""
+    limiter = RateLimiter(rate, 1.0)
+    deadline = time.monotonic() + seconds
+    order_waits: list[float] = []
+    poll_waits: list[float] = []
+    lock = threading.Lock()
+
+    def poll() -> None:
+        while time.monotonic() < deadline:
+            waited = limiter.acquire(PRIORITY_POLLING)
+            with lock:
+                poll_waits.append(waited)
+
+    def place() -> None:
+        priority = PRIORITY_ORDER_ENTRY if prioritized else PRIORITY_POLLING
+
+        while time.monotonic() < deadline:
+            order_waits.append(limiter.acquire(priority))
+            time.sleep(ORDER_INTERVAL_SECONDS)
+
+    threads = [threading.Thread(target=poll) for _ in range(pollers)]
+    threads.append(threading.Thread(target=place))
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return order_waits, poll_waits
+
+
+def percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent))]
+
+
+def run(pollers: int, seconds: float, rate: float) -> None:
+    print(
+        "{} polling threads, {:.0f} requests/s budget, an order every {}s for {:.0f}s".format(
+            pollers, rate, ORDER_INTERVAL_SECONDS, seconds
+        )
+    )
+    print(
+        "{:<12} {:>8} {:>14} {:>14} {:>14} {:>14}".format(
+            "", "orders", "order p50 ms", "order p95 ms", "order max ms", "poll mean ms"
+        )
+    )
+
+    for name, prioritized in (("fifo", False), ("prioritized", True)):
+        order_waits, poll_waits = measure(pollers, seconds, rate, prioritized)
+        print(
+            "{:<12} {:>8} {:>14.1f} {:>14.1f} {:>14.1f} {:>14.1f}".format(
+                name,
+                len(order_waits),
+                percentile(order_waits, 0.5) * 1000,
+                percentile(order_waits, 0.95) * 1000,
+                max(order_waits) * 1000,
+                statistics.mean(poll_waits) * 1000,
+            )
+        )
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 3.0,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 20.0,
+    )
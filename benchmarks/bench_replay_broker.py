@@ -0,0 +1,128 @@
+"""
+Records a simulated session through RecordingBroker, strategies reading option chains, placing orders and polling
+them, then replays the journal through ReplayBroker with no delays. Reports the journal's size against the pickled
+responses it holds, what recording adds to each call, and how fast a replay answers.
+
+Usage:
+
+    python -m benchmarks.bench_replay_broker [strategies] [minutes]
+"""
+
+import datetime as dt
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Broker.abstractBroker import Broker
+from basetypes.Broker.brokerJournal import read_journal
+from basetypes.Broker.recordingBroker import RecordingBroker
+from basetypes.Broker.replayBroker import ReplayBroker
+from basetypes.Broker.simulatedBroker import SimulatedBroker
+from basetypes.Broker.simulatedMarket import SyntheticMarket
+
+from benchmarks.bench_simulated_broker import START, build_order
+
+
+def session(broker: Broker, clock: SimpleNamespace, strategies: int, minutes: int):
+    """Runs the session, returning the calls made and the seconds spent in the broker."""
+    expiration = START.date() + dt.timedelta(days=4)
+    chain_request = baseRR.GetOptionChainRequestMessage(
+        1, "SPX", "PUT", True, "ALL", expiration, expiration
+    )
+    calls = 0
+    elapsed = 0.0
+
+    for minute in range(minutes):
+        clock.now = START + dt.timedelta(minutes=minute)
+
+        for strategy in range(strategies):
+            began = time.perf_counter()
+            chain = broker.get_option_chain(chain_request)
+            puts = list(chain.putexpdatemap[0].strikes.values())
+            contract = puts[(strategy * 7 + minute) % len(puts)]
+            placed = broker.place_order(
+                build_order(
+                    contract.symbol, round((contract.bid + contract.ask) / 2, 2)
+                )
+            )
+            broker.get_order(baseRR.GetOrderRequestMessage(strategy, placed.order_id))
+            elapsed += time.perf_counter() - began
+            calls += 3
+
+    return calls, elapsed
+
+
+def build_simulated(clock: SimpleNamespace) -> SimulatedBroker:
+    return SimulatedBroker(
+        "paper",
+        market=SyntheticMarket({"SPX": 4500.0}),
+        clock=lambda: clock.now,
+        fill_latency_seconds=30.0,
+    )
+
+
+def run(strategies: int, minutes: int) -> None:
+    mediator = SimpleNamespace(killswitch=False)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.journal.gz")
+
+        clock = SimpleNamespace(now=START)
+        live = build_simulated(clock)
+        live.mediator = mediator
+        calls, live_seconds = session(live, clock, strategies, minutes)
+
+        clock = SimpleNamespace(now=START)
+        recording = RecordingBroker(build_simulated(clock), path)
+        recording.mediator = mediator
+        _, recording_seconds = session(recording, clock, strategies, minutes)
+        recording.close()
+
+        journal_bytes = os.path.getsize(path)
+        pickled_bytes = sum(
+            len(record.request) + len(record.response) for record in read_journal(path)
+        )
+
+        began = time.perf_counter()
+        replay = ReplayBroker("paper", path, speed=0.0)
+        load_seconds = time.perf_counter() - began
+        replay.mediator = mediator
+        _, replay_seconds = session(
+            replay, SimpleNamespace(now=START), strategies, minutes
+        )
+
+    print(
+        "{} calls, journal {:.1f} MB, {:.1f} MB pickled ({:.1f}x compression), loaded in {:.2f}s".format(
+            calls,
+            journal_bytes / 1e6,
+            pickled_bytes / 1e6,
+            pickled_bytes / journal_bytes,
+            load_seconds,
+        )
+    )
+    print("{:<10} {:>12} {:>14}".format("", "calls/s", "us per call"))
+    for name, seconds in (
+        ("simulated", live_seconds),
+        ("recording", recording_seconds),
+        ("replay", replay_seconds),
+    ):
+        print(
+            "{:<10} {:>12.1f} {:>14.1f}".format(
+                name, calls / seconds, seconds / calls * 1e6
+            )
+        )
+    print(
+        "replay: {} exact, {} fallback, {} missing".format(
+            replay.stats.exact, replay.stats.fallback, replay.stats.missing
+        )
+    )
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 30,
+    )
@@ -0,0 +1,124 @@
+"""
+Measures how fast SimulatedBroker runs many strategies against one simulated account on an accelerated clock. Every
+simulated minute each strategy reads a columnar option chain, places a limit order at the mid and polls its working
+orders, the way SingleByDeltaStrategy does. Reports broker calls per second and how much faster than real time the
+session ran.
+
+Usage:
+
+    python -m benchmarks.bench_simulated_broker [strategies] [minutes]
+"""
+
+import datetime as dt
+import sys
+import time
+from types import SimpleNamespace
+
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Broker.simulatedBroker import SimulatedBroker
+from basetypes.Broker.simulatedMarket import SyntheticMarket
+
+# A Monday at the open
+START = dt.datetime(2022, 1, 10, 14, 30, tzinfo=dt.timezone.utc)
+
+
+def build_order(symbol: str, price: float) -> baseRR.PlaceOrderRequestMessage:
+    leg = baseModels.OrderLeg()
+    leg.symbol = symbol
+    leg.instruction = "SELL_TO_OPEN"
+    leg.asset_type = "OPTION"
+    leg.quantity = 1
+
+    request = baseRR.PlaceOrderRequestMessage()
+    request.order = baseModels.Order()
+    request.order.order_strategy_type = "SINGLE"
+    request.order.order_type = "LIMIT"
+    request.order.session = "NORMAL"
+    request.order.duration = "GOOD_TILL_CANCEL"
+    request.order.quantity = 1
+    request.order.price = price
+    request.order.legs = [leg]
+
+    return request
+
+
+def run(strategies: int, minutes: int) -> None:
+    clock = SimpleNamespace(now=START)
+    broker = SimulatedBroker(
+        "paper",
+        market=SyntheticMarket({"SPX": 4500.0}),
+        clock=lambda: clock.now,
+        fill_latency_seconds=30.0,
+        fill_probability=0.5,
+    )
+    broker.mediator = SimpleNamespace(killswitch=False)
+
+    expiration = START.date() + dt.timedelta(days=4)
+    chain_request = baseRR.GetOptionChainRequestMessage(
+        1, "SPX", "PUT", True, "ALL", expiration, expiration, columnar=True
+    )
+    order_ids: dict[int, list[int]] = {strategy: [] for strategy in range(strategies)}
+    calls = {"chains": 0, "orders": 0, "polls": 0}
+    timings = {name: 0.0 for name in calls}
+
+    start = time.perf_counter()
+    for minute in range(minutes):
+        clock.now = START + dt.timedelta(minutes=minute)
+
+        for strategy in range(strategies):
+            began = time.perf_counter()
+            chain = broker.get_option_chain(chain_request)
+            timings["chains"] += time.perf_counter() - began
+            calls["chains"] += 1
+
+            assert chain is not None
+            puts = chain.putexpdatemap[0]
+            index = (strategy * 7 + minute) % len(puts)
+
+            began = time.perf_counter()
+            placed = broker.place_order(
+                build_order(
+                    puts.symbol[index],
+                    round((puts.bid[index] + puts.ask[index]) / 2, 2),
+                )
+            )
+            timings["orders"] += time.perf_counter() - began
+            calls["orders"] += 1
+
+            assert placed is not None
+            order_ids[strategy].append(placed.order_id)
+
+            began = time.perf_counter()
+            for order_id in order_ids[strategy][-5:]:
+                broker.get_order(baseRR.GetOrderRequestMessage(strategy, order_id))
+                calls["polls"] += 1
+            timings["polls"] += time.perf_counter() - began
+
+    elapsed = time.perf_counter() - start
+    filled = sum(order.status == "FILLED" for order in broker.orders.values())
+
+    print(
+        "{} strategies, {} simulated minutes, {} orders, {} filled, {} still working".format(
+            strategies, minutes, len(broker.orders), filled, len(broker.working)
+        )
+    )
+    print("{:<8} {:>10} {:>12}".format("", "calls", "calls/s"))
+    for name in calls:
+        print(
+            "{:<8} {:>10} {:>12.1f}".format(
+                name, calls[name], calls[name] / timings[name]
+            )
+        )
+    print(
+        "{:.1f}s wall clock, {:.0f}x faster than real time".format(
+            elapsed, minutes * 60 / elapsed
+        )
+    )
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 30,
+    )
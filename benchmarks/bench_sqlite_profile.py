@@ -0,0 +1,147 @@
+"""
+Compares ormDatabase with SQLite's defaults and no secondary indexes against the tuned profile (WAL, pragmas and
+indexes), on a database holding 100k historical orders, each with a leg, an activity and an execution leg.
+
+Usage:
+
+    python -m benchmarks.bench_sqlite_profile [orders] [operations]
+"""
+
+import datetime as dt
+import os
+import sys
+import tempfile
+import time
+
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Database.ormDatabase import meta, ormDatabase
+from sqlalchemy import select
+
+STRATEGIES = 4
+
+
+def seed(db: ormDatabase, orders: int) -> None:
+    """Bulk inserts historical orders, all filled but the last few per strategy."""
+    now = dt.datetime(2022, 1, 3)
+    tables = meta.tables
+
+    order_rows = [
+        {
+            "id": id,
+            "order_id": 1000000 + id,
+            "strategy_id": id % STRATEGIES + 1,
+            "status": "WORKING" if id > orders - 10 * STRATEGIES else "FILLED",
+            "price": 1.1,
+            "quantity": 1,
+            "entered_time": now,
+        }
+        for id in range(1, orders + 1)
+    ]
+    leg_rows = [
+        {"id": id, "order_id": id, "symbol": "SPX", "put_call": "PUT", "quantity": 1}
+        for id in range(1, orders + 1)
+    ]
+    activity_rows = [
+        {"id": id, "order_id": id, "activity_type": "EXECUTION", "quantity": 1}
+        for id in range(1, orders + 1)
+    ]
+    execution_rows = [
+        {"id": id, "orderactivity_id": id, "quantity": 1, "price": 1.1, "time": now}
+        for id in range(1, orders + 1)
+    ]
+
+    with db.engine.begin() as connection:
+        connection.execute(tables["orders"].insert(), order_rows)
+        connection.execute(tables["orderlegs"].insert(), leg_rows)
+        connection.execute(tables["orderactivities"].insert(), activity_rows)
+        connection.execute(tables["executionlegs"].insert(), execution_rows)
+
+
+def drop_indexes(db: ormDatabase) -> None:
+    for table in meta.sorted_tables:
+        for index in table.indexes:
+            index.drop(bind=db.engine)
+
+
+def build_order(strategy_id: int) -> baseModels.Order:
+    order = baseModels.Order()
+    order.strategy_id = strategy_id
+    order.order_id = 1
+    order.price = 1.1
+    order.status = "WORKING"
+    order.legs = []
+    order.activities = []
+
+    return order
+
+
+def measure(db: ormDatabase, orders: int, operations: int) -> dict[str, float]:
+    results = {}
+    orders_table = meta.tables["orders"]
+    executions_table = meta.tables["executionlegs"]
+
+    start = time.perf_counter()
+    for index in range(operations):
+        db.read_active_orders(
+            baseRR.ReadOpenDatabaseOrdersRequest(index % STRATEGIES + 1)
+        )
+    results["read active"] = operations / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with db.engine.connect() as connection:
+        for index in range(operations):
+            connection.execute(
+                select(orders_table.c.id).where(
+                    orders_table.c.order_id == 1000000 + (index * 7919) % orders + 1
+                )
+            ).all()
+            connection.execute(
+                select(executions_table.c.price).where(
+                    executions_table.c.orderactivity_id == (index * 7919) % orders + 1
+                )
+            ).all()
+    results["by order_id"] = operations / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for index in range(operations):
+        db.create_order(
+            baseRR.CreateDatabaseOrderRequest(build_order(index % STRATEGIES + 1))
+        )
+    results["create"] = operations / (time.perf_counter() - start)
+
+    return results
+
+
+def run(orders: int, operations: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        default = ormDatabase(os.path.join(tmp, "default.db"), pragmas={})
+        drop_indexes(default)
+        seed(default, orders)
+        before = measure(default, orders, operations)
+        default.close()
+
+        tuned = ormDatabase(os.path.join(tmp, "tuned.db"))
+        seed(tuned, orders)
+        after = measure(tuned, orders, operations)
+        tuned.close()
+
+    print("{} historical orders, {} operations each".format(orders, operations))
+    print(
+        "{:<12} {:>14} {:>14} {:>9}".format(
+            "", "default ops/s", "tuned ops/s", "speedup"
+        )
+    )
+    for name in before:
+        print(
+            "{:<12} {:>14.1f} {:>14.1f} {:>8.2f}x".format(
+                name, before[name], after[name], after[name] / before[name]
+            )
+        )
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
@@ -0,0 +1,93 @@
+"""
+Sweeps SingleByDeltaStrategy's target_delta and profit_target_percent over synthetic 1-minute SPX put chains in a
+process pool, then runs the sweep again to time resuming from the SQLite checkpoint. Reports the time each pass
+took, the history the workers memory-map instead of receiving pickled, and the best combinations.
+
+Usage:
+
+    python -m benchmarks.bench_sweep [trading days] [processes]
+"""
+
+import datetime as dt
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+from basetypes.Backtest.parameterSweep import ParameterSweep
+
+from benchmarks.bench_backtest import FIRST_DAY, synthetic_history, trading_days
+
+GRID = {
+    "target_delta": [-0.05, -0.07, -0.1, -0.15],
+    "profit_target_percent": [0.5, 0.7, 0.9],
+}
+
+
+def run(days: int, processes: int) -> None:
+    logging.getLogger("autotrader").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        history = synthetic_history(days)
+        history.save(os.path.join(workdir, "histories", "SPX"))
+        print(
+            "{} trading days, {} snapshots, {:.0f} MB mapped by each worker instead of pickled per task".format(
+                days, len(history), len(pickle.dumps(history)) / 1e6
+            )
+        )
+
+        sweep = ParameterSweep(
+            os.path.join(workdir, "histories"),
+            os.path.join(workdir, "sweep.db"),
+            dt.datetime.combine(FIRST_DAY, dt.time(), dt.timezone.utc),
+            dt.datetime.combine(trading_days(days)[-1], dt.time(23), dt.timezone.utc),
+            GRID,
+            processes=processes,
+        )
+        combinations = len(sweep.combinations())
+
+        print(
+            "{:<8} {:>12} {:>10} {:>12}".format("", "backtests", "seconds", "per run")
+        )
+
+        for name in ("sweep", "resume"):
+            pending = len(sweep.pending())
+            began = time.perf_counter()
+            results = sweep.run()
+            seconds = time.perf_counter() - began
+            print(
+                "{:<8} {:>12} {:>10.1f} {:>12}".format(
+                    name,
+                    "{}/{}".format(pending, combinations),
+                    seconds,
+                    "{:.1f}".format(seconds / pending) if pending else "-",
+                )
+            )
+
+        print()
+        print(
+            "{:<14} {:>8} {:>10} {:>10} {:>8} {:>8}".format(
+                "target_delta", "profit", "P&L", "drawdown", "placed", "filled"
+            )
+        )
+
+        for result in results[:5]:
+            print(
+                "{:<14} {:>8} {:>10.0f} {:>10.0f} {:>8} {:>8}".format(
+                    result.parameters["target_delta"],
+                    result.parameters["profit_target_percent"],
+                    result.profit,
+                    result.drawdown,
+                    result.placed,
+                    result.filled,
+                )
+            )
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10,
+        int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1,
+    )
@@ -0,0 +1,100 @@
+"""
+Compares TDClient calls/second when building a new client per call (the old TdaBroker.getsession behavior)
+against the long-lived, pooled TdaSessionManager client, using a local keep-alive HTTP stand-in for TD Ameritrade.
+
+Usage:
+
+    python -m benchmarks.bench_tda_session [calls]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from basetypes.Broker.tdaSession import TdaSessionManager
+from td.client import TDClient
+
+QUOTE = json.dumps({"VGSH": {"symbol": "VGSH", "bidPrice": 60.0}}).encode()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers every GET with a small quote payload over HTTP/1.1 keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(QUOTE)))
+        self.end_headers()
+        self.wfile.write(QUOTE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_credentials(path: str) -> None:
+    far_future = time.time() + 60 * 60 * 24 * 30
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "access_token": "token",
+                "refresh_token": "refresh",
+                "logged_in": True,
+                "access_token_expires_at": far_future,
+                "refresh_token_expires_at": far_future,
+            },
+            file,
+        )
+
+
+def per_call_client(endpoint: str, credentials: str) -> TDClient:
+    client = TDClient(
+        client_id="bench",
+        redirect_uri="http://localhost",
+        account_number="123",
+        credentials_path=credentials,
+    )
+    client.config["api_endpoint"] = endpoint
+    return client
+
+
+def run(calls: int) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = "http://127.0.0.1:{}".format(server.server_address[1])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        credentials = os.path.join(tmp, "creds.json")
+        write_credentials(credentials)
+
+        # Old behavior: new client, credential read and HTTP session per call
+        start = time.perf_counter()
+        for _ in range(calls):
+            per_call_client(endpoint, credentials).get_quotes(["VGSH"])
+        per_call = calls / (time.perf_counter() - start)
+
+        # New behavior: one pooled client per broker
+        manager = TdaSessionManager(
+            "bench", "http://localhost", "123", credentials, api_endpoint=endpoint
+        )
+        start = time.perf_counter()
+        for _ in range(calls):
+            manager.get_client().get_quotes(["VGSH"])
+        pooled = calls / (time.perf_counter() - start)
+        manager.close()
+
+    server.shutdown()
+
+    print("per-call TDClient: {:>10.1f} calls/s".format(per_call))
+    print("pooled session:    {:>10.1f} calls/s".format(pooled))
+    print("speedup:           {:>10.2f}x".format(pooled / per_call))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
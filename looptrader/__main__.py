@@ -2,7 +2,9 @@ import logging
 import logging.config
 
 from basetypes.Broker.tdaBroker import TdaBroker
+from basetypes.Database.cachedDatabase import CachedDatabase
 from basetypes.Database.ormDatabase import ormDatabase
+from basetypes.Database.writeBehindDatabase import WriteBehindDatabase
 from basetypes.Mediator.botMediator import Bot
 from basetypes.Notifier.telegramnotifier import TelegramNotifier
 from basetypes.Strategy.longsharesstrategy import LongSharesStrategy
@@ -41,8 +43,8 @@ if __name__ == "__main__":
     individualbroker = TdaBroker(id="individual")
     irabroker = TdaBroker(id="ira")
 
-    # Create our local DB
-    sqlitedb = ormDatabase("looptrader.db")
+    # Create our local DB, order writes are committed in the background and active orders are kept in memory
+    sqlitedb = CachedDatabase(WriteBehindDatabase(ormDatabase("looptrader.db")))
 
     # Create our notifier
     telegram_bot = TelegramNotifier()
@@ -57,6 +59,7 @@ if __name__ == "__main__":
         },
         database=sqlitedb,
         notifier=telegram_bot,
+        max_concurrency=2,
     )
 
     # Run Bot
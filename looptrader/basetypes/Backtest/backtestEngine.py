@@ -0,0 +1,241 @@
+"""
+Backtests strategies on historical option chains. The strategies run inside a BacktestBot, trading through a
+SimulatedBroker that fills against the recorded quotes, while a simulated clock jumps from one wake-up to the next.
+
+Classes:
+
+    Backtest
+    BacktestReport
+    FillStats
+
+Functions:
+
+    run()
+    summary()
+"""
+
+import datetime as dt
+import logging
+import os
+import statistics
+import tempfile
+import time
+from typing import Union
+
+import attr
+import basetypes.Mediator.baseModels as baseModels
+import numpy as np
+from basetypes.Backtest.backtestMediator import BacktestBot, BacktestNotifier
+from basetypes.Broker.simulatedBroker import SimulatedBroker
+from basetypes.Broker.simulatedMarket import Market
+from basetypes.Clock.simulatedClock import SimulatedClock
+from basetypes.Database.cachedDatabase import CachedDatabase
+from basetypes.Database.ormDatabase import ormDatabase
+from basetypes.Strategy.abstractStrategy import Strategy
+from basetypes.Strategy.riskFreeRate import RiskFreeRateProvider
+
+logger = logging.getLogger("autotrader")
+
+
+@attr.s(auto_attribs=True)
+class FillStats:
+    """What happened to the orders the strategies placed."""
+
+    placed: int = 0
+    filled: int = 0
+    canceled: int = 0
+    expired: int = 0
+    working: int = 0
+    mean_seconds_to_fill: float = 0.0
+    median_seconds_to_fill: float = 0.0
+
+    @property
+    def fill_rate(self) -> float:
+        return self.filled / self.placed if self.placed else 0.0
+
+    @classmethod
+    def from_orders(cls, orders: list[baseModels.Order]) -> "FillStats":
+        stats = cls(placed=len(orders))
+        seconds_to_fill = []
+
+        for order in orders:
+            if order.status == "FILLED":
+                stats.filled += 1
+                seconds_to_fill.append(
+                    (order.close_time - order.entered_time).total_seconds()
+                )
+            elif order.status == "CANCELED":
+                stats.canceled += 1
+            elif order.status == "EXPIRED":
+                stats.expired += 1
+            elif order.status == "WORKING":
+                stats.working += 1
+
+        if seconds_to_fill:
+            stats.mean_seconds_to_fill = statistics.mean(seconds_to_fill)
+            stats.median_seconds_to_fill = statistics.median(seconds_to_fill)
+
+        return stats
+
+
+@attr.s(auto_attribs=True)
+class BacktestReport:
+    """The account's equity curve and order outcomes over a backtest."""
+
+    start: dt.datetime
+    end: dt.datetime
+    starting_equity: float
+    # Liquidation value sampled every step, times in UTC epoch seconds
+    times: np.ndarray
+    equity: np.ndarray
+    fills: FillStats
+    loops: int = 0
+    notifications: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def ending_equity(self) -> float:
+        return float(self.equity[-1]) if len(self.equity) else self.starting_equity
+
+    @property
+    def profit(self) -> float:
+        return self.ending_equity - self.starting_equity
+
+    @property
+    def return_percent(self) -> float:
+        return self.profit / self.starting_equity * 100
+
+    def drawdown(self) -> tuple[float, float, Union[dt.datetime, None]]:
+        """The largest fall from a peak in equity, in dollars and as a percentage of the peak, and when it bottomed."""
+        if not len(self.equity):
+            return 0.0, 0.0, None
+
+        peaks = np.maximum.accumulate(self.equity)
+        drawdowns = peaks - self.equity
+        trough = int(np.argmax(drawdowns))
+
+        return (
+            float(drawdowns[trough]),
+            float(drawdowns[trough] / peaks[trough] * 100),
+            dt.datetime.fromtimestamp(int(self.times[trough]), dt.timezone.utc),
+        )
+
+    def summary(self) -> str:
+        drawdown, drawdown_percent, trough = self.drawdown()
+        simulated_days = (self.end - self.start).total_seconds() / 86400
+
+        return "\n".join(
+            [
+                "{:%Y-%m-%d} to {:%Y-%m-%d}, {:.0f} days in {:.1f}s".format(
+                    self.start, self.end, simulated_days, self.elapsed_seconds
+                ),
+                "P&L ${:,.2f} ({:+.2f}%), ${:,.2f} to ${:,.2f}".format(
+                    self.profit,
+                    self.return_percent,
+                    self.starting_equity,
+                    self.ending_equity,
+                ),
+                "Max drawdown ${:,.2f} ({:.2f}%){}".format(
+                    drawdown,
+                    drawdown_percent,
+                    "" if trough is None else " at {:%Y-%m-%d %H:%M}".format(trough),
+                ),
+                "Orders {} placed, {} filled ({:.0%}), {} canceled, {} expired, {} working".format(
+                    self.fills.placed,
+                    self.fills.filled,
+                    self.fills.fill_rate,
+                    self.fills.canceled,
+                    self.fills.expired,
+                    self.fills.working,
+                ),
+                "Fills took {:.0f}s on average, {:.0f}s median".format(
+                    self.fills.mean_seconds_to_fill, self.fills.median_seconds_to_fill
+                ),
+            ]
+        )
+
+
+@attr.s(auto_attribs=True)
+class Backtest:
+    """Runs strategies from start to end against a market, sharing one simulated account.
+
+    Strategies should be new instances, they keep their state between runs.
+    """
+
+    strategies: list[Strategy] = attr.ib(validator=attr.validators.instance_of(list))
+    market: Market = attr.ib(validator=attr.validators.instance_of(Market))
+    start: dt.datetime = attr.ib(validator=attr.validators.instance_of(dt.datetime))
+    end: dt.datetime = attr.ib(validator=attr.validators.instance_of(dt.datetime))
+    starting_cash: float = attr.ib(
+        default=100000.0, validator=attr.validators.instance_of(float)
+    )
+    fill_latency_seconds: float = attr.ib(
+        default=1.0, validator=attr.validators.instance_of(float)
+    )
+    fill_probability: float = attr.ib(
+        default=1.0, validator=attr.validators.instance_of(float)
+    )
+    risk_free_rate: float = attr.ib(
+        default=0.0, validator=attr.validators.instance_of(float)
+    )
+    # How often the account's equity is sampled
+    step_seconds: float = attr.ib(
+        default=60.0, validator=attr.validators.instance_of(float)
+    )
+    seed: int = attr.ib(default=0, validator=attr.validators.instance_of(int))
+
+    def run(self) -> BacktestReport:
+        began = time.perf_counter()
+        clock = SimulatedClock(self.start)
+        times: list[float] = []
+        equity: list[float] = []
+
+        # The bot's database, calendar and risk-free rate live only as long as the run
+        with tempfile.TemporaryDirectory() as workdir:
+            broker = SimulatedBroker(
+                "backtest",
+                market=self.market,
+                starting_cash=self.starting_cash,
+                fill_latency_seconds=self.fill_latency_seconds,
+                fill_probability=self.fill_probability,
+                # Older orders are read one at a time when reconciling, so snapshots don't clone every order
+                order_history_seconds=self.step_seconds,
+                clock=clock,
+                seed=self.seed,
+            )
+            notifier = BacktestNotifier()
+            bot = BacktestBot(
+                notifier=notifier,
+                database=CachedDatabase(
+                    ormDatabase(os.path.join(workdir, "backtest.db"))
+                ),
+                brokerstrategy={strategy: broker for strategy in self.strategies},
+                market_calendar_filename=os.path.join(workdir, "marketcalendar.json"),
+                clock=clock,
+                risk_free_rate_provider=RiskFreeRateProvider(
+                    os.path.join(workdir, "riskfreerate.json"),
+                    source=lambda: self.risk_free_rate,
+                    clock=clock,
+                ),
+            )
+
+            def sample(now: dt.datetime) -> None:
+                times.append(now.timestamp())
+                equity.append(broker.liquidation_value())
+
+            try:
+                loops = bot.run_until(self.end, self.step_seconds, sample)
+            finally:
+                bot.shutdown()
+
+        return BacktestReport(
+            self.start,
+            self.end,
+            self.starting_cash,
+            times=np.array(times, dtype=np.int64),
+            equity=np.array(equity, dtype=float),
+            fills=FillStats.from_orders(list(broker.orders.values())),
+            loops=loops,
+            notifications=notifier.sent,
+            elapsed_seconds=time.perf_counter() - began,
+        )
@@ -0,0 +1,98 @@
+"""
+The mediator for backtests, the regular Bot on a simulated clock with a loop that jumps the clock to the next thing
+due instead of sleeping.
+
+Classes:
+
+    BacktestBot
+    BacktestNotifier
+
+Functions:
+
+    run_until()
+    send_notification()
+"""
+
+import datetime as dt
+import logging
+from typing import Callable
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Clock.simulatedClock import SimulatedClock
+from basetypes.Mediator.botMediator import Bot
+from basetypes.Notifier.abstractnotifier import Notifier
+
+logger = logging.getLogger("autotrader")
+
+
+@attr.s(auto_attribs=True)
+class BacktestNotifier(Notifier):
+    """Counts notifications instead of sending them."""
+
+    sent: int = attr.ib(default=0, init=False)
+
+    def send_notification(self, request: baseRR.SendNotificationRequestMessage) -> None:
+        self.sent += 1
+        logger.debug(request.message)
+
+
+@attr.s(auto_attribs=True)
+class BacktestBot(Bot):
+    """A Bot on a simulated clock, driven by run_until() instead of process_strategies()."""
+
+    clock: SimulatedClock = attr.ib(
+        kw_only=True, validator=attr.validators.instance_of(SimulatedClock)
+    )
+
+    def run_until(
+        self,
+        end: dt.datetime,
+        step_seconds: float,
+        on_step: Callable[[dt.datetime], None],
+    ) -> int:
+        """Runs the bot loop until end, calling on_step every step_seconds. Returns how many times the loop ran.
+
+        Where the live loop sleeps, the clock jumps to the next strategy wake-up, order poll or step.
+        """
+        for strategy in self.brokerstrategy:
+            self.scheduler.schedule(strategy, self.clock())
+
+        step = dt.timedelta(seconds=step_seconds)
+        next_step = self.clock()
+        loops = 0
+
+        while not self.killswitch:
+            loops += 1
+
+            # Let strategies react to their orders filling or being cancelled
+            self.process_order_events()
+
+            self.process_due_strategies()
+
+            now = self.clock()
+
+            if now >= next_step:
+                on_step(now)
+
+                while next_step <= now:
+                    next_step += step
+
+            wakeups = [
+                wakeup
+                for wakeup in (
+                    next_step,
+                    self.scheduler.next_deadline(),
+                    self.order_tracker.next_poll(),
+                )
+                if wakeup is not None
+            ]
+
+            when = min(wakeups)
+
+            if when > end:
+                break
+
+            self.clock.advance_to(when)
+
+        return loops
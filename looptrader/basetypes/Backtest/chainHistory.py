@@ -0,0 +1,428 @@
+"""
+Historical option chain snapshots for backtesting, stored as flat NumPy columns instead of response objects, and a
+Market that serves them to the simulated broker.
+
+A ChainHistory holds every snapshot of one underlying. Each snapshot is a run of contract rows sorted by put/call,
+expiration and strike, so a contract or an expiration is found with binary searches and chains are built from array
+slices. Histories are saved as a directory of .npy files.
+
+Classes:
+
+    ChainHistory
+    HistoricalMarket
+
+Functions:
+
+    from_snapshots()
+    from_journal()
+    save()
+    load()
+    snapshot_at()
+    underlying_price()
+    option_quote()
+    get_option_chain()
+    market_hours()
+"""
+
+import datetime as dt
+import json
+import os
+from typing import Union
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+import numpy as np
+from basetypes.Broker.brokerJournal import read_chains
+from basetypes.Broker.simulatedMarket import (
+    EASTERN,
+    Market,
+    ReplayedMarket,
+    option_symbol,
+    parse_option_symbol,
+)
+from basetypes.Mediator.columnarChain import ColumnarExpirationDate, as_columnar
+
+EPOCH = dt.date(1970, 1, 1)
+
+PUT = 0
+CALL = 1
+
+# One array per column, saved as <column>.npy
+COLUMNS = (
+    "times",
+    "underlying",
+    "volatility",
+    "offsets",
+    "putcall",
+    "expiration",
+    "strike",
+    "bid",
+    "ask",
+    "delta",
+)
+
+
+def epoch_seconds(when: dt.datetime) -> int:
+    return int(when.timestamp())
+
+
+def epoch_days(day: dt.date) -> int:
+    return (day - EPOCH).days
+
+
+@attr.s(auto_attribs=True, eq=False)
+class ChainHistory:
+    """Every recorded snapshot of one underlying's option chain.
+
+    Snapshot i was taken at times[i] (UTC epoch seconds) and owns rows offsets[i] to offsets[i + 1].
+    """
+
+    symbol: str
+    # Per snapshot
+    times: np.ndarray
+    underlying: np.ndarray
+    volatility: np.ndarray
+    offsets: np.ndarray
+    # Per contract row
+    putcall: np.ndarray
+    expiration: np.ndarray
+    strike: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    delta: np.ndarray
+    days: Union[set[dt.date], None] = attr.ib(default=None, init=False)
+
+    ############
+    # Building #
+    ############
+    @classmethod
+    def from_snapshots(
+        cls,
+        symbol: str,
+        snapshots: list[tuple[dt.datetime, baseRR.GetOptionChainResponseMessage]],
+    ) -> "ChainHistory":
+        """Builds a history from chain responses. Chains recorded at the same time are merged into one snapshot."""
+        merged: dict[int, tuple[baseRR.GetOptionChainResponseMessage, dict]] = {}
+
+        for recorded_at, chain in snapshots:
+            _, expirations = merged.setdefault(epoch_seconds(recorded_at), (chain, {}))
+
+            for putcall, recorded in (
+                (PUT, chain.putexpdatemap),
+                (CALL, chain.callexpdatemap),
+            ):
+                for expiration in recorded or []:
+                    columnar = as_columnar(expiration)
+                    key = (putcall, epoch_days(columnar.expirationdate.date()))
+                    expirations[key] = columnar
+
+        times = sorted(merged)
+        offsets = [0]
+        rows: dict[str, list] = {column: [] for column in COLUMNS[4:]}
+
+        for time in times:
+            _, expirations = merged[time]
+
+            for (putcall, expiration), columnar in sorted(expirations.items()):
+                count = len(columnar)
+                rows["putcall"].append(np.full(count, putcall, dtype=np.int8))
+                rows["expiration"].append(np.full(count, expiration, dtype=np.int32))
+                rows["strike"].append(columnar.strike)
+                rows["bid"].append(columnar.bid)
+                rows["ask"].append(columnar.ask)
+                rows["delta"].append(columnar.delta)
+
+            offsets.append(offsets[-1] + sum(len(c) for c in expirations.values()))
+
+        def stack(column: str, dtype) -> np.ndarray:
+            if not rows[column]:
+                return np.zeros(0, dtype=dtype)
+
+            return np.concatenate(rows[column]).astype(dtype)
+
+        return cls(
+            symbol,
+            times=np.array(times, dtype=np.int64),
+            underlying=np.array(
+                [merged[time][0].underlyinglastprice for time in times], dtype=float
+            ),
+            volatility=np.array(
+                [merged[time][0].volatility for time in times], dtype=float
+            ),
+            offsets=np.array(offsets, dtype=np.int64),
+            putcall=stack("putcall", np.int8),
+            expiration=stack("expiration", np.int32),
+            strike=stack("strike", float),
+            bid=stack("bid", float),
+            ask=stack("ask", float),
+            delta=stack("delta", float),
+        )
+
+    @classmethod
+    def from_journal(cls, path: str) -> dict[str, "ChainHistory"]:
+        """Builds a history per symbol from the option chains a RecordingBroker journaled."""
+        return {
+            symbol: cls.from_snapshots(symbol, snapshots)
+            for symbol, snapshots in read_chains(path).items()
+        }
+
+    ###############
+    # Persistence #
+    ###############
+    def save(self, path: str) -> None:
+        """Writes the history to a directory, one .npy file per column."""
+        os.makedirs(path, exist_ok=True)
+
+        with open(os.path.join(path, "history.json"), "w") as file:
+            json.dump({"symbol": self.symbol}, file)
+
+        for column in COLUMNS:
+            np.save(os.path.join(path, column + ".npy"), getattr(self, column))
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Union[str, None] = None) -> "ChainHistory":
+        """Reads a history written by save().
+
+        With mmap_mode "r" the columns are memory-mapped instead of read, pages load as they are touched and
+        processes mapping the same files share them through the page cache.
+        """
+        with open(os.path.join(path, "history.json"), "r") as file:
+            symbol = json.load(file)["symbol"]
+
+        return cls(
+            symbol,
+            **{
+                column: np.load(
+                    os.path.join(path, column + ".npy"), mmap_mode=mmap_mode
+                )
+                for column in COLUMNS
+            },
+        )
+
+    ###########
+    # Lookups #
+    ###########
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def snapshot_at(self, now: dt.datetime) -> Union[int, None]:
+        """The latest snapshot taken at or before now, or None if there isn't one."""
+        index = int(np.searchsorted(self.times, now.timestamp(), side="right")) - 1
+
+        return index if index >= 0 else None
+
+    def block(
+        self, snapshot: int, putcall: int, first_day: int, last_day: int
+    ) -> tuple[int, int]:
+        """The rows of a snapshot holding one side's expirations between two days, inclusive."""
+        start, end = int(self.offsets[snapshot]), int(self.offsets[snapshot + 1])
+
+        side = self.putcall[start:end]
+        start, end = start + int(np.searchsorted(side, putcall)), start + int(
+            np.searchsorted(side, putcall, side="right")
+        )
+
+        expirations = self.expiration[start:end]
+
+        return start + int(np.searchsorted(expirations, first_day)), start + int(
+            np.searchsorted(expirations, last_day, side="right")
+        )
+
+    def row_of(
+        self, snapshot: int, putcall: int, expiration: dt.date, strike: float
+    ) -> Union[int, None]:
+        """The row holding a contract in a snapshot, or None if the snapshot doesn't have it."""
+        day = epoch_days(expiration)
+        start, end = self.block(snapshot, putcall, day, day)
+        index = start + int(np.searchsorted(self.strike[start:end], strike))
+
+        if index < end and self.strike[index] == strike:
+            return index
+
+        return None
+
+    def covers(self, day: dt.date) -> bool:
+        """Whether a day falls between the first and last snapshots."""
+        return bool(len(self.times)) and (
+            dt.datetime.fromtimestamp(int(self.times[0]), EASTERN).date()
+            <= day
+            <= dt.datetime.fromtimestamp(int(self.times[-1]), EASTERN).date()
+        )
+
+    def trading_days(self) -> set[dt.date]:
+        """The Eastern dates with at least one snapshot."""
+        if self.days is None:
+            self.days = {
+                dt.datetime.fromtimestamp(int(time), EASTERN).date()
+                for time in self.times
+            }
+
+        return self.days
+
+
+@attr.s(auto_attribs=True)
+class HistoricalMarket(Market):
+    """Serves recorded chain snapshots to the simulated broker, each lookup sees the latest snapshot at or before now.
+
+    Weekdays the histories have no snapshots for are closed, so holidays in the data are holidays in the backtest.
+    """
+
+    histories: dict[str, ChainHistory] = attr.ib(
+        validator=attr.validators.instance_of(dict)
+    )
+    sessions: dict[dt.date, Union[tuple[dt.datetime, dt.datetime], None]] = attr.ib(
+        factory=dict, init=False
+    )
+
+    def underlying_price(self, symbol: str, now: dt.datetime) -> Union[float, None]:
+        history = self.histories.get(symbol)
+        snapshot = None if history is None else history.snapshot_at(now)
+
+        if history is None or snapshot is None:
+            return None
+
+        return float(history.underlying[snapshot])
+
+    def option_quote(
+        self, symbol: str, now: dt.datetime
+    ) -> Union[tuple[float, float], None]:
+        contract = parse_option_symbol(symbol)
+
+        if contract is None:
+            return None
+
+        underlying, expiration, putcall, strike = contract
+        history = self.histories.get(underlying)
+        snapshot = None if history is None else history.snapshot_at(now)
+
+        if history is None or snapshot is None:
+            return None
+
+        row = history.row_of(
+            snapshot, PUT if putcall == "PUT" else CALL, expiration, strike
+        )
+
+        if row is None:
+            return None
+
+        return float(history.bid[row]), float(history.ask[row])
+
+    def get_option_chain(
+        self, request: baseRR.GetOptionChainRequestMessage, now: dt.datetime
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        history = self.histories.get(request.symbol)
+        snapshot = None if history is None else history.snapshot_at(now)
+
+        if history is None or snapshot is None:
+            return None
+
+        response = baseRR.GetOptionChainResponseMessage()
+        response.symbol = request.symbol
+        response.status = "SUCCESS"
+        response.underlyinglastprice = float(history.underlying[snapshot])
+        response.volatility = float(history.volatility[snapshot])
+        response.putexpdatemap = []
+        response.callexpdatemap = []
+
+        today = now.astimezone(EASTERN).date()
+
+        for putcall, expirations in (
+            ("PUT", response.putexpdatemap),
+            ("CALL", response.callexpdatemap),
+        ):
+            if request.contracttype not in (putcall, "ALL"):
+                continue
+
+            start, end = history.block(
+                snapshot,
+                PUT if putcall == "PUT" else CALL,
+                epoch_days(request.fromdate),
+                epoch_days(request.todate),
+            )
+
+            while start < end:
+                day = int(history.expiration[start])
+                stop = start + int(
+                    np.searchsorted(history.expiration[start:end], day, side="right")
+                )
+                expiration = self.build_expiration(
+                    request.symbol,
+                    history,
+                    start,
+                    stop,
+                    EPOCH + dt.timedelta(days=day),
+                    today,
+                    putcall,
+                )
+                expirations.append(
+                    expiration
+                    if request.columnar
+                    else ReplayedMarket.as_legacy(expiration)
+                )
+                start = stop
+
+        return response
+
+    def market_hours(
+        self, day: dt.date
+    ) -> Union[tuple[dt.datetime, dt.datetime], None]:
+        """Days the histories cover without a snapshot are holidays, days outside them follow the weekday schedule."""
+        if day not in self.sessions:
+            covered = [
+                history.trading_days()
+                for history in self.histories.values()
+                if history.covers(day)
+            ]
+
+            self.sessions[day] = (
+                None
+                if covered and not any(day in days for days in covered)
+                else super().market_hours(day)
+            )
+
+        return self.sessions[day]
+
+    @staticmethod
+    def build_expiration(
+        symbol: str,
+        history: ChainHistory,
+        start: int,
+        stop: int,
+        expiration: dt.date,
+        today: dt.date,
+        putcall: str,
+    ) -> ColumnarExpirationDate:
+        """Builds one expiration straight from a run of rows."""
+        strikes = np.asarray(history.strike[start:stop])
+        count = len(strikes)
+        zeros = np.zeros(count)
+        description = "{} {} {{:g}} {}".format(
+            symbol, expiration.strftime("%b %d %Y"), putcall.capitalize()
+        )
+
+        return ColumnarExpirationDate(
+            dt.datetime.combine(expiration, dt.time()),
+            (expiration - today).days,
+            strike=strikes,
+            multiplier=np.full(count, 100.0),
+            bid=np.asarray(history.bid[start:stop]),
+            ask=np.asarray(history.ask[start:stop]),
+            delta=np.asarray(history.delta[start:stop]),
+            gamma=zeros,
+            theta=zeros,
+            vega=zeros,
+            rho=zeros,
+            symbol=np.array(
+                [
+                    option_symbol(symbol, expiration, putcall, float(strike))
+                    for strike in strikes
+                ],
+                dtype=object,
+            ),
+            description=np.array(
+                [description.format(strike) for strike in strikes], dtype=object
+            ),
+            putcall=np.full(count, putcall, dtype=object),
+            settlementtype=np.full(count, "P", dtype=object),
+            expirationtype=np.full(count, "W", dtype=object),
+        )
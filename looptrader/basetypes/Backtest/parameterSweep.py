@@ -0,0 +1,292 @@
+"""
+Sweeps SingleByDeltaStrategy's parameters over a grid, backtesting every combination on the same historical chains.
+
+Backtests run in a process pool. Each worker memory-maps the saved histories once, so the chains are shared through
+the page cache instead of being pickled to every task. Results are checkpointed to SQLite as each backtest finishes,
+and running a sweep again only backtests the combinations without a result.
+
+Classes:
+
+    ParameterSweep
+    SweepResult
+
+Functions:
+
+    combinations()
+    pending()
+    run()
+    save()
+    results()
+    parameters_key()
+    load_histories()
+    run_backtest()
+"""
+
+import concurrent.futures
+import datetime as dt
+import itertools
+import json
+import logging
+import os
+from typing import Any
+
+import attr
+from basetypes.Backtest.backtestEngine import Backtest
+from basetypes.Backtest.chainHistory import ChainHistory, HistoricalMarket
+from basetypes.Strategy.singlebydeltastrategy import SingleByDeltaStrategy
+from sqlalchemy import (
+    Column,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    select,
+)
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("autotrader")
+
+# The parameters a sweep can vary
+SWEPT = (
+    "target_delta",
+    "min_delta",
+    "minimum_dte",
+    "maximum_dte",
+    "profit_target_percent",
+)
+
+meta = MetaData()
+results_table = Table(
+    "results",
+    meta,
+    Column("key", String, primary_key=True),
+    Column("parameters", String),
+    Column("profit", Float),
+    Column("return_percent", Float),
+    Column("drawdown", Float),
+    Column("drawdown_percent", Float),
+    Column("placed", Integer),
+    Column("filled", Integer),
+    Column("elapsed_seconds", Float),
+)
+
+# Histories a pool worker mapped in load_histories(), by symbol
+worker_histories: dict[str, ChainHistory] = {}
+
+
+@attr.s(auto_attribs=True)
+class SweepResult:
+    """One backtest's parameters and outcome."""
+
+    parameters: dict[str, Any]
+    profit: float
+    return_percent: float
+    drawdown: float
+    drawdown_percent: float
+    placed: int
+    filled: int
+    elapsed_seconds: float
+
+    @property
+    def key(self) -> str:
+        return parameters_key(self.parameters)
+
+
+@attr.s(auto_attribs=True)
+class ParameterSweep:
+    """Backtests SingleByDeltaStrategy with every combination of the grid's values.
+
+    histories_path is a directory holding one ChainHistory.save() directory per underlying. Results are keyed by
+    parameters only, use a new results file when sweeping another period or histories.
+    """
+
+    histories_path: str = attr.ib(validator=attr.validators.instance_of(str))
+    results_filename: str = attr.ib(validator=attr.validators.instance_of(str))
+    start: dt.datetime = attr.ib(validator=attr.validators.instance_of(dt.datetime))
+    end: dt.datetime = attr.ib(validator=attr.validators.instance_of(dt.datetime))
+    grid: dict[str, list] = attr.ib(validator=attr.validators.instance_of(dict))
+    processes: int = attr.ib(
+        factory=lambda: os.cpu_count() or 1,
+        validator=attr.validators.instance_of(int),
+    )
+    # Keyword arguments for every Backtest, such as starting_cash or step_seconds
+    backtest_options: dict[str, Any] = attr.ib(
+        factory=dict, validator=attr.validators.instance_of(dict)
+    )
+    engine: Engine = attr.ib(init=False)
+
+    @grid.validator
+    def check_grid(self, attribute: attr.Attribute, value: dict[str, list]) -> None:
+        unknown = set(value) - set(SWEPT)
+
+        if unknown:
+            raise ValueError(
+                "Can't sweep {}, sweepable parameters are {}.".format(
+                    ", ".join(sorted(unknown)), ", ".join(SWEPT)
+                )
+            )
+
+    def __attrs_post_init__(self):
+        self.engine = create_engine("sqlite:///" + self.results_filename)
+        meta.create_all(self.engine)
+
+    def combinations(self) -> list[dict[str, Any]]:
+        """Every combination of the grid's values, skipping those the strategy can't trade.
+
+        A combination needs minimum_dte at most maximum_dte, and min_delta no further from zero than target_delta.
+        Parameters the grid doesn't vary keep the strategy's defaults.
+        """
+        defaults = {
+            name: attr.fields_dict(SingleByDeltaStrategy)[name].default
+            for name in SWEPT
+        }
+        names = sorted(self.grid)
+        combinations = []
+
+        for values in itertools.product(*(self.grid[name] for name in names)):
+            parameters = dict(zip(names, values))
+            merged = {**defaults, **parameters}
+
+            if merged["minimum_dte"] > merged["maximum_dte"] or abs(
+                merged["min_delta"]
+            ) > abs(merged["target_delta"]):
+                continue
+
+            combinations.append(parameters)
+
+        return combinations
+
+    def pending(self) -> list[dict[str, Any]]:
+        """The combinations without a checkpointed result."""
+        with self.engine.connect() as connection:
+            done = set(connection.execute(select(results_table.c.key)).scalars())
+
+        return [
+            parameters
+            for parameters in self.combinations()
+            if parameters_key(parameters) not in done
+        ]
+
+    def run(self) -> list[SweepResult]:
+        """Backtests the pending combinations, checkpointing each result as it arrives. Returns every result."""
+        pending = self.pending()
+        logger.info(
+            "Sweeping {} of {} combinations on {} processes.".format(
+                len(pending), len(self.combinations()), self.processes
+            )
+        )
+
+        if pending:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.processes,
+                initializer=load_histories,
+                initargs=(self.histories_path,),
+            ) as pool:
+                futures = {
+                    pool.submit(
+                        run_backtest,
+                        parameters,
+                        self.start,
+                        self.end,
+                        self.backtest_options,
+                    ): parameters
+                    for parameters in pending
+                }
+
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        self.save(future.result())
+                    except Exception as e:
+                        # Left without a result, so the next run retries it
+                        logger.error(
+                            "Backtest with {} failed: {}".format(futures[future], e)
+                        )
+
+        return self.results()
+
+    def save(self, result: SweepResult) -> None:
+        statement = sqlite.insert(results_table).values(
+            key=result.key,
+            parameters=json.dumps(result.parameters, sort_keys=True),
+            **{
+                field.name: getattr(result, field.name)
+                for field in attr.fields(SweepResult)
+                if field.name != "parameters"
+            },
+        )
+
+        with self.engine.begin() as connection:
+            connection.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["key"],
+                    set_={
+                        column.name: statement.excluded[column.name]
+                        for column in results_table.columns
+                        if column.name != "key"
+                    },
+                )
+            )
+
+    def results(self) -> list[SweepResult]:
+        """The checkpointed results for this grid, most profitable first."""
+        keys = {parameters_key(parameters) for parameters in self.combinations()}
+
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(results_table).order_by(results_table.c.profit.desc())
+            ).mappings()
+
+            return [
+                SweepResult(
+                    json.loads(row["parameters"]),
+                    **{
+                        field.name: row[field.name]
+                        for field in attr.fields(SweepResult)
+                        if field.name != "parameters"
+                    },
+                )
+                for row in rows
+                if row["key"] in keys
+            ]
+
+
+def parameters_key(parameters: dict[str, Any]) -> str:
+    return json.dumps(parameters, sort_keys=True)
+
+
+def load_histories(path: str) -> None:
+    """Pool initializer, maps every history under path read-only for the worker's backtests."""
+    worker_histories.clear()
+
+    for name in sorted(os.listdir(path)):
+        if os.path.isfile(os.path.join(path, name, "history.json")):
+            history = ChainHistory.load(os.path.join(path, name), mmap_mode="r")
+            worker_histories[history.symbol] = history
+
+
+def run_backtest(
+    parameters: dict[str, Any],
+    start: dt.datetime,
+    end: dt.datetime,
+    options: dict[str, Any],
+) -> SweepResult:
+    """Backtests one combination on the worker's histories."""
+    strategy = SingleByDeltaStrategy(strategy_name="sweep", **parameters)
+    report = Backtest(
+        [strategy], HistoricalMarket(dict(worker_histories)), start, end, **options
+    ).run()
+    drawdown, drawdown_percent, _ = report.drawdown()
+
+    return SweepResult(
+        parameters,
+        report.profit,
+        report.return_percent,
+        drawdown,
+        drawdown_percent,
+        report.fills.placed,
+        report.fills.filled,
+        report.elapsed_seconds,
+    )
@@ -0,0 +1,64 @@
+import abc
+from typing import Union
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Component.abstractAsyncComponent import AsyncComponent
+
+
+@attr.s(auto_attribs=True)
+class AsyncBroker(abc.ABC, AsyncComponent):
+    id: str = attr.ib(validator=attr.validators.instance_of(str))
+
+    @abc.abstractmethod
+    async def get_account(
+        self, request: baseRR.GetAccountRequestMessage
+    ) -> Union[baseRR.GetAccountResponseMessage, None]:
+        raise NotImplementedError(
+            "Each broker must implement the 'Get_Account' method."
+        )
+
+    @abc.abstractmethod
+    async def place_order(
+        self, request: baseRR.PlaceOrderRequestMessage
+    ) -> Union[baseRR.PlaceOrderResponseMessage, None]:
+        raise NotImplementedError(
+            "Each broker must implement the 'Place_Order' method."
+        )
+
+    @abc.abstractmethod
+    async def cancel_order(
+        self, request: baseRR.CancelOrderRequestMessage
+    ) -> Union[baseRR.CancelOrderResponseMessage, None]:
+        raise NotImplementedError(
+            "Each broker must implement the 'Cancel_Order' method."
+        )
+
+    @abc.abstractmethod
+    async def get_option_chain(
+        self, request: baseRR.GetOptionChainRequestMessage
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        raise NotImplementedError(
+            "Each broker must implement the 'Get_Option_Chain' method."
+        )
+
+    @abc.abstractmethod
+    async def get_market_hours(
+        self, request: baseRR.GetMarketHoursRequestMessage
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        """Days the market is closed must return a response with isopen=False, None is reserved for failures."""
+        raise NotImplementedError(
+            "Each broker must implement the 'Get_Market_Hours' method."
+        )
+
+    @abc.abstractmethod
+    async def get_order(
+        self, request: baseRR.GetOrderRequestMessage
+    ) -> Union[baseRR.GetOrderResponseMessage, None]:
+        raise NotImplementedError("Each broker must implement the 'Get_Order' method.")
+
+    @abc.abstractmethod
+    async def get_quote(
+        self, request: baseRR.GetQuoteRequestMessage
+    ) -> Union[baseRR.GetQuoteResponseMessage, None]:
+        raise NotImplementedError("Each broker must implement the 'Get_Quote' method.")
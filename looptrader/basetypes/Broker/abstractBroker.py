@@ -52,6 +52,8 @@ class Broker(abc.ABC, Component):
     ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
         """request.markets: The markets for which you're requesting market hours,
         comma-separated. Valid markets are: EQUITY, OPTION, FUTURE, BOND, or FOREX.
+
+        Days the market is closed must return a response with isopen=False, None is reserved for failures.
         """
         raise NotImplementedError(
             "Each strategy must implement the 'Get_Market_Hours' method."
@@ -72,3 +74,7 @@ class Broker(abc.ABC, Component):
         raise NotImplementedError(
             "Each strategy must implement the 'Get_Quote' method."
         )
+
+    def close(self) -> None:
+        """Releases the broker's resources when the bot shuts down."""
+        return None
@@ -0,0 +1,71 @@
+"""
+Wraps a synchronous LoopTrader Broker so it can be awaited from an AsyncMediator.
+
+Classes:
+
+    AsyncBrokerAdapter
+"""
+
+import asyncio
+from typing import Any, Callable, Union
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Broker.abstractAsyncBroker import AsyncBroker
+from basetypes.Broker.abstractBroker import Broker
+
+
+@attr.s(auto_attribs=True)
+class AsyncBrokerAdapter(AsyncBroker):
+    """Runs a synchronous Broker's calls in worker threads, one call at a time per broker."""
+
+    id: str = attr.ib(validator=attr.validators.instance_of(str), init=False)
+    broker: Broker = attr.ib(validator=attr.validators.instance_of(Broker))  # type: ignore[misc]
+    lock: Union[asyncio.Lock, None] = attr.ib(default=None, init=False)
+
+    def __attrs_post_init__(self):
+        self.id = self.broker.id
+
+    async def run(self, func: Callable[..., Any], request: Any) -> Any:
+        """Awaits a synchronous broker call without blocking the event loop."""
+        # Created lazily so the lock belongs to the running loop
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+
+        async with self.lock:
+            return await asyncio.to_thread(func, request)
+
+    async def get_account(
+        self, request: baseRR.GetAccountRequestMessage
+    ) -> Union[baseRR.GetAccountResponseMessage, None]:
+        return await self.run(self.broker.get_account, request)
+
+    async def place_order(
+        self, request: baseRR.PlaceOrderRequestMessage
+    ) -> Union[baseRR.PlaceOrderResponseMessage, None]:
+        return await self.run(self.broker.place_order, request)
+
+    async def cancel_order(
+        self, request: baseRR.CancelOrderRequestMessage
+    ) -> Union[baseRR.CancelOrderResponseMessage, None]:
+        return await self.run(self.broker.cancel_order, request)
+
+    async def get_option_chain(
+        self, request: baseRR.GetOptionChainRequestMessage
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        return await self.run(self.broker.get_option_chain, request)
+
+    async def get_market_hours(
+        self, request: baseRR.GetMarketHoursRequestMessage
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        return await self.run(self.broker.get_market_hours, request)
+
+    async def get_order(
+        self, request: baseRR.GetOrderRequestMessage
+    ) -> Union[baseRR.GetOrderResponseMessage, None]:
+        return await self.run(self.broker.get_order, request)
+
+    async def get_quote(
+        self, request: baseRR.GetQuoteRequestMessage
+    ) -> Union[baseRR.GetQuoteResponseMessage, None]:
+        return await self.run(self.broker.get_quote, request)
@@ -0,0 +1,170 @@
+"""
+An append-only journal of broker calls, each request and response pickled into a gzip compressed file, so a trading
+session can be recorded against a live broker and replayed offline.
+
+Orders and their legs are journaled as their declared attributes, never their SQLAlchemy state, so a journal can be read
+back whether or not the models have been mapped to the database.
+
+Classes:
+
+    JournalRecord
+    JournalWriter
+
+Functions:
+
+    dumps()
+    loads()
+    request_key()
+    read_journal()
+    read_chains()
+"""
+
+import datetime as dt
+import gzip
+import hashlib
+import io
+import pickle
+import threading
+import time
+from typing import Any, BinaryIO, Iterator
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+
+
+def restore(cls: type, state: dict) -> Any:
+    """Rebuilds a journaled model, through its constructor so mapped classes get their instance state."""
+    instance = cls()
+
+    for name, value in state.items():
+        setattr(instance, name, value)
+
+    return instance
+
+
+def plain(value: Any) -> Any:
+    return list(value) if isinstance(value, list) else value
+
+
+class JournalPickler(pickle.Pickler):
+    """Pickles database models by their attributes only."""
+
+    def reducer_override(self, obj: Any) -> Any:
+        if hasattr(obj, "_sa_instance_state"):
+            # Declared fields only, backrefs would point back at the parent. Instrumented collections go as plain lists
+            state = {
+                field.name: plain(vars(obj)[field.name])
+                for field in attr.fields(type(obj))
+                if field.name in vars(obj)
+            }
+            return restore, (type(obj), state)
+
+        return NotImplemented
+
+
+def dumps(obj: Any) -> bytes:
+    buffer = io.BytesIO()
+    JournalPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+
+    return buffer.getvalue()
+
+
+def loads(data: bytes) -> Any:
+    return pickle.loads(data)
+
+
+def digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def request_key(request: Any) -> str:
+    """A digest of a request's contents, replays answer each request with a response recorded for an equal one."""
+    return digest(dumps(request))
+
+
+@attr.s(auto_attribs=True)
+class JournalRecord:
+    """One broker call. The request and response stay pickled until they're needed."""
+
+    method: str
+    key: str
+    recorded_at: dt.datetime
+    # Seconds since the recording started, and how long the broker took to answer
+    offset: float
+    duration: float
+    request: bytes
+    response: bytes
+
+    def load_request(self) -> Any:
+        return loads(self.request)
+
+    def load_response(self) -> Any:
+        return loads(self.response)
+
+
+@attr.s(auto_attribs=True)
+class JournalWriter:
+    """Appends broker calls to a journal file, safe to share between strategy threads."""
+
+    path: str = attr.ib(validator=attr.validators.instance_of(str))
+    compresslevel: int = attr.ib(default=6, validator=attr.validators.instance_of(int))
+    file: BinaryIO = attr.ib(init=False)
+    started: float = attr.ib(init=False)
+    lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+
+    def __attrs_post_init__(self):
+        self.file = gzip.open(self.path, "ab", compresslevel=self.compresslevel)  # type: ignore[assignment]
+        self.started = time.monotonic()
+
+    def write(self, method: str, request: Any, response: Any, duration: float) -> None:
+        request_bytes = dumps(request)
+        record = JournalRecord(
+            method,
+            digest(request_bytes),
+            dt.datetime.now(dt.timezone.utc) - dt.timedelta(seconds=duration),
+            time.monotonic() - self.started - duration,
+            duration,
+            request_bytes,
+            dumps(response),
+        )
+
+        with self.lock:
+            pickle.dump(
+                attr.astuple(record), self.file, protocol=pickle.HIGHEST_PROTOCOL
+            )
+
+    def close(self) -> None:
+        with self.lock:
+            self.file.close()
+
+
+def read_journal(path: str) -> Iterator[JournalRecord]:
+    """Yields a journal's records in the order they were written."""
+    with gzip.open(path, "rb") as file:
+        while True:
+            try:
+                fields = pickle.load(file)
+            except EOFError:
+                return
+
+            yield JournalRecord(*fields)
+
+
+def read_chains(
+    path: str,
+) -> dict[str, list[tuple[dt.datetime, baseRR.GetOptionChainResponseMessage]]]:
+    """The option chains in a journal per symbol, as (recorded at, chain) pairs for a ReplayedMarket."""
+    chains: dict[
+        str, list[tuple[dt.datetime, baseRR.GetOptionChainResponseMessage]]
+    ] = {}
+
+    for record in read_journal(path):
+        if record.method != "get_option_chain":
+            continue
+
+        chain = record.load_response()
+
+        if chain is not None:
+            chains.setdefault(chain.symbol, []).append((record.recorded_at, chain))
+
+    return chains
@@ -0,0 +1,201 @@
+"""
+A client-side token bucket keeping broker calls inside TD Ameritrade's per-account request budget. Waiting calls are
+served by priority, so placing and cancelling orders go ahead of order status checks, which go ahead of quotes, option
+chains, market hours and account polls.
+
+Every broker sharing a credentials file shares one limiter, the budget belongs to the account rather than the broker
+object.
+
+Classes:
+
+    RateLimitStats
+    RateLimiter
+
+Functions:
+
+    acquire()
+    limiter_for()
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Callable, Iterator
+
+import attr
+
+logger = logging.getLogger("autotrader")
+
+# Priority classes, lower is served first
+PRIORITY_ORDER_ENTRY = 0
+PRIORITY_ORDER_STATUS = 1
+PRIORITY_POLLING = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_ORDER_ENTRY: "order entry",
+    PRIORITY_ORDER_STATUS: "order status",
+    PRIORITY_POLLING: "polling",
+}
+
+# TD Ameritrade allows 120 requests a minute per account
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+DEFAULT_BURST = 4.0
+
+# Waits longer than this are logged
+SLOW_WAIT_SECONDS = 5.0
+
+
+@attr.s(auto_attribs=True)
+class RateLimitStats:
+    """How long calls in one priority class waited for a token."""
+
+    calls: int = 0
+    waited: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.calls if self.calls else 0.0
+
+
+@attr.s(auto_attribs=True)
+class RateLimiter:
+    """A token bucket refilling at requests_per_second up to burst tokens. Waiters are served by priority, then in
+    arrival order, and a call never jumps ahead of a waiting call with a higher priority."""
+
+    requests_per_second: float = attr.ib(
+        default=DEFAULT_REQUESTS_PER_SECOND,
+        validator=attr.validators.instance_of(float),
+    )
+    burst: float = attr.ib(
+        default=DEFAULT_BURST, validator=attr.validators.instance_of(float)
+    )
+    clock: Callable[[], float] = attr.ib(default=time.monotonic)
+    tokens: float = attr.ib(init=False)
+    refilled_at: float = attr.ib(init=False)
+    waiters: list[tuple[int, int]] = attr.ib(factory=list, init=False)
+    counter: Iterator[int] = attr.ib(factory=itertools.count, init=False)
+    stats: dict[int, RateLimitStats] = attr.ib(init=False)
+    condition: threading.Condition = attr.ib(factory=threading.Condition, init=False)
+
+    def __attrs_post_init__(self):
+        self.tokens = self.burst
+        self.refilled_at = self.clock()
+        self.stats = {priority: RateLimitStats() for priority in PRIORITY_NAMES}
+
+    def acquire(self, priority: int = PRIORITY_POLLING) -> float:
+        """Blocks until the call may go out, returning how long it waited."""
+        with self.condition:
+            ticket = (priority, next(self.counter))
+            heapq.heappush(self.waiters, ticket)
+            started = self.clock()
+            blocked = False
+
+            # The previous head may no longer be first in line
+            self.condition.notify_all()
+
+            try:
+                while True:
+                    self.refill()
+
+                    if self.waiters[0] == ticket and self.tokens >= 1:
+                        break
+
+                    blocked = True
+
+                    if self.waiters[0] != ticket:
+                        self.condition.wait()
+                    else:
+                        self.condition.wait(
+                            (1 - self.tokens) / self.requests_per_second
+                        )
+            finally:
+                self.waiters.remove(ticket)
+                heapq.heapify(self.waiters)
+
+            self.tokens -= 1
+            self.condition.notify_all()
+
+            waited = self.clock() - started if blocked else 0.0
+            self.record(priority, waited)
+
+        if waited > SLOW_WAIT_SECONDS:
+            logger.warning(
+                "Rate limited {} call waited {:.1f}s.".format(
+                    PRIORITY_NAMES.get(priority, priority), waited
+                )
+            )
+
+        return waited
+
+    def refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(
+            self.burst,
+            self.tokens + (now - self.refilled_at) * self.requests_per_second,
+        )
+        self.refilled_at = now
+
+    def record(self, priority: int, waited: float) -> None:
+        stats = self.stats.setdefault(priority, RateLimitStats())
+        stats.calls += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+
+        if waited > 0:
+            stats.waited += 1
+
+    def tighten(self, requests_per_second: float, burst: float) -> None:
+        """Lowers the rate and burst to the given ones where they are stricter."""
+        with self.condition:
+            # Tokens earned so far were earned at the old rate
+            self.refill()
+            self.requests_per_second = min(
+                self.requests_per_second, requests_per_second
+            )
+            self.burst = min(self.burst, burst)
+            self.tokens = min(self.tokens, self.burst)
+
+    def queue_depth(self) -> int:
+        """How many calls are waiting for a token."""
+        with self.condition:
+            return len(self.waiters)
+
+
+limiters: dict[str, RateLimiter] = {}
+limiters_lock = threading.Lock()
+
+
+def limiter_for(
+    credentials_path: str,
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    burst: float = DEFAULT_BURST,
+) -> RateLimiter:
+    """The limiter shared by every broker using a credentials file.
+
+    If brokers sharing the file ask for different limits, the strictest rate and burst win.
+    """
+    key = os.path.realpath(credentials_path)
+
+    with limiters_lock:
+        limiter = limiters.get(key)
+
+        if limiter is None:
+            limiter = RateLimiter(requests_per_second, burst)
+            limiters[key] = limiter
+        elif (requests_per_second, burst) != (
+            limiter.requests_per_second,
+            limiter.burst,
+        ):
+            limiter.tighten(requests_per_second, burst)
+            logger.warning(
+                "Brokers sharing {} asked for different rate limits, using {:.2f}/s with a burst of {}.".format(
+                    credentials_path, limiter.requests_per_second, limiter.burst
+                )
+            )
+
+        return limiter
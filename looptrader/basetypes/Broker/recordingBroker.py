@@ -0,0 +1,116 @@
+"""
+Wraps any LoopTrader Broker and journals every call it answers, so a live session can be replayed offline by a
+ReplayBroker.
+
+Classes:
+
+    RecordingBroker
+
+Functions:
+
+    close()
+"""
+
+import logging
+import time
+from typing import Any, Callable, Union
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Broker.abstractBroker import Broker
+from basetypes.Broker.brokerJournal import JournalWriter
+from basetypes.Component.abstractComponent import Component
+from basetypes.Mediator.abstractMediator import Mediator
+
+logger = logging.getLogger("autotrader")
+
+
+@attr.s(auto_attribs=True)
+class RecordingBroker(Broker, Component):
+    """Passes every call through to the wrapped broker, journaling the request and response."""
+
+    broker: Broker = attr.ib(validator=attr.validators.instance_of(Broker))  # type: ignore[misc]
+    path: str = attr.ib(validator=attr.validators.instance_of(str))
+    id: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    client_id: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    redirect_uri: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    account_number: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    credentials_path: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    writer: JournalWriter = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        self.id = self.broker.id
+        self.account_number = self.broker.account_number
+        self.writer = JournalWriter(self.path)
+
+    @property
+    def mediator(self) -> Mediator:
+        return self.broker.mediator
+
+    @mediator.setter
+    def mediator(self, mediator: Mediator) -> None:
+        # The wrapped broker checks the kill switch itself
+        self.broker.mediator = mediator
+
+    def record(self, method: str, func: Callable[[Any], Any], request: Any) -> Any:
+        started = time.perf_counter()
+        response = func(request)
+        duration = time.perf_counter() - started
+
+        try:
+            self.writer.write(method, request, response, duration)
+        except Exception:
+            # A broken journal mustn't stop the bot trading
+            logger.exception("Failed to journal {}.".format(method))
+
+        return response
+
+    def get_account(
+        self, request: baseRR.GetAccountRequestMessage
+    ) -> Union[baseRR.GetAccountResponseMessage, None]:
+        return self.record("get_account", self.broker.get_account, request)
+
+    def place_order(
+        self, request: baseRR.PlaceOrderRequestMessage
+    ) -> Union[baseRR.PlaceOrderResponseMessage, None]:
+        return self.record("place_order", self.broker.place_order, request)
+
+    def cancel_order(
+        self, request: baseRR.CancelOrderRequestMessage
+    ) -> Union[baseRR.CancelOrderResponseMessage, None]:
+        return self.record("cancel_order", self.broker.cancel_order, request)
+
+    def get_option_chain(
+        self, request: baseRR.GetOptionChainRequestMessage
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        return self.record("get_option_chain", self.broker.get_option_chain, request)
+
+    def get_market_hours(
+        self, request: baseRR.GetMarketHoursRequestMessage
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        return self.record("get_market_hours", self.broker.get_market_hours, request)
+
+    def get_order(
+        self, request: baseRR.GetOrderRequestMessage
+    ) -> Union[baseRR.GetOrderResponseMessage, None]:
+        return self.record("get_order", self.broker.get_order, request)
+
+    def get_quote(
+        self, request: baseRR.GetQuoteRequestMessage
+    ) -> Union[baseRR.GetQuoteResponseMessage, None]:
+        return self.record("get_quote", self.broker.get_quote, request)
+
+    def close(self) -> None:
+        """Closes the journal, then the wrapped broker."""
+        self.writer.close()
+        self.broker.close()
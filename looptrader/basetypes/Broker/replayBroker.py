@@ -0,0 +1,177 @@
+"""
+Serves a journal written by a RecordingBroker back to the Bot, so a recorded trading session can be replayed offline
+for profiling and regression benchmarks.
+
+Each call is answered with the response recorded for an equal request, oldest first. Requests that can't match
+exactly, such as ones carrying the current time, fall back to the next unanswered recording of the same call. Calls
+take as long as they did when recorded, divided by the replay speed.
+
+Classes:
+
+    ReplayBroker
+    ReplayStats
+
+Functions:
+
+    get_account()
+    place_order()
+    get_order()
+    cancel_order()
+    get_option_chain()
+    get_market_hours()
+    get_quote()
+"""
+
+import collections
+import logging
+import threading
+import time
+from typing import Any, Callable, Union
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Broker.abstractBroker import Broker
+from basetypes.Broker.brokerJournal import JournalRecord, read_journal, request_key
+from basetypes.Component.abstractComponent import Component
+
+logger = logging.getLogger("autotrader")
+
+
+@attr.s(auto_attribs=True)
+class ReplayStats:
+    """How calls were answered during a replay."""
+
+    exact: int = 0
+    fallback: int = 0
+    missing: int = 0
+
+
+@attr.s(auto_attribs=True)
+class ReplayBroker(Broker, Component):
+    """Answers broker calls from a recorded journal. A speed of 0 replays without any delay."""
+
+    id: str = attr.ib(validator=attr.validators.instance_of(str))
+    path: str = attr.ib(validator=attr.validators.instance_of(str))
+    speed: float = attr.ib(default=1.0, validator=attr.validators.instance_of(float))
+    sleep: Callable[[float], None] = attr.ib(default=time.sleep)
+    client_id: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    redirect_uri: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    account_number: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    credentials_path: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    by_request: dict[tuple[str, str], collections.deque] = attr.ib(
+        factory=dict, init=False
+    )
+    by_method: dict[str, collections.deque] = attr.ib(factory=dict, init=False)
+    answered: set[int] = attr.ib(factory=set, init=False)
+    stats: ReplayStats = attr.ib(factory=ReplayStats, init=False)
+    lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+
+    def __attrs_post_init__(self):
+        for index, record in enumerate(read_journal(self.path)):
+            entry = (index, record)
+            self.by_request.setdefault(
+                (record.method, record.key), collections.deque()
+            ).append(entry)
+            self.by_method.setdefault(record.method, collections.deque()).append(entry)
+
+    def replay(self, method: str, request: Any) -> Any:
+        record = self.next_record(method, request)
+
+        if record is None:
+            logger.error("No recorded {} left to replay.".format(method))
+            return None
+
+        if self.speed > 0:
+            self.sleep(record.duration / self.speed)
+
+        # Unpickled per call, so callers never share a response
+        return record.load_response()
+
+    def next_record(self, method: str, request: Any) -> Union[JournalRecord, None]:
+        with self.lock:
+            exact = self.pop_unanswered(
+                self.by_request.get((method, request_key(request)))
+            )
+
+            if exact is not None:
+                self.stats.exact += 1
+                return exact
+
+            fallback = self.pop_unanswered(self.by_method.get(method))
+
+            if fallback is not None:
+                self.stats.fallback += 1
+                return fallback
+
+            self.stats.missing += 1
+            return None
+
+    def pop_unanswered(
+        self, entries: Union[collections.deque, None]
+    ) -> Union[JournalRecord, None]:
+        """Takes the oldest recording not yet used to answer a call."""
+        while entries:
+            index, record = entries.popleft()
+
+            if index not in self.answered:
+                self.answered.add(index)
+                return record
+
+        return None
+
+    ########
+    # Read #
+    ########
+    def get_account(
+        self, request: baseRR.GetAccountRequestMessage
+    ) -> Union[baseRR.GetAccountResponseMessage, None]:
+        return self.replay("get_account", request)
+
+    def get_order(
+        self, request: baseRR.GetOrderRequestMessage
+    ) -> Union[baseRR.GetOrderResponseMessage, None]:
+        return self.replay("get_order", request)
+
+    def get_option_chain(
+        self, request: baseRR.GetOptionChainRequestMessage
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        return self.replay("get_option_chain", request)
+
+    def get_market_hours(
+        self, request: baseRR.GetMarketHoursRequestMessage
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        return self.replay("get_market_hours", request)
+
+    def get_quote(
+        self, request: baseRR.GetQuoteRequestMessage
+    ) -> Union[baseRR.GetQuoteResponseMessage, None]:
+        return self.replay("get_quote", request)
+
+    ##############
+    # Processors #
+    ##############
+    def place_order(
+        self, request: baseRR.PlaceOrderRequestMessage
+    ) -> Union[baseRR.PlaceOrderResponseMessage, None]:
+        # Check killswitch
+        if self.mediator.killswitch is True:
+            return None
+
+        return self.replay("place_order", request)
+
+    def cancel_order(
+        self, request: baseRR.CancelOrderRequestMessage
+    ) -> Union[baseRR.CancelOrderResponseMessage, None]:
+        # Check killswitch
+        if self.mediator.killswitch is True:
+            return None
+
+        return self.replay("cancel_order", request)
@@ -0,0 +1,239 @@
+"""
+A shared retry policy for Broker calls: exponential backoff with jitter, error classification,
+a rolling retry budget and a circuit breaker.
+
+Classes:
+
+    RetryStats
+    RetryPolicy
+
+Functions:
+
+    execute()
+    classify()
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Union
+
+import attr
+
+logger = logging.getLogger("autotrader")
+
+
+@attr.s(auto_attribs=True)
+class RetryStats:
+    """Counters describing how much work a RetryPolicy has done."""
+
+    calls: int = 0
+    attempts: int = 0
+    retries: int = 0
+    successes: int = 0
+    failures: int = 0
+    fast_failures: int = 0
+    circuit_trips: int = 0
+    time_retrying: float = 0.0
+
+
+@attr.s(auto_attribs=True)
+class RetryPolicy:
+    """Executes broker calls with exponential backoff, a retry budget and a circuit breaker.
+
+    Exceptions in fatal_exceptions are never retried. Non-idempotent calls (e.g. placing an order)
+    are only retried for exceptions in rejected_exceptions, which guarantee the request was not processed.
+    """
+
+    max_attempts: int = attr.ib(default=3, validator=attr.validators.instance_of(int))
+    base_delay: float = attr.ib(
+        default=0.5, validator=attr.validators.instance_of(float)
+    )
+    max_delay: float = attr.ib(
+        default=10.0, validator=attr.validators.instance_of(float)
+    )
+    retry_budget: int = attr.ib(default=20, validator=attr.validators.instance_of(int))
+    budget_window_seconds: float = attr.ib(
+        default=60.0, validator=attr.validators.instance_of(float)
+    )
+    failure_threshold: int = attr.ib(
+        default=5, validator=attr.validators.instance_of(int)
+    )
+    reset_timeout_seconds: float = attr.ib(
+        default=60.0, validator=attr.validators.instance_of(float)
+    )
+    fatal_exceptions: tuple = attr.ib(
+        default=(), validator=attr.validators.instance_of(tuple)
+    )
+    rejected_exceptions: tuple = attr.ib(
+        default=(), validator=attr.validators.instance_of(tuple)
+    )
+    sleep: Callable[[float], None] = attr.ib(default=time.sleep)
+    stats: RetryStats = attr.ib(factory=RetryStats, init=False)
+    consecutive_failures: int = attr.ib(default=0, init=False)
+    opened_at: Union[float, None] = attr.ib(default=None, init=False)
+    trial_in_flight: bool = attr.ib(default=False, init=False)
+    retry_times: deque = attr.ib(factory=deque, init=False)
+    lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+
+    def execute(
+        self, func: Callable[[], Any], description: str, idempotent: bool = True
+    ) -> Union[Any, None]:
+        """Runs func under the policy, returning its result or None if every permitted attempt failed.
+
+        Args:
+            func (Callable[[], Any]): The broker call to make
+            description (str): Description of the call, used for logging
+            idempotent (bool, optional): Whether the call is safe to repeat. Defaults to True.
+
+        Returns:
+            Union[Any, None]: The result of func, or None on failure
+        """
+        with self.lock:
+            self.stats.calls += 1
+
+            if not self.allow_request():
+                self.stats.fast_failures += 1
+                logger.error(
+                    "Circuit open, skipping {}. Retrying after {}s.".format(
+                        description, self.reset_timeout_seconds
+                    )
+                )
+                return None
+
+        error: Union[Exception, None] = None
+
+        for attempt in range(self.max_attempts):
+            with self.lock:
+                self.stats.attempts += 1
+
+            try:
+                result = func()
+            except Exception as e:
+                error = e
+                logger.exception(
+                    "Failed to {}. Attempt #{}".format(description, attempt)
+                )
+
+                if attempt == self.max_attempts - 1 or not self.should_retry(
+                    e, idempotent
+                ):
+                    break
+
+                delay = self.backoff(attempt)
+                with self.lock:
+                    self.stats.retries += 1
+                    self.stats.time_retrying += delay
+                self.sleep(delay)
+                continue
+
+            self.record_success()
+            return result
+
+        # A client error means the broker answered, it says nothing about the broker's health
+        if isinstance(error, self.fatal_exceptions):
+            self.record_rejection()
+        else:
+            self.record_failure()
+
+        return None
+
+    def classify(self, error: Exception, idempotent: bool = True) -> str:
+        """Classifies an error as "RETRY" or "FATAL" for the given call type."""
+        if isinstance(error, self.fatal_exceptions):
+            return "FATAL"
+
+        if not idempotent and not isinstance(error, self.rejected_exceptions):
+            return "FATAL"
+
+        return "RETRY"
+
+    def should_retry(self, error: Exception, idempotent: bool) -> bool:
+        """Checks the error classification and consumes from the retry budget."""
+        if self.classify(error, idempotent) == "FATAL":
+            return False
+
+        with self.lock:
+            now = time.monotonic()
+
+            # Drop retries that have left the budget window
+            while (
+                self.retry_times
+                and now - self.retry_times[0] > self.budget_window_seconds
+            ):
+                self.retry_times.popleft()
+
+            if len(self.retry_times) >= self.retry_budget:
+                logger.error("Retry budget exhausted, not retrying.")
+                return False
+
+            self.retry_times.append(now)
+            return True
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for a given attempt number."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    ###################
+    # Circuit Breaker #
+    ###################
+    def allow_request(self) -> bool:
+        """Closed circuits allow requests, open circuits do not, and half-open circuits allow a single trial request."""
+        if self.opened_at is None:
+            return True
+
+        if self.is_half_open() and not self.trial_in_flight:
+            # Everyone else fails fast until the trial resolves
+            self.trial_in_flight = True
+            return True
+
+        return False
+
+    def is_half_open(self) -> bool:
+        """Whether an open circuit has waited out its reset timeout."""
+        return (
+            self.opened_at is not None
+            and time.monotonic() - self.opened_at >= self.reset_timeout_seconds
+        )
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.stats.successes += 1
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_rejection(self) -> None:
+        """Records a fatal client error, i.e. a rejected order or a 404, which leaves the circuit closed."""
+        with self.lock:
+            self.stats.failures += 1
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.stats.failures += 1
+            self.consecutive_failures += 1
+
+            if self.opened_at is not None:
+                # A failed half-open trial re-opens the circuit
+                self.opened_at = time.monotonic()
+                self.trial_in_flight = False
+            elif self.consecutive_failures >= self.failure_threshold:
+                logger.error(
+                    "Circuit tripped after {} consecutive failures.".format(
+                        self.consecutive_failures
+                    )
+                )
+                self.opened_at = time.monotonic()
+                self.stats.circuit_trips += 1
+
+    def is_open(self) -> bool:
+        """Whether the circuit is currently rejecting requests."""
+        with self.lock:
+            return self.opened_at is not None and (
+                self.trial_in_flight or not self.is_half_open()
+            )
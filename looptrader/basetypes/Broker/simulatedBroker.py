@@ -0,0 +1,723 @@
+"""
+A paper-trading implementation of the generic LoopTrader Broker class, so the Bot can run without TD Ameritrade.
+The account, positions and orders live in memory, prices come from a simulated Market and a local matching engine
+fills limit orders once they are marketable, after a configurable latency and with a configurable probability.
+
+The broker reads the time from its clock on every call, so a simulated clock runs strategies at accelerated speed.
+
+Classes:
+
+    SimulatedBroker
+    WorkingOrder
+    Holding
+
+Functions:
+
+    get_account()
+    place_order()
+    get_order()
+    cancel_order()
+    get_option_chain()
+    get_market_hours()
+    get_quote()
+"""
+
+import collections
+import datetime as dt
+import heapq
+import logging
+import random
+import threading
+from typing import Any, Callable, Union
+
+import attr
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Broker.abstractBroker import Broker
+from basetypes.Broker.simulatedMarket import (
+    EASTERN,
+    Market,
+    SyntheticMarket,
+    expiration_close,
+    parse_option_symbol,
+)
+from basetypes.Component.abstractComponent import Component
+from basetypes.Mediator.strategyScheduler import utc_now
+
+logger = logging.getLogger("autotrader")
+
+OPTION_MULTIPLIER = 100
+
+# Equity quotes are a penny either side of the price
+EQUITY_HALF_SPREAD = 0.01
+
+# Unfilled orders are retried at most this often, even with no fill latency
+MIN_RETRY_SECONDS = 1.0
+
+# How far ahead to look for the next session before letting orders trade anyway
+MAX_CLOSED_DAYS = 14
+
+
+@attr.s(auto_attribs=True)
+class WorkingOrder:
+    """An order waiting on the matching engine, and when it is next tried."""
+
+    order: baseModels.Order
+    next_attempt: dt.datetime
+    expires: Union[dt.datetime, None] = None
+
+
+@attr.s(auto_attribs=True)
+class Holding:
+    """A position in one symbol, negative quantities are short."""
+
+    symbol: str
+    quantity: int
+    averageprice: float
+
+
+@attr.s(auto_attribs=True)
+class SimulatedBroker(Broker, Component):
+    """Simulates a brokerage account locally, with a matching engine that fills orders against a Market's quotes."""
+
+    id: str = attr.ib(validator=attr.validators.instance_of(str))
+    client_id: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    redirect_uri: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    account_number: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    credentials_path: str = attr.ib(
+        default="", validator=attr.validators.instance_of(str), init=False
+    )
+    market: Market = attr.ib(
+        factory=lambda: SyntheticMarket({"$SPX.X": 4500.0, "VGSH": 60.0}),
+        validator=attr.validators.instance_of(Market),
+    )
+    starting_cash: float = attr.ib(
+        default=100000.0, validator=attr.validators.instance_of(float)
+    )
+    fill_latency_seconds: float = attr.ib(
+        default=1.0, validator=attr.validators.instance_of(float)
+    )
+    fill_probability: float = attr.ib(
+        default=1.0, validator=attr.validators.instance_of(float)
+    )
+    # Account snapshots list working orders and orders closed this recently, older orders are read one at a time
+    order_history_seconds: float = attr.ib(
+        default=86400.0, validator=attr.validators.instance_of(float)
+    )
+    clock: Callable[[], dt.datetime] = attr.ib(default=utc_now)
+    seed: int = attr.ib(default=0, validator=attr.validators.instance_of(int))
+    cash: float = attr.ib(default=0.0, init=False)
+    holdings: dict[str, Holding] = attr.ib(factory=dict, init=False)
+    orders: dict[int, baseModels.Order] = attr.ib(factory=dict, init=False)
+    working: dict[int, WorkingOrder] = attr.ib(factory=dict, init=False)
+    # Ids of closed orders in the order they closed, trimmed to the order history window
+    closed: collections.deque[int] = attr.ib(factory=collections.deque, init=False)
+    queue: list[tuple[dt.datetime, int]] = attr.ib(factory=list, init=False)
+    next_order_id: int = attr.ib(default=1, init=False)
+    next_settlement: Union[dt.datetime, None] = attr.ib(default=None, init=False)
+    rng: random.Random = attr.ib(init=False)
+    lock: threading.RLock = attr.ib(factory=threading.RLock, init=False)
+
+    def __attrs_post_init__(self):
+        self.account_number = self.id
+        self.cash = self.starting_cash
+        self.rng = random.Random(self.seed)
+
+    ########
+    # Read #
+    ########
+    def get_account(
+        self, request: baseRR.GetAccountRequestMessage
+    ) -> Union[baseRR.GetAccountResponseMessage, None]:
+        with self.lock:
+            now = self.clock()
+            self.match(now)
+
+            response = baseRR.GetAccountResponseMessage()
+            response.accountnumber = 0
+            response.positions = [
+                self.build_account_position(holding, now)
+                for holding in self.holdings.values()
+            ]
+            response.orders = self.recent_orders(now) if request.orders else []
+            response.currentbalances = self.build_balances(response.positions, now)
+
+            return response
+
+    def recent_orders(self, now: dt.datetime) -> list[baseModels.Order]:
+        """Clones of the working orders and the orders closed within the order history window."""
+        since = now - dt.timedelta(seconds=self.order_history_seconds)
+
+        while self.closed and self.orders[self.closed[0]].close_time < since:
+            self.closed.popleft()
+
+        return [
+            self.clone_order(self.orders[order_id])
+            for order_id in sorted(self.working.keys() | set(self.closed))
+            if self.orders[order_id].status == "WORKING"
+            or self.orders[order_id].close_time >= since
+        ]
+
+    def get_order(
+        self, request: baseRR.GetOrderRequestMessage
+    ) -> Union[baseRR.GetOrderResponseMessage, None]:
+        with self.lock:
+            self.match(self.clock())
+
+            order = self.orders.get(request.orderid)
+
+            if order is None:
+                logger.error("Order {} not found.".format(request.orderid))
+                return None
+
+            response = baseRR.GetOrderResponseMessage()
+            response.order = self.clone_order(order)
+            response.order.strategy_id = request.strategy_id
+
+            return response
+
+    def get_option_chain(
+        self, request: baseRR.GetOptionChainRequestMessage
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        with self.lock:
+            now = self.clock()
+            self.match(now)
+
+            return self.market.get_option_chain(request, now)
+
+    def get_quote(
+        self, request: baseRR.GetQuoteRequestMessage
+    ) -> Union[baseRR.GetQuoteResponseMessage, None]:
+        with self.lock:
+            now = self.clock()
+            self.match(now)
+
+            response = baseRR.GetQuoteResponseMessage()
+            response.instruments = []
+
+            for symbol in request.instruments:
+                quote = self.quote(symbol, now)
+
+                if quote is None:
+                    logger.error("No quote for {}.".format(symbol))
+                    continue
+
+                bid, ask = quote
+
+                instrument = baseRR.Instrument()
+                instrument.symbol = symbol
+                instrument.bidPrice = bid
+                instrument.bidSize = 1.0
+                instrument.askPrice = ask
+                instrument.askSize = 1.0
+                instrument.lastPrice = (bid + ask) / 2
+                instrument.openPrice = instrument.lastPrice
+                instrument.highPrice = instrument.lastPrice
+                instrument.lowPrice = instrument.lastPrice
+                instrument.closePrice = instrument.lastPrice
+                instrument.volatility = 0.0
+                response.instruments.append(instrument)
+
+            return response
+
+    def get_market_hours(
+        self, request: baseRR.GetMarketHoursRequestMessage
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        """The market's regular session on the requested day."""
+        response = baseRR.GetMarketHoursResponseMessage()
+        day = request.datetime.date()
+        session = self.market.market_hours(day)
+
+        if session is None:
+            midnight = dt.datetime.combine(day, dt.time(), dt.timezone.utc)
+            response.start = midnight
+            response.end = midnight
+            response.isopen = False
+            return response
+
+        response.start, response.end = session
+        response.isopen = True
+
+        return response
+
+    def liquidation_value(self) -> float:
+        """Cash plus every holding marked at its mid, without building an account response."""
+        with self.lock:
+            now = self.clock()
+            self.match(now)
+
+            return self.cash + sum(
+                holding.quantity
+                * self.mark(holding, now)
+                * self.multiplier(holding.symbol)
+                for holding in self.holdings.values()
+            )
+
+    ##############
+    # Processors #
+    ##############
+    def place_order(
+        self, request: baseRR.PlaceOrderRequestMessage
+    ) -> Union[baseRR.PlaceOrderResponseMessage, None]:
+        """Accepts an order into the matching engine, it can fill no sooner than the fill latency."""
+
+        # Check killswitch
+        if self.mediator.killswitch is True:
+            return None
+
+        # Validate the request
+        if request is None:
+            logger.error("Order is None")
+            raise KeyError("Order is None")
+
+        if not request.order.legs:
+            logger.error("Order has no legs.")
+            return None
+
+        with self.lock:
+            now = self.clock()
+            self.match(now)
+
+            order = self.clone_order(request.order)
+            order.id = None
+            order.order_id = self.next_order_id
+            order.account_id = 0
+            order.status = "WORKING"
+            order.entered_time = now
+            order.cancelable = True
+            order.editable = False
+            order.quantity = self.order_quantity(request.order)
+            order.filled_quantity = 0
+            order.remaining_quantity = order.quantity
+            order.activities = []
+
+            for leg_id, leg in enumerate(order.legs, start=1):
+                leg.leg_id = leg_id
+                leg.order_id = order.order_id
+
+            self.next_order_id += 1
+            self.orders[order.order_id] = order
+
+            expires = (
+                expiration_close(now.astimezone(EASTERN).date())
+                if getattr(request.order, "duration", None) == "DAY"
+                else None
+            )
+            self.schedule(
+                WorkingOrder(
+                    order,
+                    now + dt.timedelta(seconds=self.fill_latency_seconds),
+                    expires,
+                )
+            )
+
+            # Without latency the order can fill straight away
+            self.match(now)
+
+            logger.info("Order {} Placed".format(order.order_id))
+
+            response = baseRR.PlaceOrderResponseMessage()
+            response.order_id = order.order_id
+
+            return response
+
+    def cancel_order(
+        self, request: baseRR.CancelOrderRequestMessage
+    ) -> Union[baseRR.CancelOrderResponseMessage, None]:
+        """Cancels a given order ID."""
+
+        # Check killswitch
+        if self.mediator.killswitch is True:
+            return None
+
+        with self.lock:
+            self.match(self.clock())
+
+            working = self.working.pop(request.orderid, None)
+
+            if working is None:
+                logger.error("Order {} is not working.".format(request.orderid))
+                return None
+
+            self.close_order(working.order, "CANCELED")
+
+            response = baseRR.CancelOrderResponseMessage()
+            response.responsecode = "200"
+
+            return response
+
+    ###################
+    # Matching Engine #
+    ###################
+    def schedule(self, working: WorkingOrder) -> None:
+        self.working[working.order.order_id] = working
+        heapq.heappush(self.queue, (working.next_attempt, working.order.order_id))
+
+        for leg in working.order.legs:
+            contract = parse_option_symbol(leg.symbol)
+
+            if contract is not None:
+                self.watch_expiration(expiration_close(contract[1]))
+
+    def watch_expiration(self, close: dt.datetime) -> None:
+        if self.next_settlement is None or close < self.next_settlement:
+            self.next_settlement = close
+
+    def match(self, now: dt.datetime) -> None:
+        """Settles expired options, then tries every order due an attempt, only the due orders are examined."""
+        self.settle_expirations(now)
+
+        while self.queue and self.queue[0][0] <= now:
+            attempt, order_id = heapq.heappop(self.queue)
+            working = self.working.get(order_id)
+
+            # Cancelled, filled or rescheduled since this entry was queued
+            if working is None or working.next_attempt != attempt:
+                continue
+
+            if working.expires is not None and working.expires <= attempt:
+                del self.working[order_id]
+                self.close_order(working.order, "EXPIRED")
+                continue
+
+            # Regular session orders wait for the market to open
+            opens = self.next_open(now)
+
+            if opens > now and getattr(working.order, "session", None) == "NORMAL":
+                working.next_attempt = opens
+                heapq.heappush(self.queue, (opens, order_id))
+                continue
+
+            fill = self.fill_prices(working.order, now)
+
+            # One draw per retry interval, so the fill probability doesn't depend on how often we're polled
+            if fill is not None and self.rng.random() < self.fill_probability:
+                del self.working[order_id]
+                self.fill(working.order, fill, now)
+                continue
+
+            working.next_attempt = now + dt.timedelta(
+                seconds=max(self.fill_latency_seconds, MIN_RETRY_SECONDS)
+            )
+            heapq.heappush(self.queue, (working.next_attempt, order_id))
+
+    def next_open(self, now: dt.datetime) -> dt.datetime:
+        """Now if the market is open, otherwise when its next session starts."""
+        day = now.astimezone(EASTERN).date()
+
+        for offset in range(MAX_CLOSED_DAYS):
+            session = self.market.market_hours(day + dt.timedelta(days=offset))
+
+            if session is not None and now < session[1]:
+                return max(session[0], now)
+
+        return now
+
+    def fill_prices(
+        self, order: baseModels.Order, now: dt.datetime
+    ) -> Union[list[float], None]:
+        """The price of each leg if the order is marketable now, otherwise None.
+
+        Limit orders fill at their limit, with any difference from the natural price taken on the first leg.
+        """
+        quantity = order.quantity
+        prices = []
+        natural = 0.0
+
+        for leg in order.legs:
+            quote = self.quote(leg.symbol, now)
+
+            if quote is None:
+                return None
+
+            sign = self.leg_sign(leg)
+            price = quote[1] if sign > 0 else quote[0]
+            prices.append(price)
+
+            # Cash received per unit of the order
+            natural -= sign * leg.quantity / quantity * price
+
+        if order.order_type == "MARKET" or getattr(order, "price", None) is None:
+            return prices
+
+        limit = float(order.price)
+
+        if order.order_type == "NET_CREDIT" or (
+            order.order_type == "LIMIT" and self.leg_sign(order.legs[0]) < 0
+        ):
+            target = limit
+        else:
+            target = -limit
+
+        if natural < target - 1e-9:
+            return None
+
+        first = order.legs[0]
+        prices[0] += (natural - target) / (
+            self.leg_sign(first) * first.quantity / quantity
+        )
+
+        return [round(price, 4) for price in prices]
+
+    def fill(
+        self, order: baseModels.Order, prices: list[float], now: dt.datetime
+    ) -> None:
+        """Books the fill against cash and positions and records the execution on the order."""
+        activity = baseModels.OrderActivity()
+        activity.id = None
+        activity.activity_type = "EXECUTION"
+        activity.execution_type = "FILL"
+        activity.quantity = order.quantity
+        activity.order_remaining_quantity = 0
+        activity.order_id = order.order_id
+        activity.execution_legs = []
+
+        for leg, price in zip(order.legs, prices):
+            quantity = self.leg_sign(leg) * leg.quantity
+            self.cash -= quantity * price * self.multiplier(leg.symbol)
+            self.book(leg.symbol, quantity, price)
+
+            execution_leg = baseModels.ExecutionLeg()
+            execution_leg.id = None
+            execution_leg.leg_id = leg.leg_id
+            execution_leg.quantity = leg.quantity
+            execution_leg.mismarked_quantity = 0
+            execution_leg.price = price
+            execution_leg.time = now
+            activity.execution_legs.append(execution_leg)
+
+        order.activities.append(activity)
+        order.filled_quantity = order.quantity
+        order.remaining_quantity = 0
+
+        if order.order_type == "MARKET":
+            order.price = abs(
+                sum(
+                    self.leg_sign(leg) * leg.quantity / order.quantity * price
+                    for leg, price in zip(order.legs, prices)
+                )
+            )
+
+        self.close_order(order, "FILLED", now)
+
+    def book(self, symbol: str, quantity: int, price: float) -> None:
+        holding = self.holdings.get(symbol)
+
+        if holding is None:
+            self.holdings[symbol] = Holding(symbol, quantity, price)
+            return
+
+        total = holding.quantity + quantity
+
+        if total == 0:
+            del self.holdings[symbol]
+        elif (holding.quantity > 0) == (quantity > 0):
+            holding.averageprice = (
+                holding.averageprice * holding.quantity + price * quantity
+            ) / total
+        elif (holding.quantity > 0) != (total > 0):
+            # Flipped from long to short or back, the remainder opened at this price
+            holding.averageprice = price
+
+        holding.quantity = total
+
+    def settle_expirations(self, now: dt.datetime) -> None:
+        """Closes option positions and orders past their expiration, positions settle in cash at intrinsic value.
+
+        Only runs once the earliest expiration held or worked has passed, so most calls don't scan anything.
+        """
+        if self.next_settlement is None or now < self.next_settlement:
+            return
+
+        self.next_settlement = None
+
+        for symbol in list(self.holdings):
+            contract = parse_option_symbol(symbol)
+
+            if contract is None:
+                continue
+
+            close = expiration_close(contract[1])
+
+            if close > now:
+                self.watch_expiration(close)
+                continue
+
+            underlying, _, putcall, strike = contract
+            price = self.market.underlying_price(underlying, now)
+
+            if price is None:
+                continue
+
+            intrinsic = max(strike - price if putcall == "PUT" else price - strike, 0)
+            holding = self.holdings.pop(symbol)
+            self.cash += holding.quantity * intrinsic * OPTION_MULTIPLIER
+
+        for order_id, working in list(self.working.items()):
+            for leg in working.order.legs:
+                contract = parse_option_symbol(leg.symbol)
+
+                if contract is None:
+                    continue
+
+                close = expiration_close(contract[1])
+
+                if close > now:
+                    self.watch_expiration(close)
+                    continue
+
+                del self.working[order_id]
+                self.close_order(working.order, "EXPIRED")
+                break
+
+    def close_order(
+        self,
+        order: baseModels.Order,
+        status: str,
+        now: Union[dt.datetime, None] = None,
+    ) -> None:
+        order.status = status
+        order.cancelable = False
+        order.close_time = now if now is not None else self.clock()
+        self.closed.append(order.order_id)
+
+    ###########
+    # Helpers #
+    ###########
+    def quote(self, symbol: str, now: dt.datetime) -> Union[tuple[float, float], None]:
+        if parse_option_symbol(symbol) is not None:
+            return self.market.option_quote(symbol, now)
+
+        price = self.market.underlying_price(symbol, now)
+
+        if price is None:
+            return None
+
+        return (
+            round(price - EQUITY_HALF_SPREAD, 2),
+            round(price + EQUITY_HALF_SPREAD, 2),
+        )
+
+    def mark(self, holding: Holding, now: dt.datetime) -> float:
+        """The holding's mid, or its average price when it can't be quoted."""
+        quote = self.quote(holding.symbol, now)
+
+        return (quote[0] + quote[1]) / 2 if quote is not None else holding.averageprice
+
+    @staticmethod
+    def leg_sign(leg: baseModels.OrderLeg) -> int:
+        """+1 for legs that buy, -1 for legs that sell."""
+        return 1 if str(leg.instruction).upper().startswith("BUY") else -1
+
+    @staticmethod
+    def multiplier(symbol: str) -> int:
+        return OPTION_MULTIPLIER if parse_option_symbol(symbol) is not None else 1
+
+    @staticmethod
+    def order_quantity(order: baseModels.Order) -> int:
+        quantity = getattr(order, "quantity", None)
+
+        return quantity if quantity else order.legs[0].quantity
+
+    @classmethod
+    def clone_order(cls, order: baseModels.Order) -> baseModels.Order:
+        """Copies an order and its children, so callers never share the broker's own objects."""
+        clone = cls.copy_fields(order, baseModels.Order(), ("legs", "activities"))
+        clone.legs = [
+            cls.copy_fields(leg, baseModels.OrderLeg()) for leg in order.legs or []
+        ]
+        clone.activities = []
+
+        for activity in getattr(order, "activities", None) or []:
+            activity_clone = cls.copy_fields(
+                activity, baseModels.OrderActivity(), ("execution_legs",)
+            )
+            activity_clone.execution_legs = [
+                cls.copy_fields(execution_leg, baseModels.ExecutionLeg())
+                for execution_leg in activity.execution_legs or []
+            ]
+            clone.activities.append(activity_clone)
+
+        return clone
+
+    @staticmethod
+    def copy_fields(source: Any, target: Any, skip: tuple[str, ...] = ()) -> Any:
+        for field in attr.fields(type(source)):
+            if field.name not in skip and hasattr(source, field.name):
+                setattr(target, field.name, getattr(source, field.name))
+
+        return target
+
+    ############
+    # Builders #
+    ############
+    def build_account_position(
+        self, holding: Holding, now: dt.datetime
+    ) -> baseRR.AccountPosition:
+        position = baseRR.AccountPosition()
+        position.symbol = holding.symbol
+        position.longquantity = max(holding.quantity, 0)
+        position.shortquantity = max(-holding.quantity, 0)
+        position.averageprice = holding.averageprice
+        position.currentdayprofitloss = 0.0
+        position.currentdayprofitlosspercentage = 0.0
+
+        position.marketvalue = (
+            holding.quantity * self.mark(holding, now) * self.multiplier(holding.symbol)
+        )
+
+        contract = parse_option_symbol(holding.symbol)
+
+        if contract is None:
+            position.assettype = "EQUITY"
+            position.description = holding.symbol
+            position.underlyingsymbol = holding.symbol
+            position.strikeprice = 1
+            return position
+
+        underlying, expiration, putcall, strike = contract
+        position.assettype = "OPTION"
+        position.putcall = putcall
+        position.strikeprice = strike
+        position.underlyingsymbol = underlying
+        position.expirationdate = dt.datetime.combine(expiration, dt.time())
+        position.description = "{} {} {:g} {}".format(
+            underlying, expiration.strftime("%b %d %Y"), strike, putcall.capitalize()
+        )
+
+        return position
+
+    def build_balances(
+        self, positions: list[baseRR.AccountPosition], now: dt.datetime
+    ) -> baseRR.AccountBalance:
+        """Liquidation value marks positions at the mid, buying power holds cash against short options."""
+        balances = baseRR.AccountBalance()
+        balances.liquidationvalue = self.cash + sum(
+            position.marketvalue for position in positions
+        )
+
+        requirement = 0.0
+
+        for position in positions:
+            if position.assettype != "OPTION" or not position.shortquantity:
+                continue
+
+            if position.putcall == "PUT":
+                collateral = position.strikeprice
+            else:
+                collateral = (
+                    self.market.underlying_price(position.underlyingsymbol, now)
+                    or position.strikeprice
+                )
+
+            requirement += position.shortquantity * collateral * OPTION_MULTIPLIER
+
+        balances.buyingpower = self.cash - requirement
+
+        return balances
@@ -0,0 +1,541 @@
+"""
+Market data for the simulated broker. A Market prices underlyings and option contracts at a point in time and builds
+option chains, either synthetically or by replaying recorded chains.
+
+Classes:
+
+    Market
+    SyntheticMarket
+    ReplayedMarket
+
+Functions:
+
+    option_symbol()
+    parse_option_symbol()
+    expiration_close()
+    underlying_price()
+    option_quote()
+    get_option_chain()
+    market_hours()
+"""
+
+import abc
+import bisect
+import datetime as dt
+import functools
+import math
+import random
+from typing import Union
+from zoneinfo import ZoneInfo
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+import numpy as np
+from basetypes.Broker.brokerJournal import read_chains
+from basetypes.Mediator.columnarChain import ColumnarExpirationDate, as_columnar
+from basetypes.Strategy import helpers
+from scipy.special import ndtr
+
+EASTERN = ZoneInfo("America/New_York")
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+
+# Quote in whole nickels, like most index options
+TICK = 0.05
+
+STRIKE_STEPS = [0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0]
+
+
+@functools.lru_cache(maxsize=65536)
+def option_symbol(
+    underlying: str, expiration: dt.date, putcall: str, strike: float
+) -> str:
+    """Builds a TDA style option symbol, i.e. SPX_011422P4500."""
+    return "{}_{}{}{:g}".format(
+        underlying, expiration.strftime("%m%d%y"), putcall[0], strike
+    )
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_option_symbol(symbol: str) -> Union[tuple[str, dt.date, str, float], None]:
+    """Splits a TDA style option symbol into its underlying, expiration, PUT/CALL and strike, None for other symbols."""
+    underlying, separator, contract = symbol.partition("_")
+
+    if not separator or len(contract) < 8 or contract[6] not in "PC":
+        return None
+
+    try:
+        expiration = dt.datetime.strptime(contract[:6], "%m%d%y").date()
+        strike = float(contract[7:])
+    except ValueError:
+        return None
+
+    return underlying, expiration, "PUT" if contract[6] == "P" else "CALL", strike
+
+
+@functools.lru_cache(maxsize=4096)
+def expiration_close(expiration: dt.date) -> dt.datetime:
+    """When an option expiring on a date stops trading, the 4pm Eastern close, in UTC."""
+    return dt.datetime.combine(expiration, dt.time(16), EASTERN).astimezone(
+        dt.timezone.utc
+    )
+
+
+class Market(abc.ABC):
+    """Prices the simulated broker's instruments at a point in time."""
+
+    @abc.abstractmethod
+    def underlying_price(self, symbol: str, now: dt.datetime) -> Union[float, None]:
+        raise NotImplementedError(
+            "Each market must implement the 'underlying_price' method."
+        )
+
+    @abc.abstractmethod
+    def option_quote(
+        self, symbol: str, now: dt.datetime
+    ) -> Union[tuple[float, float], None]:
+        """The (bid, ask) of an option contract."""
+        raise NotImplementedError(
+            "Each market must implement the 'option_quote' method."
+        )
+
+    @abc.abstractmethod
+    def get_option_chain(
+        self, request: baseRR.GetOptionChainRequestMessage, now: dt.datetime
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        raise NotImplementedError(
+            "Each market must implement the 'get_option_chain' method."
+        )
+
+    def market_hours(
+        self, day: dt.date
+    ) -> Union[tuple[dt.datetime, dt.datetime], None]:
+        """The regular session on a day in UTC, 9:30am to 4pm Eastern every weekday, or None if closed. Holidays
+        are not simulated."""
+        if day.weekday() >= 5:
+            return None
+
+        start = dt.datetime.combine(day, dt.time(9, 30), EASTERN)
+
+        return start.astimezone(dt.timezone.utc), expiration_close(day)
+
+
+@attr.s(auto_attribs=True)
+class SyntheticMarket(Market):
+    """Underlyings follow a seeded geometric random walk, options are Black priced off a volatility smile.
+
+    Every weekday is an expiration, strikes are spaced around the current price and quotes are rounded to nickels,
+    with a spread proportional to the option's price.
+    """
+
+    underlyings: dict[str, float] = attr.ib(validator=attr.validators.instance_of(dict))
+    volatility: float = attr.ib(
+        default=0.2, validator=attr.validators.instance_of(float)
+    )
+    skew: float = attr.ib(default=0.6, validator=attr.validators.instance_of(float))
+    rate: float = attr.ib(default=0.02, validator=attr.validators.instance_of(float))
+    spread_percent: float = attr.ib(
+        default=0.02, validator=attr.validators.instance_of(float)
+    )
+    strikes_per_side: int = attr.ib(
+        default=50, validator=attr.validators.instance_of(int)
+    )
+    seed: int = attr.ib(default=0, validator=attr.validators.instance_of(int))
+    prices: dict[str, tuple[dt.datetime, float]] = attr.ib(factory=dict, init=False)
+    rng: random.Random = attr.ib(init=False)
+    # Chains and quotes priced at the current time, strategies and orders polling together share them
+    chains: dict[tuple, baseRR.GetOptionChainResponseMessage] = attr.ib(
+        factory=dict, init=False
+    )
+    quotes: dict[str, Union[tuple[float, float], None]] = attr.ib(
+        factory=dict, init=False
+    )
+    priced_at: Union[dt.datetime, None] = attr.ib(default=None, init=False)
+
+    def __attrs_post_init__(self):
+        self.rng = random.Random(self.seed)
+
+    def underlying_price(self, symbol: str, now: dt.datetime) -> Union[float, None]:
+        """Walks the symbol's price forward to now, prices never move backwards in time."""
+        if symbol not in self.underlyings:
+            return None
+
+        last = self.prices.get(symbol)
+
+        if last is None:
+            self.prices[symbol] = (now, self.underlyings[symbol])
+            return self.underlyings[symbol]
+
+        then, price = last
+        years = (now - then).total_seconds() / SECONDS_PER_YEAR
+
+        if years <= 0:
+            return price
+
+        price *= math.exp(
+            -0.5 * self.volatility ** 2 * years
+            + self.volatility * math.sqrt(years) * self.rng.gauss(0.0, 1.0)
+        )
+        self.prices[symbol] = (now, price)
+
+        return price
+
+    def option_quote(
+        self, symbol: str, now: dt.datetime
+    ) -> Union[tuple[float, float], None]:
+        self.reprice(now)
+
+        if symbol not in self.quotes:
+            self.quotes[symbol] = self.price_option(symbol, now)
+
+        return self.quotes[symbol]
+
+    def price_option(
+        self, symbol: str, now: dt.datetime
+    ) -> Union[tuple[float, float], None]:
+        contract = parse_option_symbol(symbol)
+
+        if contract is None:
+            return None
+
+        underlying, expiration, putcall, strike = contract
+        price = self.underlying_price(underlying, now)
+
+        if price is None:
+            return None
+
+        years = self.years_to_expiration(expiration, now)
+
+        # Expired contracts trade at intrinsic value
+        if years <= 0:
+            intrinsic = max(strike - price if putcall == "PUT" else price - strike, 0)
+            return intrinsic, intrinsic
+
+        bids, asks, _ = self.price_contracts(
+            price, np.array([strike]), years, putcall == "PUT"
+        )
+
+        return float(bids[0]), float(asks[0])
+
+    def get_option_chain(
+        self, request: baseRR.GetOptionChainRequestMessage, now: dt.datetime
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        self.reprice(now)
+
+        key = (
+            request.symbol,
+            request.contracttype,
+            request.fromdate,
+            request.todate,
+            request.columnar,
+        )
+        chain = self.chains.get(key)
+
+        if chain is None:
+            chain = self.build_chain(request, now)
+
+            if chain is not None:
+                self.chains[key] = chain
+
+        return chain
+
+    def reprice(self, now: dt.datetime) -> None:
+        """Drops chains and quotes priced at any other time."""
+        if now != self.priced_at:
+            self.chains.clear()
+            self.quotes.clear()
+            self.priced_at = now
+
+    def build_chain(
+        self, request: baseRR.GetOptionChainRequestMessage, now: dt.datetime
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        price = self.underlying_price(request.symbol, now)
+
+        if price is None:
+            return None
+
+        response = baseRR.GetOptionChainResponseMessage()
+        response.symbol = request.symbol
+        response.status = "SUCCESS"
+        response.underlyinglastprice = price
+        # TDA reports volatility as a percentage
+        response.volatility = self.volatility * 100
+        response.putexpdatemap = []
+        response.callexpdatemap = []
+
+        step = self.strike_step(price)
+        center = round(price / step) * step
+        strikes = center + step * np.arange(
+            -self.strikes_per_side, self.strikes_per_side + 1
+        )
+        strikes = strikes[strikes > 0]
+
+        today = now.astimezone(EASTERN).date()
+        expiration = max(request.fromdate, today)
+
+        while expiration <= request.todate:
+            years = self.years_to_expiration(expiration, now)
+
+            if expiration.weekday() < 5 and years > 0:
+                for putcall, expirations in (
+                    ("PUT", response.putexpdatemap),
+                    ("CALL", response.callexpdatemap),
+                ):
+                    if request.contracttype in (putcall, "ALL"):
+                        expirations.append(
+                            self.build_expiration(
+                                request,
+                                price,
+                                strikes,
+                                expiration,
+                                (expiration - today).days,
+                                years,
+                                putcall,
+                            )
+                        )
+
+            expiration += dt.timedelta(days=1)
+
+        return response
+
+    def build_expiration(
+        self,
+        request: baseRR.GetOptionChainRequestMessage,
+        price: float,
+        strikes: np.ndarray,
+        expiration: dt.date,
+        daystoexpiration: int,
+        years: float,
+        putcall: str,
+    ) -> Union[
+        baseRR.GetOptionChainResponseMessage.ExpirationDate, ColumnarExpirationDate
+    ]:
+        """Builds one expiration from raw TDA style contracts, so it matches what TdaBroker returns."""
+        bids, asks, deltas = self.price_contracts(
+            price, strikes, years, putcall == "PUT"
+        )
+        description = "{} {} {{:g}} {}".format(
+            request.symbol, expiration.strftime("%b %d %Y"), putcall.capitalize()
+        )
+
+        contracts = [
+            {
+                "strikePrice": float(strike),
+                "multiplier": 100.0,
+                "bid": float(bid),
+                "ask": float(ask),
+                "delta": float(delta),
+                "gamma": 0.0,
+                "theta": 0.0,
+                "vega": 0.0,
+                "rho": 0.0,
+                "symbol": option_symbol(request.symbol, expiration, putcall, strike),
+                "description": description.format(strike),
+                "putCall": putcall,
+                "settlementType": "P",
+                "expirationType": "W",
+            }
+            for strike, bid, ask, delta in zip(strikes, bids, asks, deltas)
+        ]
+
+        columnar = ColumnarExpirationDate.from_contracts(
+            dt.datetime.combine(expiration, dt.time()), daystoexpiration, contracts
+        )
+
+        if request.columnar:
+            return columnar
+
+        legacy = baseRR.GetOptionChainResponseMessage.ExpirationDate()
+        legacy.expirationdate = columnar.expirationdate
+        legacy.daystoexpiration = daystoexpiration
+        legacy.strikes = columnar.strikes
+
+        return legacy
+
+    def price_contracts(
+        self, price: float, strikes: np.ndarray, years: float, is_put: bool
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Bids, asks and deltas for a set of strikes."""
+        vols = self.volatility + self.skew * ((strikes - price) / price) ** 2
+        mids = helpers.black_price(price, strikes, self.rate, years, is_put, vols)
+
+        half_spread = np.maximum(mids * self.spread_percent / 2, TICK / 2)
+        bids = np.maximum(np.floor((mids - half_spread) / TICK) * TICK, 0.0)
+        asks = np.maximum(np.ceil((mids + half_spread) / TICK) * TICK, TICK)
+
+        d1 = (np.log(price / strikes) + 0.5 * vols ** 2 * years) / (
+            vols * math.sqrt(years)
+        )
+        deltas = ndtr(d1) - 1 if is_put else ndtr(d1)
+
+        return np.round(bids, 2), np.round(asks, 2), deltas
+
+    @staticmethod
+    def years_to_expiration(expiration: dt.date, now: dt.datetime) -> float:
+        return (expiration_close(expiration) - now).total_seconds() / SECONDS_PER_YEAR
+
+    @staticmethod
+    def strike_step(price: float) -> float:
+        """Strikes about a quarter percent apart, on a round step."""
+        target = price * 0.0025
+
+        for step in STRIKE_STEPS:
+            if step >= target:
+                return step
+
+        return STRIKE_STEPS[-1]
+
+
+@attr.s(auto_attribs=True)
+class ReplayedMarket(Market):
+    """Serves recorded option chains, each request gets the latest chain recorded at or before the current time.
+
+    Option quotes and underlying prices are read from the same chains.
+    """
+
+    # Recorded chains per symbol, as (recorded at, chain) pairs
+    chains: dict[
+        str, list[tuple[dt.datetime, baseRR.GetOptionChainResponseMessage]]
+    ] = attr.ib(validator=attr.validators.instance_of(dict))
+    # When each symbol's chains were recorded, built once so lookups only bisect
+    times: dict[str, list[dt.datetime]] = attr.ib(factory=dict, init=False)
+    # The last chain read per symbol, with its expirations converted to columnar by (put or call, date)
+    columnar: dict[
+        str,
+        tuple[
+            baseRR.GetOptionChainResponseMessage,
+            dict[tuple[str, dt.date], ColumnarExpirationDate],
+        ],
+    ] = attr.ib(factory=dict, init=False)
+
+    def __attrs_post_init__(self):
+        for symbol, recorded in self.chains.items():
+            recorded.sort(key=lambda snapshot: snapshot[0])
+            self.times[symbol] = [snapshot[0] for snapshot in recorded]
+
+    @classmethod
+    def from_journal(cls, path: str) -> "ReplayedMarket":
+        """Replays the option chains a RecordingBroker journaled."""
+        return cls(read_chains(path))
+
+    def latest_chain(
+        self, symbol: str, now: dt.datetime
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        recorded = self.chains.get(symbol)
+
+        if not recorded:
+            return None
+
+        index = bisect.bisect_right(self.times[symbol], now)
+
+        return recorded[index - 1][1] if index > 0 else None
+
+    def columnar_expirations(
+        self, symbol: str, chain: baseRR.GetOptionChainResponseMessage
+    ) -> dict[tuple[str, dt.date], ColumnarExpirationDate]:
+        """A chain's expirations by (put or call, date), converted to columnar once per chain."""
+        cached = self.columnar.get(symbol)
+
+        if cached is not None and cached[0] is chain:
+            return cached[1]
+
+        expirations = {}
+
+        for putcall, recorded in (
+            ("PUT", chain.putexpdatemap),
+            ("CALL", chain.callexpdatemap),
+        ):
+            for expiration in recorded:
+                expirations[(putcall, expiration.expirationdate.date())] = as_columnar(
+                    expiration
+                )
+
+        # Time only moves forward, so only the latest chain is kept
+        self.columnar[symbol] = (chain, expirations)
+
+        return expirations
+
+    def underlying_price(self, symbol: str, now: dt.datetime) -> Union[float, None]:
+        chain = self.latest_chain(symbol, now)
+
+        return None if chain is None else chain.underlyinglastprice
+
+    def option_quote(
+        self, symbol: str, now: dt.datetime
+    ) -> Union[tuple[float, float], None]:
+        contract = parse_option_symbol(symbol)
+
+        if contract is None:
+            return None
+
+        underlying, expiration, putcall, strike = contract
+        chain = self.latest_chain(underlying, now)
+
+        if chain is None:
+            return None
+
+        recorded = self.columnar_expirations(underlying, chain).get(
+            (putcall, expiration)
+        )
+
+        if recorded is None:
+            return None
+
+        details = recorded.get(strike)
+
+        return None if details is None else (details.bid, details.ask)
+
+    def get_option_chain(
+        self, request: baseRR.GetOptionChainRequestMessage, now: dt.datetime
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        chain = self.latest_chain(request.symbol, now)
+
+        if chain is None:
+            return None
+
+        response = baseRR.GetOptionChainResponseMessage()
+        response.symbol = chain.symbol
+        response.status = chain.status
+        response.underlyinglastprice = chain.underlyinglastprice
+        response.volatility = chain.volatility
+        response.putexpdatemap = []
+        response.callexpdatemap = []
+
+        for putcall, recorded, expirations in (
+            ("PUT", chain.putexpdatemap, response.putexpdatemap),
+            ("CALL", chain.callexpdatemap, response.callexpdatemap),
+        ):
+            if request.contracttype not in (putcall, "ALL"):
+                continue
+
+            for expiration in recorded:
+                if (
+                    request.fromdate
+                    <= expiration.expirationdate.date()
+                    <= request.todate
+                ):
+                    expirations.append(
+                        self.columnar_expirations(request.symbol, chain)[
+                            (putcall, expiration.expirationdate.date())
+                        ]
+                        if request.columnar
+                        else self.as_legacy(expiration)
+                    )
+
+        return response
+
+    @staticmethod
+    def as_legacy(
+        expiration: Union[
+            baseRR.GetOptionChainResponseMessage.ExpirationDate,
+            ColumnarExpirationDate,
+        ]
+    ) -> baseRR.GetOptionChainResponseMessage.ExpirationDate:
+        if not isinstance(expiration, ColumnarExpirationDate):
+            return expiration
+
+        legacy = baseRR.GetOptionChainResponseMessage.ExpirationDate()
+        legacy.expirationdate = expiration.expirationdate
+        legacy.daystoexpiration = expiration.daystoexpiration
+        legacy.strikes = expiration.strikes
+
+        return legacy
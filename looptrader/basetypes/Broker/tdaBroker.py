@@ -19,15 +19,33 @@ import datetime as dtime
 import logging
 import re
 from collections import OrderedDict
-from typing import Any, Union
+from typing import Any, Callable, Union
 
 import attr
 import basetypes.Mediator.baseModels as baseModels
 import basetypes.Mediator.reqRespTypes as baseRR
 import yaml
 from basetypes.Broker.abstractBroker import Broker
+from basetypes.Broker.rateLimiter import (
+    DEFAULT_REQUESTS_PER_SECOND,
+    PRIORITY_ORDER_ENTRY,
+    PRIORITY_ORDER_STATUS,
+    PRIORITY_POLLING,
+    RateLimiter,
+    limiter_for,
+)
+from basetypes.Broker.retryPolicy import RetryPolicy
+from basetypes.Broker.tdaSession import TdaSessionManager
 from basetypes.Component.abstractComponent import Component
+from basetypes.Mediator.columnarChain import ColumnarExpirationDate
 from td.client import TDClient
+from td.exceptions import (
+    ExdLmtError,
+    ForbidError,
+    GeneralError,
+    NotFndError,
+    NotNulError,
+)
 from td.option_chain import OptionChain
 
 logger = logging.getLogger("autotrader")
@@ -49,8 +67,24 @@ class TdaBroker(Broker, Component):
     maxretries: int = attr.ib(
         default=3, validator=attr.validators.instance_of(int), init=False
     )
+    session_manager: TdaSessionManager = attr.ib(
+        validator=attr.validators.instance_of(TdaSessionManager), init=False
+    )
+    retry_policy: RetryPolicy = attr.ib(
+        validator=attr.validators.instance_of(RetryPolicy), init=False
+    )
+    rate_limiter: RateLimiter = attr.ib(
+        validator=attr.validators.instance_of(RateLimiter), init=False
+    )
 
     def __attrs_post_init__(self):
+        # Client errors won't succeed on retry, rate limiting means the request was never processed
+        self.retry_policy = RetryPolicy(
+            max_attempts=self.maxretries,
+            fatal_exceptions=(NotNulError, ForbidError, NotFndError, GeneralError),
+            rejected_exceptions=(ExdLmtError,),
+        )
+
         with open("config.yaml", "r") as file:
             # Read Brokerage Config
             brokerage_config: dict
@@ -70,6 +104,23 @@ class TdaBroker(Broker, Component):
                             self.account_number = details.get("account")
                             self.redirect_uri = details.get("url")
                             self.credentials_path = details.get("credentials")
+                            self.session_manager = TdaSessionManager(
+                                self.client_id,
+                                self.redirect_uri,
+                                self.account_number,
+                                self.credentials_path,
+                            )
+                            # Brokers on the same account share its request budget
+                            self.rate_limiter = limiter_for(
+                                self.credentials_path,
+                                float(
+                                    details.get(
+                                        "requestsperminute",
+                                        DEFAULT_REQUESTS_PER_SECOND * 60,
+                                    )
+                                )
+                                / 60,
+                            )
                             return
 
             # If no match, raise exception
@@ -92,19 +143,15 @@ class TdaBroker(Broker, Component):
             optionalfields.append("positions")
 
         # Get Account Details
-        for attempt in range(self.maxretries):
-            try:
-                account = self.getsession().get_accounts(
+        account = self.retry_policy.execute(
+            self.throttled(
+                PRIORITY_POLLING,
+                lambda: self.getsession().get_accounts(
                     self.account_number, fields=optionalfields
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to get Account {}. Attempt #{}".format(
-                        self.account_number, attempt
-                    )
-                )
-                if attempt == self.maxretries - 1:
-                    return None
+                ),
+            ),
+            "get Account {}".format(self.account_number),
+        )
 
         if account is None:
             return None
@@ -121,17 +168,15 @@ class TdaBroker(Broker, Component):
     ) -> Union[baseRR.GetOrderResponseMessage, None]:
         """Reads a single order from TDA and returns it's details"""
 
-        for attempt in range(self.maxretries):
-            try:
-                order = self.getsession().get_orders(
+        order = self.retry_policy.execute(
+            self.throttled(
+                PRIORITY_ORDER_STATUS,
+                lambda: self.getsession().get_orders(
                     account=self.account_number, order_id=str(request.orderid)
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to read order {}.".format(str(request.orderid))
-                )
-                if attempt == self.maxretries - 1:
-                    return None
+                ),
+            ),
+            "read order {}".format(str(request.orderid)),
+        )
 
         if order is None:
             return None
@@ -163,19 +208,17 @@ class TdaBroker(Broker, Component):
             logger.exception("Chain Validation Failed. {}".format(optionchainobj))
             return None
 
-        for attempt in range(self.maxretries):
-            try:
-                optionschain = self.getsession().get_options_chain(optionchainrequest)
+        def fetch_chain() -> dict:
+            optionschain = self.getsession().get_options_chain(optionchainrequest)
 
-                if optionschain["status"] == "FAILED":
-                    raise BaseException("Option Chain Status Response = FAILED")
+            if optionschain["status"] == "FAILED":
+                raise Exception("Option Chain Status Response = FAILED")
 
-            except Exception:
-                logger.exception(
-                    "Failed to get Options Chain. Attempt #{}".format(attempt)
-                )
-                if attempt == self.maxretries - 1:
-                    return None
+            return optionschain
+
+        optionschain = self.retry_policy.execute(
+            self.throttled(PRIORITY_POLLING, fetch_chain), "get Options Chain"
+        )
 
         if optionschain is None:
             return None
@@ -187,29 +230,29 @@ class TdaBroker(Broker, Component):
         response.underlyinglastprice = optionschain.get("underlyingPrice", float)
         response.volatility = optionschain.get("volatility", float)
 
-        response.putexpdatemap = self.translate_option_chain(
-            dict(optionschain.get("putExpDateMap"))
-        )
-        response.callexpdatemap = self.translate_option_chain(
-            dict(optionschain.get("callExpDateMap"))
+        # Array-backed chains are much lighter for strategies that scan whole chains
+        translate = (
+            self.translate_option_chain_columnar
+            if request.columnar
+            else self.translate_option_chain
         )
 
+        response.putexpdatemap = translate(dict(optionschain.get("putExpDateMap")))
+        response.callexpdatemap = translate(dict(optionschain.get("callExpDateMap")))
+
         return response
 
     def get_quote(
         self, request: baseRR.GetQuoteRequestMessage
     ) -> Union[None, baseRR.GetQuoteResponseMessage]:
 
-        for attempt in range(self.maxretries):
-            try:
-                quotes = self.getsession().get_quotes(request.instruments)
-                break
-            except Exception:
-                logger.exception(
-                    "Failed to get quotes. Attempt #{}".format(attempt),
-                )
-                if attempt == self.maxretries - 1:
-                    return None
+        quotes = self.retry_policy.execute(
+            self.throttled(
+                PRIORITY_POLLING,
+                lambda: self.getsession().get_quotes(request.instruments),
+            ),
+            "get quotes",
+        )
 
         if quotes is None:
             return None
@@ -238,25 +281,20 @@ class TdaBroker(Broker, Component):
     def get_market_hours(
         self, request: baseRR.GetMarketHoursRequestMessage
     ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
-        """Gets the opening and closing market hours for a given day."""
+        """Gets the opening and closing market hours for a given day. Closed days return isopen=False, failures None."""
 
         markets = [request.market]
 
         # Get Market Hours
-        for attempt in range(self.maxretries):
-            try:
-                hours = self.getsession().get_market_hours(
+        hours = self.retry_policy.execute(
+            self.throttled(
+                PRIORITY_POLLING,
+                lambda: self.getsession().get_market_hours(
                     markets=markets, date=str(request.datetime)
-                )
-                break
-            except Exception:
-                logger.exception(
-                    "Failed to get market hours for {} on {}. Attempt #{}".format(
-                        markets, request.datetime, attempt
-                    ),
-                )
-                if attempt == self.maxretries - 1:
-                    return None
+                ),
+            ),
+            "get market hours for {} on {}".format(markets, request.datetime),
+        )
 
         if hours is None:
             return None
@@ -267,29 +305,37 @@ class TdaBroker(Broker, Component):
             details: dict
             for type, details in markettype.items():
                 if type == request.product:
-                    sessionhours = details.get("sessionHours", dict)
+                    sessionhours = details.get("sessionHours")
 
-                    return self.process_session_hours(sessionhours, details)
+                    if details.get("isOpen") and sessionhours:
+                        return self.process_session_hours(sessionhours, details)
 
-        return None
+        # The market is closed on this day
+        return self.build_closed_market_hours_response(request.datetime)
+
+    def throttled(self, priority: int, func: Callable[[], Any]) -> Callable[[], Any]:
+        """Wraps a call to TDA so every attempt, retries included, waits for the account's rate limiter."""
+
+        def call() -> Any:
+            self.rate_limiter.acquire(priority)
+            return func()
+
+        return call
 
     def getsession(self) -> TDClient:
-        """Generates a TD Client session"""
+        """Returns the broker's long-lived, connection-pooled TD Client session"""
 
-        return TDClient(
-            client_id=self.client_id,
-            redirect_uri=self.redirect_uri,
-            account_number=self.account_number,
-            credentials_path=self.credentials_path,
-        )
+        return self.session_manager.get_client()
 
     def getaccesstoken(self):
         """Retrieves a new access token."""
 
-        try:
-            self.getsession().grab_access_token()
-        except Exception:
-            logger.exception("Failed to get access token.")
+        self.session_manager.refresh_token()
+
+    def close_session(self) -> None:
+        """Closes the pooled TD Client session."""
+
+        self.session_manager.close()
 
     ############
     # Builders #
@@ -379,6 +425,20 @@ class TdaBroker(Broker, Component):
 
         return response
 
+    @staticmethod
+    def build_closed_market_hours_response(
+        date: dtime.datetime,
+    ) -> baseRR.GetMarketHoursResponseMessage:
+        """Builds a Market Hours response Message for a day the market is closed"""
+        response = baseRR.GetMarketHoursResponseMessage()
+
+        midnight = dtime.datetime.combine(date.date(), dtime.time(), dtime.timezone.utc)
+        response.start = midnight
+        response.end = midnight
+        response.isopen = False
+
+        return response
+
     ##############
     # Processors #
     ##############
@@ -426,16 +486,23 @@ class TdaBroker(Broker, Component):
         # Log the Order
         logger.info("Your order being placed is: {} ".format(orderrequest))
 
-        # Place the Order
-        try:
-            orderresponse = self.getsession().place_order(
-                account=self.account_number, order=orderrequest
-            )
-            logger.info("Order {} Placed".format(orderresponse["order_id"]))
-        except Exception:
-            logger.exception("Failed to place order.")
+        # Place the Order, only retrying if TDA rejected it unprocessed
+        orderresponse = self.retry_policy.execute(
+            self.throttled(
+                PRIORITY_ORDER_ENTRY,
+                lambda: self.getsession().place_order(
+                    account=self.account_number, order=orderrequest
+                ),
+            ),
+            "place order",
+            idempotent=False,
+        )
+
+        if orderresponse is None:
             return None
 
+        logger.info("Order {} Placed".format(orderresponse["order_id"]))
+
         response.order_id = orderresponse.get("order_id")
 
         # Return the Order ID
@@ -463,13 +530,18 @@ class TdaBroker(Broker, Component):
         if self.mediator.killswitch is True:
             return None
 
-        try:
-            cancelresponse = self.getsession().cancel_order(
-                account=self.account_number,
-                order_id=str(request.orderid),
-            )
-        except Exception:
-            logger.exception("Failed to cancel order {}.".format(str(request.orderid)))
+        cancelresponse = self.retry_policy.execute(
+            self.throttled(
+                PRIORITY_ORDER_ENTRY,
+                lambda: self.getsession().cancel_order(
+                    account=self.account_number,
+                    order_id=str(request.orderid),
+                ),
+            ),
+            "cancel order {}".format(str(request.orderid)),
+        )
+
+        if cancelresponse is None:
             return None
 
         response = baseRR.CancelOrderResponseMessage()
@@ -542,6 +614,34 @@ class TdaBroker(Broker, Component):
 
         return response
 
+    @staticmethod
+    def translate_option_chain_columnar(
+        rawoptionchain: dict,
+    ) -> list[ColumnarExpirationDate]:
+        """Transforms a TDA option chain dictionary into array-backed LoopTrader expirations"""
+
+        response = []
+
+        expiration: str
+        strikes: dict
+        for expiration, strikes in rawoptionchain.items():
+            exp = expiration.split(":", 1)
+
+            contracts = [
+                detail
+                for details in strikes.values()
+                for detail in details
+                if detail.get("settlementType", str) == "P"
+            ]
+
+            response.append(
+                ColumnarExpirationDate.from_contracts(
+                    dtime.datetime.strptime(exp[0], "%Y-%m-%d"), int(exp[1]), contracts
+                )
+            )
+
+        return response
+
     def translate_account_order_activity(
         self, orderActivity: dict
     ) -> baseModels.OrderActivity:
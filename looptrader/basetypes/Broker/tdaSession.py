@@ -0,0 +1,205 @@
+"""
+Long-lived, connection-pooled TD Ameritrade sessions for the TdaBroker.
+
+Classes:
+
+    PooledTDClient
+    TdaSessionManager
+
+Functions:
+
+    get_client()
+    refresh_token()
+    close()
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Optional, Union
+
+import attr
+import requests
+from requests.adapters import HTTPAdapter
+from td.client import TDClient
+from td.exceptions import (
+    ExdLmtError,
+    ForbidError,
+    GeneralError,
+    NotFndError,
+    NotNulError,
+    ServerError,
+    TknExpError,
+)
+
+logger = logging.getLogger("autotrader")
+
+
+class PooledTDClient(TDClient):
+    """A TDClient that sends every request through one keep-alive HTTP session instead of opening a new one per call."""
+
+    def __init__(
+        self, *args, pool_connections: int = 4, pool_maxsize: int = 10, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+
+        self.http_session = requests.Session()
+        self.http_session.verify = True
+        self.http_session.mount("https://", adapter)
+        self.http_session.mount("http://", adapter)
+
+    def close(self) -> None:
+        """Closes the underlying HTTP session and its pooled connections."""
+        self.http_session.close()
+
+    def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        mode: Optional[str] = None,
+        params: Optional[dict] = None,
+        data: Optional[dict] = None,
+        json: Optional[dict] = None,
+        order_details: bool = False,
+    ) -> Any:
+        """Mirrors TDClient._make_request, but reuses the pooled HTTP session."""
+        url = self._api_endpoint(endpoint=endpoint)
+        headers = self._headers(mode=mode)
+
+        # Make sure the token is valid
+        self.validate_token()
+
+        response = self.http_session.request(
+            method=method.upper(),
+            url=url,
+            headers=headers,
+            params=params,
+            data=data,
+            json=json,
+        )
+
+        if response.ok and order_details:
+            location = response.headers.get("Location", "")
+            order_id = location.split("orders/")[1] if "orders/" in location else ""
+
+            return {
+                "order_id": order_id,
+                "headers": response.headers,
+                "content": response.content,
+                "status_code": response.status_code,
+                "request_body": response.request.body,
+                "request_method": response.request.method,
+            }
+
+        if response.ok:
+            return response.json()
+
+        if response.status_code == 400:
+            raise NotNulError(message=response.text)
+        elif response.status_code == 401:
+            try:
+                self.grab_access_token()
+            except Exception:
+                raise TknExpError(message=response.text)
+        elif response.status_code == 403:
+            raise ForbidError(message=response.text)
+        elif response.status_code == 404:
+            raise NotFndError(message=response.text)
+        elif response.status_code == 429:
+            raise ExdLmtError(message=response.text)
+        elif response.status_code in [500, 503]:
+            raise ServerError(message=response.text)
+        elif response.status_code > 400:
+            raise GeneralError(message=response.text)
+
+        return None
+
+
+@attr.s(auto_attribs=True)
+class TdaSessionManager:
+    """Owns a single PooledTDClient per broker and keeps its access token fresh."""
+
+    client_id: str = attr.ib(validator=attr.validators.instance_of(str))
+    redirect_uri: str = attr.ib(validator=attr.validators.instance_of(str))
+    account_number: str = attr.ib(validator=attr.validators.instance_of(str))
+    credentials_path: str = attr.ib(validator=attr.validators.instance_of(str))
+    api_endpoint: Union[str, None] = attr.ib(
+        default=None,
+        validator=attr.validators.optional(attr.validators.instance_of(str)),
+    )
+    refresh_margin_seconds: int = attr.ib(
+        default=300, validator=attr.validators.instance_of(int)
+    )
+    refresh_retry_seconds: int = attr.ib(
+        default=30, validator=attr.validators.instance_of(int)
+    )
+    pool_maxsize: int = attr.ib(default=10, validator=attr.validators.instance_of(int))
+    last_refresh: float = attr.ib(default=0.0, init=False)
+    client: Union[PooledTDClient, None] = attr.ib(default=None, init=False)
+    lock: threading.RLock = attr.ib(factory=threading.RLock, init=False)
+
+    def get_client(self) -> PooledTDClient:
+        """Returns the shared client, creating it on first use and refreshing the access token before it expires."""
+        with self.lock:
+            if self.client is None:
+                self.client = self.build_client()
+
+            # Refresh ahead of expiry, but don't hammer the token endpoint if it is failing
+            if (
+                self.token_expires_soon()
+                and time.time() - self.last_refresh > self.refresh_retry_seconds
+            ):
+                self.refresh_token()
+
+            return self.client
+
+    def build_client(self) -> PooledTDClient:
+        """Builds a new pooled client, reading the credentials file once."""
+        client = PooledTDClient(
+            client_id=self.client_id,
+            redirect_uri=self.redirect_uri,
+            account_number=self.account_number,
+            credentials_path=self.credentials_path,
+            pool_maxsize=self.pool_maxsize,
+        )
+
+        if self.api_endpoint is not None:
+            client.config["api_endpoint"] = self.api_endpoint
+
+        return client
+
+    def token_expires_soon(self) -> bool:
+        """Checks if the cached access token expires within the refresh margin."""
+        if self.client is None:
+            return False
+
+        expires_at = self.client.state.get("access_token_expires_at")
+
+        if expires_at is None:
+            return False
+
+        return float(expires_at) - time.time() < self.refresh_margin_seconds
+
+    def refresh_token(self) -> None:
+        """Retrieves a new access token for the shared client."""
+        with self.lock:
+            if self.client is None:
+                self.client = self.build_client()
+
+            self.last_refresh = time.time()
+
+            try:
+                self.client.grab_access_token()
+            except Exception:
+                logger.exception("Failed to refresh access token.")
+
+    def close(self) -> None:
+        """Closes the shared client and drops it, the next call will rebuild it."""
+        with self.lock:
+            if self.client is not None:
+                self.client.close()
+                self.client = None
@@ -0,0 +1,43 @@
+import abc
+import datetime as dt
+import threading
+
+import attr
+
+
+@attr.s(auto_attribs=True)
+class Clock(abc.ABC):
+    """
+    The Clock class is where the Bot and its strategies read the time and sleep, so a simulated clock can replace
+    waiting with jumps in time. Calling a clock returns now(), so it can be passed wherever a utc_now-style callable is.
+    """
+
+    @abc.abstractmethod
+    def now(self) -> dt.datetime:
+        """The current time in UTC."""
+        raise NotImplementedError("Each clock must implement the 'Now' method.")
+
+    @abc.abstractmethod
+    def monotonic(self) -> float:
+        """Seconds from an arbitrary start that never go backwards, for measuring intervals."""
+        raise NotImplementedError("Each clock must implement the 'Monotonic' method.")
+
+    @abc.abstractmethod
+    def sleep(self, seconds: float) -> None:
+        raise NotImplementedError("Each clock must implement the 'Sleep' method.")
+
+    @abc.abstractmethod
+    async def sleep_async(self, seconds: float) -> None:
+        raise NotImplementedError("Each clock must implement the 'Sleep_Async' method.")
+
+    @abc.abstractmethod
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        """Sleeps until the event is set or the seconds pass, returning whether the event was set."""
+        raise NotImplementedError("Each clock must implement the 'Wait' method.")
+
+    def __call__(self) -> dt.datetime:
+        return self.now()
+
+    def today(self) -> dt.date:
+        """Today's date in the host's local time, like dt.date.today()."""
+        return self.now().astimezone().date()
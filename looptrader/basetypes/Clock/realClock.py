@@ -0,0 +1,27 @@
+import asyncio
+import datetime as dt
+import threading
+import time
+
+import attr
+from basetypes.Clock.abstractClock import Clock
+
+
+@attr.s(auto_attribs=True)
+class RealClock(Clock):
+    """The system clock, sleeps block for real."""
+
+    def now(self) -> dt.datetime:
+        return dt.datetime.now().astimezone(dt.timezone.utc)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    async def sleep_async(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        return event.wait(seconds)
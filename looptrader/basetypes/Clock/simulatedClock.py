@@ -0,0 +1,55 @@
+import asyncio
+import datetime as dt
+import threading
+
+import attr
+from basetypes.Clock.abstractClock import Clock
+
+
+@attr.s(auto_attribs=True)
+class SimulatedClock(Clock):
+    """A clock that only moves when told to. Sleeping jumps it forward instead of waiting, so a market day of the bot
+    loop runs in seconds."""
+
+    current: dt.datetime = attr.ib(validator=attr.validators.instance_of(dt.datetime))
+    lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+
+    @current.validator
+    def check_current(self, attribute: attr.Attribute, value: dt.datetime) -> None:
+        if value.tzinfo is None:
+            raise ValueError("A simulated clock's time must be timezone aware.")
+
+    def __attrs_post_init__(self):
+        self.current = self.current.astimezone(dt.timezone.utc)
+
+    def now(self) -> dt.datetime:
+        return self.current
+
+    def monotonic(self) -> float:
+        return self.current.timestamp()
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+    async def sleep_async(self, seconds: float) -> None:
+        self.advance(seconds)
+
+        # Still let other tasks run
+        await asyncio.sleep(0)
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        if event.is_set():
+            return True
+
+        self.advance(seconds)
+
+        return False
+
+    def advance(self, seconds: float) -> None:
+        self.advance_to(self.current + dt.timedelta(seconds=seconds))
+
+    def advance_to(self, when: dt.datetime) -> None:
+        """Moves the clock forward, it never goes back."""
+        with self.lock:
+            if when > self.current:
+                self.current = when.astimezone(dt.timezone.utc)
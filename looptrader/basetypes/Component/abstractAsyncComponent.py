@@ -0,0 +1,19 @@
+from basetypes.Mediator.abstractAsyncMediator import AsyncMediator
+
+
+class AsyncComponent:
+    """
+    The Base Async Component provides the basic functionality of storing an async mediator's
+    instance inside component objects.
+    """
+
+    def __init__(self, mediator: AsyncMediator) -> None:
+        self._mediator = mediator
+
+    @property
+    def mediator(self) -> AsyncMediator:
+        return self._mediator
+
+    @mediator.setter
+    def mediator(self, mediator: AsyncMediator) -> None:
+        self._mediator = mediator
@@ -5,6 +5,9 @@ import attr
 import basetypes.Mediator.reqRespTypes as baseRR
 from basetypes.Component.abstractComponent import Component
 
+# A queued order write, applied in order with the others in its batch
+OrderWrite = Union[baseRR.CreateDatabaseOrderRequest, baseRR.UpdateDatabaseOrderRequest]
+
 
 @attr.s(auto_attribs=True)
 class Database(abc.ABC, Component):
@@ -47,3 +50,19 @@ class Database(abc.ABC, Component):
         raise NotImplementedError(
             "Each database must implement the 'read_open_orders' method."
         )
+
+    def write_orders(self, requests: list[OrderWrite]) -> None:
+        """Applies a batch of order creates and updates, databases that can should commit them together."""
+        for request in requests:
+            if isinstance(request, baseRR.CreateDatabaseOrderRequest):
+                self.create_order(request)
+            else:
+                self.update_order(request)
+
+    def flush(self) -> None:
+        """Waits for any queued writes to reach the database."""
+        return None
+
+    def close(self) -> None:
+        """Releases the database's connections when the bot shuts down."""
+        return None
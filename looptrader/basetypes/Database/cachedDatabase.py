@@ -0,0 +1,142 @@
+"""
+An in-memory index of each strategy's active orders in front of another database, so read_active_orders is a
+dictionary lookup instead of a SQLite query rebuilding ORM objects every tick.
+
+The index is loaded from the database the first time a strategy reads it, which the Bot does at startup, then kept
+current by writing order creates and updates through to it.
+
+Classes:
+
+    CachedDatabase
+
+Functions:
+
+    read_active_orders()
+"""
+
+import logging
+import threading
+from typing import Union
+
+import attr
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Database.abstractDatabase import Database, OrderWrite
+
+logger = logging.getLogger("autotrader")
+
+
+@attr.s(auto_attribs=True)
+class CachedDatabase(Database):
+    """Serves active orders from memory, every other call goes straight to the wrapped database."""
+
+    database: Database = attr.ib(validator=attr.validators.instance_of(Database))  # type: ignore[misc]
+    active_orders: dict[int, dict[int, baseModels.Order]] = attr.ib(
+        factory=dict, init=False
+    )
+    lock: threading.RLock = attr.ib(factory=threading.RLock, init=False)
+
+    #########
+    # Reads #
+    #########
+    def read_active_orders(
+        self, request: baseRR.ReadOpenDatabaseOrdersRequest
+    ) -> Union[baseRR.ReadOpenDatabaseOrdersResponse, None]:
+        with self.lock:
+            orders = self.active_orders.get(request.strategy_id)
+
+            if orders is None:
+                return self.load(request)
+
+            # Orders queued behind the database only get their IDs once written
+            if any(order.id is None for order in orders.values()):
+                self.database.flush()
+
+            response = baseRR.ReadOpenDatabaseOrdersResponse()
+            response.orders = list(orders.values())
+
+            return response
+
+    def load(
+        self, request: baseRR.ReadOpenDatabaseOrdersRequest
+    ) -> Union[baseRR.ReadOpenDatabaseOrdersResponse, None]:
+        """Reads a strategy's active orders from the database into the index."""
+        response = self.database.read_active_orders(request)
+
+        if response is None:
+            return None
+
+        self.active_orders[request.strategy_id] = {
+            self.key(order): order for order in response.orders
+        }
+
+        return response
+
+    def read_first_strategy_by_name(
+        self, request: baseRR.ReadDatabaseStrategyByNameRequest
+    ) -> Union[baseRR.ReadDatabaseStrategyByNameResponse, None]:
+        return self.database.read_first_strategy_by_name(request)
+
+    ##########
+    # Writes #
+    ##########
+    def create_order(
+        self, request: baseRR.CreateDatabaseOrderRequest
+    ) -> Union[baseRR.CreateDatabaseOrderResponse, None]:
+        with self.lock:
+            response = self.database.create_order(request)
+
+            if response is not None:
+                self.write_through(request.order)
+
+            return response
+
+    def update_order(
+        self, request: baseRR.UpdateDatabaseOrderRequest
+    ) -> Union[baseRR.UpdateDatabaseOrderResponse, None]:
+        with self.lock:
+            response = self.database.update_order(request)
+
+            if response is not None:
+                self.write_through(request.order)
+
+            return response
+
+    def write_orders(self, requests: list[OrderWrite]) -> None:
+        with self.lock:
+            self.database.write_orders(requests)
+
+            for request in requests:
+                self.write_through(request.order)
+
+    def create_strategy(
+        self, request: baseRR.CreateDatabaseStrategyRequest
+    ) -> Union[baseRR.CreateDatabaseStrategyResponse, None]:
+        return self.database.create_strategy(request)
+
+    def write_through(self, order: baseModels.Order) -> None:
+        """Adds or replaces an order in its strategy's index, or drops it once it is no longer active."""
+        orders = self.active_orders.get(order.strategy_id)
+
+        # Strategies that haven't been read yet load everything on first use
+        if orders is None:
+            return
+
+        if order.isActive():
+            orders[self.key(order)] = order
+        else:
+            orders.pop(self.key(order), None)
+
+    @staticmethod
+    def key(order: baseModels.Order) -> int:
+        """Orders are indexed by their broker order ID, database IDs may not be assigned yet."""
+        return order.order_id if order.order_id is not None else id(order)
+
+    ############
+    # Shutdown #
+    ############
+    def flush(self) -> None:
+        self.database.flush()
+
+    def close(self) -> None:
+        self.database.close()
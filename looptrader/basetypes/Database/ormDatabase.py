@@ -1,30 +1,53 @@
 import logging
 import logging.config
+import threading
 from typing import Union
 
 import attr
 import basetypes.Mediator.baseModels as baseModels
 import basetypes.Mediator.reqRespTypes as baseRR
-from basetypes.Database.abstractDatabase import Database
+from basetypes.Database.abstractDatabase import Database, OrderWrite
 from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
     create_engine,
+    event,
+    func,
+    select,
 )
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import joinedload, registry, relationship, sessionmaker
+from sqlalchemy.orm import (
+    joinedload,
+    registry,
+    relationship,
+    scoped_session,
+    sessionmaker,
+)
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.sql.schema import MetaData
 
 logger = logging.getLogger("autotrader")
 Base = declarative_base()
 meta = MetaData()
 mapper_registry = registry()
+mapping_lock = threading.Lock()
+
+# WAL lets reads run alongside the writer, NORMAL only syncs at checkpoints, which is safe in WAL mode
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,
+    "cache_size": -64000,
+}
 
 
 @attr.s(auto_attribs=True)
@@ -33,64 +56,103 @@ class ormDatabase(Database):
     connection_string: str = attr.ib(
         validator=attr.validators.instance_of(str), init=False
     )
+    pool_size: int = attr.ib(default=5, validator=attr.validators.instance_of(int))
+    pragmas: dict = attr.ib(
+        factory=lambda: dict(SQLITE_PRAGMAS),
+        validator=attr.validators.instance_of(dict),
+    )
+    engine: Engine = attr.ib(init=False)
+    session_factory: scoped_session = attr.ib(init=False)
+    write_lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
 
     def __attrs_post_init__(self):
         self.connection_string = "sqlite:///" + self.db_filename
+
+        # One pooled engine for the bot's lifetime, shared by the threads strategies run on
+        self.engine = create_engine(
+            self.connection_string,
+            poolclass=QueuePool,
+            pool_size=self.pool_size,
+            connect_args={"check_same_thread": False},
+        )
+        event.listen(self.engine, "connect", self.apply_pragmas)
+
+        # Each thread gets its own session, released back to the pool after every operation
+        self.session_factory = scoped_session(
+            sessionmaker(bind=self.engine, expire_on_commit=False)
+        )
+
         self.pre_flight_db_check()
 
+    def close(self) -> None:
+        """Closes open sessions and the engine's pooled connections."""
+        self.session_factory.remove()
+        self.engine.dispose()
+
     ##################
     # Setup Database #
     ##################
+    def apply_pragmas(self, dbapi_connection, connection_record) -> None:
+        """Tunes every new pooled connection."""
+        cursor = dbapi_connection.cursor()
+
+        for name, value in self.pragmas.items():
+            cursor.execute("PRAGMA {} = {}".format(name, value))
+
+        cursor.close()
+
     def pre_flight_db_check(self) -> None:
         try:
-            # Create Tables
-            execution_leg_table = self.build_execution_leg_table()
-            order_activity_table = self.build_order_activity_table()
-            order_leg_table = self.build_order_leg_table()
-            order_table = self.build_order_table()
-            strategy_table = self.build_strategy_table()
-
-            # Map Tables
-            mapper_registry.map_imperatively(
-                baseModels.Order,
-                order_table,
-                properties={
-                    "legs": relationship(baseModels.OrderLeg, backref="orders"),
-                    "activities": relationship(
-                        baseModels.OrderActivity, backref="orders"
-                    ),
-                    "strategy": relationship(
-                        baseModels.Strategy, backref="orders", uselist=False
-                    ),
-                },
-            )
-            mapper_registry.map_imperatively(
-                baseModels.OrderActivity,
-                order_activity_table,
-                properties={
-                    "execution_legs": relationship(
-                        baseModels.ExecutionLeg, backref="orderactivities"
-                    ),
-                },
-            )
-            mapper_registry.map_imperatively(baseModels.OrderLeg, order_leg_table)
-            mapper_registry.map_imperatively(
-                baseModels.ExecutionLeg, execution_leg_table
-            )
-            mapper_registry.map_imperatively(baseModels.Strategy, strategy_table)
-
-            # Create an engine that stores data in the local directory's db file
-            engine = create_engine(self.connection_string)
+            # Tables and mappings belong to the process, only the first database builds them
+            with mapping_lock:
+                if not mapper_registry.mappers:
+                    self.map_tables()
 
             # Create all tables in the engine. This is equivalent to "Create Table" statements in raw SQL.
-            meta.create_all(bind=engine)
+            meta.create_all(bind=self.engine)
 
-            engine.dispose()
+            # Databases created before an index was added don't get it from create_all
+            for table in meta.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=self.engine, checkfirst=True)
 
-        except Exception as e:
-            print(e)
+        except Exception:
+            logger.exception("Failed to set up database {}.".format(self.db_filename))
             return None
 
+    def map_tables(self) -> None:
+        # Create Tables
+        execution_leg_table = self.build_execution_leg_table()
+        order_activity_table = self.build_order_activity_table()
+        order_leg_table = self.build_order_leg_table()
+        order_table = self.build_order_table()
+        strategy_table = self.build_strategy_table()
+
+        # Map Tables
+        mapper_registry.map_imperatively(
+            baseModels.Order,
+            order_table,
+            properties={
+                "legs": relationship(baseModels.OrderLeg, backref="orders"),
+                "activities": relationship(baseModels.OrderActivity, backref="orders"),
+                "strategy": relationship(
+                    baseModels.Strategy, backref="orders", uselist=False
+                ),
+            },
+        )
+        mapper_registry.map_imperatively(
+            baseModels.OrderActivity,
+            order_activity_table,
+            properties={
+                "execution_legs": relationship(
+                    baseModels.ExecutionLeg, backref="orderactivities"
+                ),
+            },
+        )
+        mapper_registry.map_imperatively(baseModels.OrderLeg, order_leg_table)
+        mapper_registry.map_imperatively(baseModels.ExecutionLeg, execution_leg_table)
+        mapper_registry.map_imperatively(baseModels.Strategy, strategy_table)
+
     def build_strategy_table(self) -> Table:
         return Table(
             "strategies",
@@ -122,6 +184,8 @@ class ormDatabase(Database):
             Column("order_id", Integer),
             Column("account_id", Integer),
             Column("strategy_id", Integer, ForeignKey("strategies.id")),
+            Index("ix_orders_strategy_id_status", "strategy_id", "status"),
+            Index("ix_orders_order_id", "order_id"),
         )
 
     def build_order_leg_table(self) -> Table:
@@ -140,6 +204,7 @@ class ormDatabase(Database):
             Column("quantity", Integer),
             Column("expiration_date", DateTime),
             Column("order_id", Integer, ForeignKey("orders.id")),
+            Index("ix_orderlegs_order_id", "order_id"),
         )
 
     def build_order_activity_table(self) -> Table:
@@ -152,6 +217,7 @@ class ormDatabase(Database):
             Column("quantity", Integer),
             Column("order_remaining_quantity", Integer),
             Column("order_id", Integer, ForeignKey("orders.id")),
+            Index("ix_orderactivities_order_id", "order_id"),
         )
 
     def build_execution_leg_table(self) -> Table:
@@ -165,6 +231,7 @@ class ormDatabase(Database):
             Column("price", Float),
             Column("time", DateTime),
             Column("orderactivity_id", Integer, ForeignKey("orderactivities.id")),
+            Index("ix_executionlegs_orderactivity_id", "orderactivity_id"),
         )
 
     ###########
@@ -173,39 +240,18 @@ class ormDatabase(Database):
     def create_order(
         self, request: baseRR.CreateDatabaseOrderRequest
     ) -> Union[baseRR.CreateDatabaseOrderResponse, None]:
-        # sourcery skip: class-extract-method
-        engine = create_engine(self.connection_string)
-        Base.metadata.bind = engine
-        DBSession = sessionmaker(bind=engine)
-        session = DBSession(expire_on_commit=False)
         response = baseRR.CreateDatabaseOrderResponse()
 
         try:
-            # Add Order
-            session.add(request.order)
-
-            # Add Legs
-            for leg in request.order.legs:
-                session.add(leg)
-
-            # Add Activities
-            for activity in request.order.activities:
-                session.add(activity)
-
-            # Commit Inserts
-            session.commit()
+            self.upsert_orders([request.order])
 
             if request.order.id is not None:
                 id: int = request.order.id
                 response.id = id
 
-        except Exception as e:
-            print(e)
-            session.rollback()
+        except Exception:
+            logger.exception("Failed to create order.")
             return None
-        finally:
-            session.close()
-            engine.dispose()
 
         return response
 
@@ -213,10 +259,7 @@ class ormDatabase(Database):
         self, request: baseRR.CreateDatabaseStrategyRequest
     ) -> Union[baseRR.CreateDatabaseStrategyResponse, None]:
         # sourcery skip: class-extract-method
-        engine = create_engine(self.connection_string)
-        Base.metadata.bind = engine
-        DBSession = sessionmaker(bind=engine)
-        session = DBSession(expire_on_commit=False)
+        session = self.session_factory()
         response = baseRR.CreateDatabaseStrategyResponse()
 
         try:
@@ -227,13 +270,12 @@ class ormDatabase(Database):
                 id: int = request.strategy.id
                 response.id = id
 
-        except Exception as e:
-            print(e)
+        except Exception:
+            logger.exception("Failed to create strategy.")
             session.rollback()
             return None
         finally:
-            session.close()
-            engine.dispose()
+            self.session_factory.remove()
 
         return response
 
@@ -243,10 +285,7 @@ class ormDatabase(Database):
     def read_order_by_status(
         self, request: baseRR.ReadDatabaseOrdersByStatusRequest
     ) -> baseRR.ReadDatabaseOrdersByStatusResponse:
-        engine = create_engine(self.connection_string)
-        Base.metadata.bind = engine
-        DBSession = sessionmaker(bind=engine)
-        session = DBSession(expire_on_commit=False)
+        session = self.session_factory()
         response = baseRR.ReadDatabaseOrdersByStatusResponse()
 
         try:
@@ -263,22 +302,18 @@ class ormDatabase(Database):
             session.commit()
 
             response.orders = result
-        except Exception as e:
-            print(e)
+        except Exception:
+            logger.exception("Failed to read orders by status.")
             session.rollback()
         finally:
-            session.close()
-            engine.dispose()
+            self.session_factory.remove()
 
         return response
 
     def read_active_orders(
         self, request: baseRR.ReadOpenDatabaseOrdersRequest
     ) -> baseRR.ReadOpenDatabaseOrdersResponse:
-        engine = create_engine(self.connection_string)
-        Base.metadata.bind = engine
-        DBSession = sessionmaker(bind=engine)
-        session = DBSession(expire_on_commit=False)
+        session = self.session_factory()
         response = baseRR.ReadOpenDatabaseOrdersResponse()
         response.orders = []
 
@@ -298,22 +333,18 @@ class ormDatabase(Database):
             session.commit()
 
             response.orders = result
-        except Exception as e:
-            print(e)
+        except Exception:
+            logger.exception("Failed to read active orders.")
             session.rollback()
         finally:
-            session.close()
-            engine.dispose()
+            self.session_factory.remove()
 
         return response
 
     def read_first_strategy_by_name(
         self, request: baseRR.ReadDatabaseStrategyByNameRequest
     ) -> Union[baseRR.ReadDatabaseStrategyByNameResponse, None]:
-        engine = create_engine(self.connection_string)
-        Base.metadata.bind = engine
-        DBSession = sessionmaker(bind=engine)
-        session = DBSession(expire_on_commit=False)
+        session = self.session_factory()
         response = baseRR.ReadDatabaseStrategyByNameResponse()
         response.strategy = baseModels.Strategy()
 
@@ -327,12 +358,11 @@ class ormDatabase(Database):
             session.commit()
 
             response.strategy = result
-        except Exception as e:
-            print(e)
+        except Exception:
+            logger.exception("Failed to read strategy by name.")
             session.rollback()
         finally:
-            session.close()
-            engine.dispose()
+            self.session_factory.remove()
 
         return response
 
@@ -342,42 +372,123 @@ class ormDatabase(Database):
     def update_order(
         self, request: baseRR.UpdateDatabaseOrderRequest
     ) -> Union[baseRR.UpdateDatabaseOrderResponse, None]:
-        # sourcery skip: class-extract-method
-        engine = create_engine(self.connection_string)
-        Base.metadata.bind = engine
-        DBSession = sessionmaker(bind=engine)
-        session = DBSession(expire_on_commit=False)
         response = baseRR.UpdateDatabaseOrderResponse()
 
         try:
-            # Add Order
-            session.merge(request.order)
-
-            # Add Legs
-            for leg in request.order.legs:
-                session.merge(leg)
-
-            # Add Activities
-            for activity in request.order.activities:
-                session.merge(activity)
-
-            # Commit Inserts
-            session.commit()
+            self.upsert_orders([request.order])
 
             if request.order.id is not None:
                 id: int = request.order.id
                 response.id = id
 
-        except Exception as e:
-            print(e)
-            session.rollback()
+        except Exception:
+            logger.exception("Failed to update order.")
             return None
-        finally:
-            session.close()
-            engine.dispose()
 
         return response
 
+    ###########
+    # Batches #
+    ###########
+    def write_orders(self, requests: list[OrderWrite]) -> None:
+        """Applies a batch of order creates and updates in a single transaction."""
+        try:
+            self.upsert_orders([request.order for request in requests])
+            return
+
+        except Exception:
+            logger.exception(
+                "Failed to write {} orders together, writing them one by one.".format(
+                    len(requests)
+                )
+            )
+
+        # One bad write shouldn't lose the rest of the batch
+        super().write_orders(requests)
+
+    def upsert_orders(self, orders: list[baseModels.Order]) -> None:
+        """Inserts or updates orders with their legs, activities and execution legs, in a fixed number of statements.
+
+        New records get their IDs assigned, and children are pointed at their parent's ID, as the ORM would.
+        """
+        legs = [leg for order in orders for leg in order.legs]
+        activities = [activity for order in orders for activity in order.activities]
+        execution_legs = [
+            execution_leg
+            for activity in activities
+            for execution_leg in activity.execution_legs
+        ]
+
+        # IDs are assigned from the tables' current maximum, so writers take turns
+        with self.write_lock, self.engine.begin() as connection:
+            self.assign_ids(connection, meta.tables["orders"], orders)
+            self.assign_ids(connection, meta.tables["orderlegs"], legs)
+            self.assign_ids(connection, meta.tables["orderactivities"], activities)
+            self.assign_ids(connection, meta.tables["executionlegs"], execution_legs)
+
+            for order in orders:
+                for leg in order.legs:
+                    leg.order_id = order.id
+
+                for activity in order.activities:
+                    activity.order_id = order.id
+
+                    for execution_leg in activity.execution_legs:
+                        execution_leg.orderactivity_id = activity.id
+
+            self.upsert_rows(connection, meta.tables["orders"], orders)
+            self.upsert_rows(connection, meta.tables["orderlegs"], legs)
+            self.upsert_rows(connection, meta.tables["orderactivities"], activities)
+            self.upsert_rows(connection, meta.tables["executionlegs"], execution_legs)
+
+    @staticmethod
+    def assign_ids(connection: Connection, table: Table, records: list) -> None:
+        """Gives records without an ID the next free IDs in their table."""
+        new = [record for record in records if record.id is None]
+
+        if not new:
+            return
+
+        last = connection.execute(select(func.max(table.c.id))).scalar() or 0
+
+        for offset, record in enumerate(new, start=1):
+            record.id = last + offset
+
+    @staticmethod
+    def upsert_rows(connection: Connection, table: Table, records: list) -> None:
+        """Writes records with INSERT ... ON CONFLICT DO UPDATE, one statement per set of populated columns."""
+        groups: dict[tuple, list[dict]] = {}
+
+        for record in records:
+            values = vars(record)
+
+            # Only columns the record has a value for, like merge() leaves unloaded attributes alone
+            row = {
+                column.name: values[column.name]
+                for column in table.columns
+                if column.name in values
+            }
+            groups.setdefault(tuple(row), []).append(row)
+
+        for columns, rows in groups.items():
+            statement = sqlite.insert(table)
+            updates = {
+                column: statement.excluded[column]
+                for column in columns
+                if column != "id"
+            }
+
+            if updates:
+                statement = statement.on_conflict_do_update(
+                    index_elements=[table.c.id], set_=updates
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(
+                    index_elements=[table.c.id]
+                )
+
+            connection.execute(statement, rows)
+
     ###########
     # Deletes #
     ###########
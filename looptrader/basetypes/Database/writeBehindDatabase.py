@@ -0,0 +1,203 @@
+"""
+A write-behind database, queuing order creates and updates so strategies don't wait on SQLite commits between
+placing an order and their next action. A background thread commits the queue in batches to the wrapped database.
+
+Repeated updates to the same order are coalesced, only the latest is written. Reads flush the queue first, so
+strategies always read their own writes, and the queue is flushed on the kill switch and on shutdown.
+
+Classes:
+
+    WriteBehindDatabase
+
+Functions:
+
+    write_orders()
+    flush()
+    close()
+"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Hashable, Iterator, Union
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Database.abstractDatabase import Database, OrderWrite
+
+logger = logging.getLogger("autotrader")
+
+
+@attr.s(auto_attribs=True)
+class WriteBehindDatabase(Database):
+    """Queues order writes in front of another database, strategy creation and reads go straight through."""
+
+    database: Database = attr.ib(validator=attr.validators.instance_of(Database))  # type: ignore[misc]
+    batch_seconds: float = attr.ib(
+        default=0.05, validator=attr.validators.instance_of(float)
+    )
+    max_batch_size: int = attr.ib(
+        default=500, validator=attr.validators.instance_of(int)
+    )
+    pending: dict[Hashable, OrderWrite] = attr.ib(factory=dict, init=False)
+    in_flight: int = attr.ib(default=0, init=False)
+    flushing: int = attr.ib(default=0, init=False)
+    stopping: bool = attr.ib(default=False, init=False)
+    counter: Iterator[int] = attr.ib(factory=itertools.count, init=False)
+    condition: threading.Condition = attr.ib(factory=threading.Condition, init=False)
+    writer: threading.Thread = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        self.writer = threading.Thread(
+            target=self.write_loop, name="database-writer", daemon=True
+        )
+        self.writer.start()
+
+    ##########
+    # Writes #
+    ##########
+    def create_order(
+        self, request: baseRR.CreateDatabaseOrderRequest
+    ) -> Union[baseRR.CreateDatabaseOrderResponse, None]:
+        """Queues the order, its ID is set on request.order once the write is committed."""
+        self.enqueue([request])
+
+        return baseRR.CreateDatabaseOrderResponse()
+
+    def update_order(
+        self, request: baseRR.UpdateDatabaseOrderRequest
+    ) -> Union[baseRR.UpdateDatabaseOrderResponse, None]:
+        """Queues the update, replacing any queued update to the same order."""
+        self.enqueue([request])
+
+        response = baseRR.UpdateDatabaseOrderResponse()
+
+        if request.order.id is not None:
+            response.id = request.order.id
+
+        return response
+
+    def create_strategy(
+        self, request: baseRR.CreateDatabaseStrategyRequest
+    ) -> Union[baseRR.CreateDatabaseStrategyResponse, None]:
+        # Strategy IDs are needed straight away
+        return self.database.create_strategy(request)
+
+    def write_orders(self, requests: list[OrderWrite]) -> None:
+        """Queues a batch of creates and updates, i.e. a reconciliation, together."""
+        self.enqueue(requests)
+
+    def enqueue(self, requests: list[OrderWrite]) -> None:
+        """Queues writes under one lock, waking the writer once."""
+        if not requests:
+            return
+
+        with self.condition:
+            if self.stopping:
+                # Too late to queue, write them now
+                self.database.write_orders(requests)
+                return
+
+            # A coalesced update keeps the earlier update's place in the queue
+            for request in requests:
+                self.pending[self.key_for(request)] = request
+
+            self.condition.notify_all()
+
+    def key_for(self, request: OrderWrite) -> Hashable:
+        """Updates to a known order share a key so they coalesce, everything else is queued separately."""
+        if (
+            isinstance(request, baseRR.UpdateDatabaseOrderRequest)
+            and request.order.id is not None
+        ):
+            return ("order", request.order.id)
+
+        return next(self.counter)
+
+    #########
+    # Reads #
+    #########
+    def read_first_strategy_by_name(
+        self, request: baseRR.ReadDatabaseStrategyByNameRequest
+    ) -> Union[baseRR.ReadDatabaseStrategyByNameResponse, None]:
+        self.flush()
+        return self.database.read_first_strategy_by_name(request)
+
+    def read_active_orders(
+        self, request: baseRR.ReadOpenDatabaseOrdersRequest
+    ) -> Union[baseRR.ReadOpenDatabaseOrdersResponse, None]:
+        self.flush()
+        return self.database.read_active_orders(request)
+
+    ##########
+    # Writer #
+    ##########
+    def write_loop(self) -> None:
+        """Commits queued writes in batches until the database is closed and its queue is empty."""
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopping:
+                    self.condition.wait()
+
+                if not self.pending:
+                    return
+
+                # Give a burst of writes a moment to land in the same batch
+                deadline = time.monotonic() + self.batch_seconds
+
+                while (
+                    not self.stopping
+                    and not self.flushing
+                    and len(self.pending) < self.max_batch_size
+                ):
+                    remaining = deadline - time.monotonic()
+
+                    if remaining <= 0:
+                        break
+
+                    self.condition.wait(remaining)
+
+                keys = list(itertools.islice(self.pending, self.max_batch_size))
+                batch = [self.pending.pop(key) for key in keys]
+                self.in_flight = len(batch)
+
+            try:
+                self.database.write_orders(batch)
+            except Exception:
+                logger.exception("Failed to write {} orders.".format(len(batch)))
+
+            with self.condition:
+                self.in_flight = 0
+                self.condition.notify_all()
+
+    def flush(self) -> None:
+        """Blocks until every queued write has been committed."""
+        with self.condition:
+            if not self.writer.is_alive():
+                batch = list(self.pending.values())
+                self.pending.clear()
+
+                if batch:
+                    self.database.write_orders(batch)
+
+                return
+
+            self.flushing += 1
+            self.condition.notify_all()
+
+            try:
+                while self.pending or self.in_flight:
+                    self.condition.wait()
+            finally:
+                self.flushing -= 1
+
+    def close(self) -> None:
+        """Flushes the queue, stops the writer and closes the wrapped database."""
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+
+        self.writer.join()
+        self.flush()
+        self.database.close()
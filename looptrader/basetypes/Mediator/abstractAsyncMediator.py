@@ -0,0 +1,131 @@
+import abc
+from typing import Union
+
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Clock.abstractClock import Clock
+
+
+class AsyncMediator(abc.ABC):
+    """The asyncio counterpart of Mediator, for AsyncStrategies and AsyncBrokers."""
+
+    @property
+    @abc.abstractmethod
+    def killswitch(self) -> bool:
+        raise NotImplementedError(
+            "Each mediator must implement the 'killswitch' property."
+        )
+
+    @property
+    @abc.abstractmethod
+    def clock(self) -> Clock:
+        raise NotImplementedError("Each mediator must implement the 'clock' property.")
+
+    @abc.abstractmethod
+    async def process_strategies(self):
+        raise NotImplementedError(
+            "Each mediator must implement the 'Process_Strategies' method."
+        )
+
+    @abc.abstractmethod
+    async def get_account(
+        self, request: baseRR.GetAccountRequestMessage
+    ) -> Union[baseRR.GetAccountResponseMessage, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'Get_Account' method."
+        )
+
+    @abc.abstractmethod
+    async def place_order(
+        self, request: baseRR.PlaceOrderRequestMessage
+    ) -> Union[baseRR.PlaceOrderResponseMessage, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'Place_Order' method."
+        )
+
+    @abc.abstractmethod
+    async def cancel_order(
+        self, request: baseRR.CancelOrderRequestMessage
+    ) -> Union[baseRR.CancelOrderResponseMessage, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'Cancel_Order' method."
+        )
+
+    @abc.abstractmethod
+    async def get_option_chain(
+        self, request: baseRR.GetOptionChainRequestMessage
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'Get_Option_Chain' method."
+        )
+
+    @abc.abstractmethod
+    async def get_market_hours(
+        self, request: baseRR.GetMarketHoursRequestMessage
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'Get_Market_Hours' method."
+        )
+
+    @abc.abstractmethod
+    async def get_next_market_hours(
+        self, request: baseRR.GetNextMarketHoursRequestMessage
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'Get_Next_Market_Hours' method."
+        )
+
+    @abc.abstractmethod
+    async def get_order(
+        self, request: baseRR.GetOrderRequestMessage
+    ) -> Union[baseRR.GetOrderResponseMessage, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'Get_Order' method."
+        )
+
+    @abc.abstractmethod
+    async def get_quote(
+        self, request: baseRR.GetQuoteRequestMessage
+    ) -> Union[baseRR.GetQuoteResponseMessage, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'get_quote' method."
+        )
+
+    @abc.abstractmethod
+    async def create_db_order(
+        self, request: baseRR.CreateDatabaseOrderRequest
+    ) -> Union[baseRR.CreateDatabaseOrderResponse, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'create_db_order' method."
+        )
+
+    @abc.abstractmethod
+    async def update_db_order(
+        self, request: baseRR.UpdateDatabaseOrderRequest
+    ) -> Union[baseRR.UpdateDatabaseOrderResponse, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'update_db_order' method."
+        )
+
+    @abc.abstractmethod
+    async def read_active_orders(
+        self, request: baseRR.ReadOpenDatabaseOrdersRequest
+    ) -> Union[baseRR.ReadOpenDatabaseOrdersResponse, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'read_open_orders' method."
+        )
+
+    @abc.abstractmethod
+    async def reconcile_orders(
+        self, request: baseRR.ReconcileOrdersRequestMessage
+    ) -> Union[baseRR.ReconcileOrdersResponseMessage, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'reconcile_orders' method."
+        )
+
+    @abc.abstractmethod
+    async def send_notification(
+        self, request: baseRR.SendNotificationRequestMessage
+    ) -> None:
+        raise NotImplementedError(
+            "Each mediator must implement the 'send_notification' method."
+        )
@@ -3,12 +3,29 @@ from typing import Union
 
 import attr
 import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Clock.abstractClock import Clock
+from basetypes.Clock.realClock import RealClock
+from basetypes.Strategy.riskFreeRate import RiskFreeRateProvider
 
 
 @attr.s(auto_attribs=True)
 class Mediator(abc.ABC):
     killswitch: bool = attr.ib(validator=attr.validators.instance_of(bool))
     pause: bool = attr.ib(validator=attr.validators.instance_of(bool))
+    # Where the mediator and its components read the time and sleep
+    clock: Clock = attr.ib(  # type: ignore[misc]
+        factory=RealClock,
+        kw_only=True,
+        validator=attr.validators.instance_of(Clock),  # type: ignore[misc]
+    )
+    # Where strategies read the risk-free rate, dated by the mediator's clock
+    risk_free_rate_provider: RiskFreeRateProvider = attr.ib(
+        default=attr.Factory(
+            lambda self: RiskFreeRateProvider(clock=self.clock), takes_self=True
+        ),
+        kw_only=True,
+        validator=attr.validators.instance_of(RiskFreeRateProvider),
+    )
 
     @abc.abstractmethod
     def process_strategies(self):
@@ -64,6 +81,14 @@ class Mediator(abc.ABC):
             "Each mediator must implement the 'Get_Market_Hours' method."
         )
 
+    @abc.abstractmethod
+    def get_next_market_hours(
+        self, request: baseRR.GetNextMarketHoursRequestMessage
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'Get_Next_Market_Hours' method."
+        )
+
     @abc.abstractmethod
     def get_order(
         self, request: baseRR.GetOrderRequestMessage
@@ -72,6 +97,12 @@ class Mediator(abc.ABC):
             "Each mediator must implement the 'Get_Order' method."
         )
 
+    @abc.abstractmethod
+    def track_order(self, request: baseRR.TrackOrderRequestMessage) -> None:
+        raise NotImplementedError(
+            "Each mediator must implement the 'Track_Order' method."
+        )
+
     @abc.abstractmethod
     def send_notification(self, msg: baseRR.SendNotificationRequestMessage) -> None:
         raise NotImplementedError(
@@ -118,6 +149,14 @@ class Mediator(abc.ABC):
             "Each mediator must implement the 'update_db_order' method."
         )
 
+    @abc.abstractmethod
+    def reconcile_orders(
+        self, request: baseRR.ReconcileOrdersRequestMessage
+    ) -> Union[baseRR.ReconcileOrdersResponseMessage, None]:
+        raise NotImplementedError(
+            "Each mediator must implement the 'reconcile_orders' method."
+        )
+
     def get_quote(
         self, request: baseRR.GetQuoteRequestMessage
     ) -> Union[baseRR.GetQuoteResponseMessage, None]:
@@ -0,0 +1,331 @@
+"""
+An asyncio event-loop driver for the LoopTrader Bot.
+
+Existing synchronous strategies keep running through the wrapped Bot, in worker threads, while
+AsyncStrategies await their broker calls concurrently on the event loop.
+
+Classes:
+
+    AsyncBot
+
+Functions:
+
+    run()
+    process_strategies()
+    process_due_strategies()
+    process_tick()
+"""
+
+import asyncio
+import datetime as dt
+import logging
+from typing import Any, Callable, Union
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Broker.abstractAsyncBroker import AsyncBroker
+from basetypes.Clock.abstractClock import Clock
+from basetypes.Mediator.abstractAsyncMediator import AsyncMediator
+from basetypes.Mediator.botMediator import Bot
+from basetypes.Strategy.abstractAsyncStrategy import AsyncStrategy
+from basetypes.Strategy.abstractStrategy import Strategy
+
+logger = logging.getLogger("autotrader")
+
+
+@attr.s(auto_attribs=True)
+class AsyncBot(AsyncMediator):
+    bot: Bot = attr.ib(validator=attr.validators.instance_of(Bot))
+    asyncbrokerstrategy: dict[AsyncStrategy, AsyncBroker] = attr.ib(
+        factory=dict,
+        validator=attr.validators.deep_mapping(
+            key_validator=attr.validators.instance_of(AsyncStrategy),  # type: ignore[misc]
+            value_validator=attr.validators.instance_of(AsyncBroker),  # type: ignore[misc]
+            mapping_validator=attr.validators.instance_of(dict),
+        ),
+    )
+    running_groups: dict[int, asyncio.Future] = attr.ib(factory=dict, init=False)
+
+    def __attrs_post_init__(self):
+        names = self.bot.get_all_strategies()
+
+        for strategy, broker in self.asyncbrokerstrategy.items():
+            # Check for Duplicates
+            if strategy.strategy_name in names:
+                raise Exception("Duplicate Strategy Name")
+
+            # Assign Strategy and Mediators
+            names.append(strategy.strategy_name)
+            broker.mediator = self
+            strategy.mediator = self
+
+            # Check if Strat exists, create it if needed, store the ID
+            strategy.strategy_id = self.bot.get_or_create_strategy_id(
+                strategy.strategy_name
+            )
+
+    @property
+    def killswitch(self) -> bool:
+        return self.bot.killswitch
+
+    @property
+    def clock(self) -> Clock:
+        return self.bot.clock
+
+    def run(self) -> None:
+        """Runs the bot on a new event loop until the kill switch is set."""
+        asyncio.run(self.process_strategies())
+
+    async def process_strategies(self):
+        await self.send_notification(
+            baseRR.SendNotificationRequestMessage(message="Bot Started.")
+        )
+
+        # Every strategy runs once at startup, then at the wake-up it asks for
+        for strategy in [*self.bot.brokerstrategy, *self.asyncbrokerstrategy]:
+            self.bot.scheduler.schedule(strategy, self.clock())
+
+        # While the kill switch is not enabled, loop through strategies
+        while not self.killswitch:
+            # Let strategies react to their orders filling or being cancelled
+            await asyncio.to_thread(self.bot.process_order_events)
+
+            await self.process_due_strategies()
+
+            # Sleep until the earliest deadline or order poll, set_kill_switch still wakes the wait
+            await asyncio.to_thread(
+                self.bot.scheduler.wait, self.bot.order_tracker.next_poll()
+            )
+
+        await asyncio.to_thread(self.bot.shutdown)
+
+        # If the loop is exited, send a notification
+        await self.send_notification(
+            baseRR.SendNotificationRequestMessage(message="Bot Terminated.")
+        )
+
+    async def process_due_strategies(self) -> None:
+        """Runs every strategy whose wake-up has passed, then schedules each at its next wake-up."""
+        due = self.bot.scheduler.pop_due()
+
+        if not due:
+            return
+
+        # Account snapshots only live for a single wake-up
+        self.bot.account_cache.clear()
+
+        # Check if we are paused
+        if not self.bot.pause:
+            await self.process_tick(due)
+
+        for strategy in due:
+            self.bot.scheduler.reschedule(strategy)
+
+    async def process_tick(
+        self, strategies: Union[list[Union[Strategy, AsyncStrategy]], None] = None
+    ) -> None:
+        """Runs the synchronous strategy groups and the async strategies concurrently, each with its timeout.
+
+        Runs every strategy unless a subset is given.
+        """
+        loop = asyncio.get_running_loop()
+        timeout = self.bot.strategy_timeout_seconds
+        names = []
+        tasks = []
+
+        # Synchronous strategies run per broker in a worker thread, as in Bot
+        groups = self.bot.group_strategies_by_broker(
+            None
+            if strategies is None
+            else [strategy for strategy in strategies if isinstance(strategy, Strategy)]
+        )
+
+        for key, group in groups.items():
+            running = self.running_groups.get(key)
+            if running is not None and not running.done():
+                continue
+
+            future = loop.run_in_executor(None, self.bot.process_strategy_group, group)
+            self.running_groups[key] = future
+
+            # Shielded, a timed out thread can't be cancelled and keeps its group marked as running
+            names.append([strategy.strategy_name for strategy in group])
+            tasks.append(asyncio.wait_for(asyncio.shield(future), timeout * len(group)))
+
+        # Async strategies share the event loop
+        for strategy in self.asyncbrokerstrategy:
+            if strategies is not None and strategy not in strategies:
+                continue
+
+            names.append([strategy.strategy_name])
+            tasks.append(asyncio.wait_for(strategy.process_strategy(), timeout))
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        for name, result in zip(names, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.error("Strategies {} timed out.".format(name))
+            elif isinstance(result, BaseException):
+                logger.error("Strategies {} failed.".format(name), exc_info=result)
+
+    ##########
+    # Broker #
+    ##########
+    def get_broker(self, strategy_id: int) -> Union[AsyncBroker, None]:
+        """Returns the async broker associated to a given strategy"""
+        for strategy, broker in self.asyncbrokerstrategy.items():
+            if strategy.strategy_id == strategy_id:
+                return broker
+
+        return None
+
+    async def get_account(
+        self, request: baseRR.GetAccountRequestMessage
+    ) -> Union[baseRR.GetAccountResponseMessage, None]:
+        broker = self.get_broker(request.strategy_id)
+
+        if broker is None:
+            return None
+
+        return await broker.get_account(request)
+
+    async def place_order(
+        self, request: baseRR.PlaceOrderRequestMessage
+    ) -> Union[baseRR.PlaceOrderResponseMessage, None]:
+        broker = self.get_broker(request.order.strategy_id)
+
+        if broker is None:
+            return None
+
+        return await broker.place_order(request)
+
+    async def cancel_order(
+        self, request: baseRR.CancelOrderRequestMessage
+    ) -> Union[baseRR.CancelOrderResponseMessage, None]:
+        broker = self.get_broker(request.strategy_id)
+
+        if broker is None:
+            return None
+
+        return await broker.cancel_order(request)
+
+    async def get_option_chain(
+        self, request: baseRR.GetOptionChainRequestMessage
+    ) -> Union[baseRR.GetOptionChainResponseMessage, None]:
+        broker = self.get_broker(request.strategy_id)
+
+        if broker is None:
+            return None
+
+        return await broker.get_option_chain(request)
+
+    async def get_order(
+        self, request: baseRR.GetOrderRequestMessage
+    ) -> Union[baseRR.GetOrderResponseMessage, None]:
+        broker = self.get_broker(request.strategy_id)
+
+        if broker is None:
+            return None
+
+        return await broker.get_order(request)
+
+    async def get_quote(
+        self, request: baseRR.GetQuoteRequestMessage
+    ) -> Union[baseRR.GetQuoteResponseMessage, None]:
+        broker = self.get_broker(request.strategy_id)
+
+        if broker is None:
+            return None
+
+        return await broker.get_quote(request)
+
+    async def get_market_hours(
+        self, request: baseRR.GetMarketHoursRequestMessage
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        broker = self.get_broker(request.strategy_id)
+
+        if broker is None:
+            return None
+
+        # The calendar is shared with the synchronous Bot
+        loader = self.build_market_hours_loader(broker, request.strategy_id)
+
+        return await asyncio.to_thread(
+            self.bot.market_calendar.get_session,
+            request.market,
+            request.product,
+            request.datetime.date(),
+            loader,
+        )
+
+    async def get_next_market_hours(
+        self, request: baseRR.GetNextMarketHoursRequestMessage
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        broker = self.get_broker(request.strategy_id)
+
+        if broker is None:
+            return None
+
+        loader = self.build_market_hours_loader(broker, request.strategy_id)
+
+        return await asyncio.to_thread(
+            self.bot.market_calendar.get_next_session,
+            request.market,
+            request.product,
+            request.datetime.date(),
+            request.ends_after,
+            loader,
+        )
+
+    @staticmethod
+    def build_market_hours_loader(
+        broker: AsyncBroker, strategy_id: int
+    ) -> Callable[[str, str, dt.date], Any]:
+        """Builds a blocking loader for the market calendar that awaits the async broker on this loop."""
+        loop = asyncio.get_running_loop()
+
+        def loader(
+            market: str, product: str, day: dt.date
+        ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+            request = baseRR.GetMarketHoursRequestMessage(
+                strategy_id,
+                market=market,
+                product=product,
+                datetime=dt.datetime.combine(day, dt.time()),
+            )
+            return asyncio.run_coroutine_threadsafe(
+                broker.get_market_hours(request), loop
+            ).result()
+
+        return loader
+
+    ############
+    # Database #
+    ############
+    async def create_db_order(
+        self, request: baseRR.CreateDatabaseOrderRequest
+    ) -> Union[baseRR.CreateDatabaseOrderResponse, None]:
+        return await asyncio.to_thread(self.bot.create_db_order, request)
+
+    async def update_db_order(
+        self, request: baseRR.UpdateDatabaseOrderRequest
+    ) -> Union[baseRR.UpdateDatabaseOrderResponse, None]:
+        return await asyncio.to_thread(self.bot.update_db_order, request)
+
+    async def read_active_orders(
+        self, request: baseRR.ReadOpenDatabaseOrdersRequest
+    ) -> Union[baseRR.ReadOpenDatabaseOrdersResponse, None]:
+        return await asyncio.to_thread(self.bot.read_active_orders, request)
+
+    async def reconcile_orders(
+        self, request: baseRR.ReconcileOrdersRequestMessage
+    ) -> Union[baseRR.ReconcileOrdersResponseMessage, None]:
+        return await asyncio.to_thread(self.bot.reconcile_orders, request)
+
+    ############
+    # Notifier #
+    ############
+    async def send_notification(
+        self, request: baseRR.SendNotificationRequestMessage
+    ) -> None:
+        await asyncio.to_thread(self.bot.send_notification, request)
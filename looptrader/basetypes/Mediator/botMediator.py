@@ -1,6 +1,7 @@
+import concurrent.futures
+import datetime as dt
 import logging
 import logging.config
-import time
 from typing import Union
 
 import attr
@@ -9,6 +10,10 @@ import basetypes.Mediator.reqRespTypes as baseRR
 from basetypes.Broker.abstractBroker import Broker
 from basetypes.Database.abstractDatabase import Database
 from basetypes.Mediator.abstractMediator import Mediator
+from basetypes.Mediator.marketCalendar import MarketCalendar
+from basetypes.Mediator.orderTracker import OrderTracker
+from basetypes.Mediator.strategyScheduler import StrategyScheduler
+from basetypes.Mediator.ttlCache import TtlCache
 from basetypes.Notifier.abstractnotifier import Notifier
 from basetypes.Strategy.abstractStrategy import Strategy
 
@@ -35,10 +40,62 @@ class Bot(Mediator):
             mapping_validator=attr.validators.instance_of(dict),
         )
     )
+    option_chain_cache_seconds: float = attr.ib(
+        default=15.0, validator=attr.validators.instance_of(float)
+    )
+    option_chain_cache: TtlCache = attr.ib(
+        validator=attr.validators.instance_of(TtlCache), init=False
+    )
+    account_cache: TtlCache = attr.ib(
+        validator=attr.validators.instance_of(TtlCache), init=False
+    )
+    market_calendar_filename: str = attr.ib(
+        default="marketcalendar.json", validator=attr.validators.instance_of(str)
+    )
+    market_calendar: MarketCalendar = attr.ib(
+        validator=attr.validators.instance_of(MarketCalendar), init=False
+    )
+    max_concurrency: int = attr.ib(
+        default=1, validator=attr.validators.instance_of(int)
+    )
+    strategy_timeout_seconds: float = attr.ib(
+        default=300.0, validator=attr.validators.instance_of(float)
+    )
+    executor: Union[concurrent.futures.ThreadPoolExecutor, None] = attr.ib(
+        default=None, init=False
+    )
+    running_groups: dict[int, concurrent.futures.Future] = attr.ib(
+        factory=dict, init=False
+    )
+    scheduler: StrategyScheduler = attr.ib(
+        validator=attr.validators.instance_of(StrategyScheduler), init=False
+    )
+    order_tracker: OrderTracker = attr.ib(
+        validator=attr.validators.instance_of(OrderTracker), init=False
+    )
 
     def __attrs_post_init__(self):
         self.botloopfrequency = 60
         self.killswitch = False
+        self.option_chain_cache = TtlCache(
+            self.option_chain_cache_seconds, clock=self.clock.monotonic
+        )
+        self.account_cache = TtlCache(
+            float(self.botloopfrequency), clock=self.clock.monotonic
+        )
+        self.market_calendar = MarketCalendar(
+            self.market_calendar_filename, clock=self.clock
+        )
+        self.scheduler = StrategyScheduler(
+            float(self.botloopfrequency), clock=self.clock, wait_on=self.clock.wait
+        )
+        self.order_tracker = OrderTracker(clock=self.clock)
+
+        # Strategies on different brokers run in parallel when concurrency is enabled
+        if self.max_concurrency > 1:
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="strategy"
+            )
 
         # Set Mediators
         self.database.mediator = self
@@ -58,54 +115,196 @@ class Bot(Mediator):
             strategy.mediator = self
 
             # Check if Strat exists, create it if needed, store the ID
-            read_strat_request = baseRR.ReadDatabaseStrategyByNameRequest(
+            strategy.strategy_id = self.get_or_create_strategy_id(
                 strategy.strategy_name
             )
-            result = self.database.read_first_strategy_by_name(read_strat_request)
 
-            if result.strategy is None:
-                base_strategy = baseModels.Strategy()
-                base_strategy.name = strategy.strategy_name
-                create_strat_request = baseRR.CreateDatabaseStrategyRequest(
-                    base_strategy
-                )
-                strategy.strategy_id = self.database.create_strategy(
-                    create_strat_request
-                ).id
-            else:
-                strategy.strategy_id = result.strategy.id
+            # Warm any active order cache in front of the database
+            self.database.read_active_orders(
+                baseRR.ReadOpenDatabaseOrdersRequest(strategy.strategy_id)
+            )
 
-    def process_strategies(self):
-        # Get the current timestamp
-        starttime = time.time()
+    def get_or_create_strategy_id(self, strategy_name: str) -> int:
+        """Reads a strategy's ID from the database, creating the strategy if needed."""
+        read_strat_request = baseRR.ReadDatabaseStrategyByNameRequest(strategy_name)
+        result = self.database.read_first_strategy_by_name(read_strat_request)
 
+        if result.strategy is not None:
+            return result.strategy.id
+
+        base_strategy = baseModels.Strategy()
+        base_strategy.name = strategy_name
+        create_strat_request = baseRR.CreateDatabaseStrategyRequest(base_strategy)
+
+        return self.database.create_strategy(create_strat_request).id
+
+    def process_strategies(self):
         # If the loop is exited, send a notification
         self.send_notification(
             baseRR.SendNotificationRequestMessage(message="Bot Started.")
         )
 
+        # Every strategy runs once at startup, then at the wake-up it asks for
+        for strategy in self.brokerstrategy:
+            self.scheduler.schedule(strategy, self.clock())
+
         # While the kill switch is not enabled, loop through strategies
         while not self.killswitch:
+            # Let strategies react to their orders filling or being cancelled
+            self.process_order_events()
+
+            self.process_due_strategies()
+
+            # Sleep until the earliest deadline or order poll
+            self.scheduler.wait(self.order_tracker.next_poll())
+
+        self.shutdown()
 
+        # If the loop is exited, send a notification
+        self.send_notification(
+            baseRR.SendNotificationRequestMessage(message="Bot Terminated.")
+        )
+
+    def process_due_strategies(self) -> None:
+        """Runs every strategy whose wake-up has passed, then schedules each at its next wake-up."""
+        due = self.scheduler.pop_due()
+
+        if not due:
+            return
+
+        # Account snapshots only live for a single wake-up
+        self.account_cache.clear()
+
+        if self.executor is None:
             # Process each strategy sequentially
             strategy: Strategy
-            for strategy in self.brokerstrategy:
+            for strategy in due:
                 # Check if we are paused
                 if not self.pause:
                     strategy.process_strategy()
+        else:
+            self.process_strategies_concurrently(due)
 
-            # Sleep for the specified time.
-            logger.info("Sleeping...")
-            time.sleep(
-                self.botloopfrequency
-                - ((time.time() - starttime) % self.botloopfrequency)
-            )
+        for strategy in due:
+            self.scheduler.reschedule(strategy)
 
-        # If the loop is exited, send a notification
-        self.send_notification(
-            baseRR.SendNotificationRequestMessage(message="Bot Terminated.")
+    def shutdown(self) -> None:
+        """Lets running strategies finish, then releases the brokers and the database."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+        # Brokers are shared between strategies, close each once
+        brokers = {id(broker): broker for broker in self.brokerstrategy.values()}
+
+        for broker in brokers.values():
+            broker.close()
+
+        self.database.close()
+
+    def process_order_events(self) -> None:
+        """Polls tracked orders that are due and hands each finished order back to its strategy."""
+        for event in self.order_tracker.poll(self.get_order, self.cancel_order):
+            strategy = self.get_strategy(event.strategy_id)
+
+            if strategy is None:
+                continue
+
+            try:
+                strategy.handle_order_event(event)
+            except Exception:
+                logger.exception(
+                    "Strategy {} failed to process order {}.".format(
+                        strategy.strategy_name, event.order_id
+                    )
+                )
+
+            # The deadline it had was taken before the event, so it may have been sleeping past a retry
+            self.scheduler.reschedule(strategy)
+
+    def process_strategies_concurrently(
+        self, strategies: Union[list[Strategy], None] = None
+    ) -> None:
+        """Runs each broker's strategies in a worker, in parallel with other brokers' strategies.
+
+        Strategies sharing a broker run sequentially within their worker, so calls against a broker stay serialized.
+        Runs every strategy unless a subset is given.
+        """
+        groups = self.group_strategies_by_broker(strategies)
+        submitted = []
+
+        for key, strategies in groups.items():
+            # Don't stack up work behind a broker whose strategies are still running
+            running = self.running_groups.get(key)
+            if running is not None and not running.done():
+                logger.warning(
+                    "Strategies {} are still running, skipping this tick.".format(
+                        [strategy.strategy_name for strategy in strategies]
+                    )
+                )
+                continue
+
+            future = self.executor.submit(self.process_strategy_group, strategies)
+            self.running_groups[key] = future
+            submitted.append((future, strategies))
+
+        if not submitted:
+            return
+
+        # Wait for this tick's groups, giving each strategy in a group its own timeout
+        timeout = self.strategy_timeout_seconds * max(
+            len(strategies) for _, strategies in submitted
+        )
+        done, _ = concurrent.futures.wait(
+            [future for future, _ in submitted], timeout=timeout
         )
 
+        for future, strategies in submitted:
+            names = [strategy.strategy_name for strategy in strategies]
+
+            if future not in done:
+                logger.error("Strategies {} timed out.".format(names))
+            elif future.exception() is not None:
+                logger.error(
+                    "Strategies {} failed.".format(names),
+                    exc_info=future.exception(),
+                )
+
+    def process_strategy_group(self, strategies: list[Strategy]) -> None:
+        """Processes a broker's strategies sequentially, logging any that overrun their timeout."""
+        for strategy in strategies:
+            # Check if we are paused
+            if self.pause or self.killswitch:
+                return
+
+            start = self.clock.monotonic()
+
+            try:
+                strategy.process_strategy()
+            except Exception:
+                logger.exception("Strategy {} failed.".format(strategy.strategy_name))
+
+            elapsed = self.clock.monotonic() - start
+            if elapsed > self.strategy_timeout_seconds:
+                logger.error(
+                    "Strategy {} took {:.1f}s, over its {}s timeout.".format(
+                        strategy.strategy_name,
+                        elapsed,
+                        self.strategy_timeout_seconds,
+                    )
+                )
+
+    def group_strategies_by_broker(
+        self, strategies: Union[list[Strategy], None] = None
+    ) -> dict[int, list[Strategy]]:
+        """Groups strategies, all of them unless a subset is given, by the broker object they trade through."""
+        groups: dict[int, list[Strategy]] = {}
+
+        for strategy, broker in self.brokerstrategy.items():
+            if strategies is None or strategy in strategies:
+                groups.setdefault(id(broker), []).append(strategy)
+
+        return groups
+
     def get_account(
         self, request: baseRR.GetAccountRequestMessage
     ) -> Union[baseRR.GetAccountResponseMessage, None]:
@@ -114,7 +313,14 @@ class Bot(Mediator):
         if broker is None:
             return None
 
-        return broker.get_account(request)
+        # Strategies sharing a broker share one full account snapshot per tick
+        snapshot_request = baseRR.GetAccountRequestMessage(
+            request.strategy_id, True, True
+        )
+
+        return self.account_cache.get_or_load(
+            broker.id, lambda: broker.get_account(snapshot_request)
+        )
 
     def get_all_accounts(
         self, request: baseRR.GetAllAccountsRequestMessage
@@ -150,7 +356,10 @@ class Bot(Mediator):
         if broker is None:
             return None
 
-        return broker.place_order(request)
+        response = broker.place_order(request)
+        self.invalidate_account(broker)
+
+        return response
 
     def cancel_order(
         self, request: baseRR.CancelOrderRequestMessage
@@ -160,7 +369,10 @@ class Bot(Mediator):
         if broker is None:
             return None
 
-        return broker.cancel_order(request)
+        response = broker.cancel_order(request)
+        self.invalidate_account(broker)
+
+        return response
 
     def get_order(
         self, request: baseRR.GetOrderRequestMessage
@@ -180,7 +392,45 @@ class Bot(Mediator):
         if broker is None:
             return None
 
-        return broker.get_market_hours(request)
+        return self.market_calendar.get_session(
+            request.market,
+            request.product,
+            request.datetime.date(),
+            self.build_market_hours_loader(broker, request.strategy_id),
+        )
+
+    def get_next_market_hours(
+        self, request: baseRR.GetNextMarketHoursRequestMessage
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        broker = self.get_broker(request.strategy_id)
+
+        if broker is None:
+            return None
+
+        return self.market_calendar.get_next_session(
+            request.market,
+            request.product,
+            request.datetime.date(),
+            request.ends_after,
+            self.build_market_hours_loader(broker, request.strategy_id),
+        )
+
+    @staticmethod
+    def build_market_hours_loader(broker: Broker, strategy_id: int):
+        """Builds the function the market calendar uses to fetch a single day from a broker."""
+
+        def loader(
+            market: str, product: str, day: dt.date
+        ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+            request = baseRR.GetMarketHoursRequestMessage(
+                strategy_id,
+                market=market,
+                product=product,
+                datetime=dt.datetime.combine(day, dt.time()),
+            )
+            return broker.get_market_hours(request)
+
+        return loader
 
     def get_quote(
         self, request: baseRR.GetQuoteRequestMessage
@@ -200,19 +450,50 @@ class Bot(Mediator):
         if broker is None:
             return None
 
-        return broker.get_option_chain(request)
+        # Strategies sharing a broker share chains for the same underlying and date range
+        key = (
+            broker.id,
+            request.symbol,
+            request.contracttype,
+            request.optionrange,
+            request.fromdate,
+            request.todate,
+            request.includequotes,
+            request.columnar,
+        )
+
+        return self.option_chain_cache.get_or_load(
+            key, lambda: broker.get_option_chain(request)
+        )
 
     def send_notification(self, request: baseRR.SendNotificationRequestMessage) -> None:
         self.notifier.send_notification(request)
 
     def set_kill_switch(self, request: baseRR.SetKillSwitchRequestMessage) -> None:
         self.killswitch = request.kill_switch
+        self.scheduler.wake()
+
+        # Don't leave order writes queued if the process is stopped next
+        if self.killswitch:
+            self.database.flush()
 
     def pause_bot(self) -> None:
         self.pause = True
 
     def resume_bot(self) -> None:
         self.pause = False
+        self.scheduler.wake()
+
+    def track_order(self, request: baseRR.TrackOrderRequestMessage) -> None:
+        self.order_tracker.track(request)
+
+    def get_strategy(self, strategy_id: int) -> Union[Strategy, None]:
+        """Returns the strategy with a given ID"""
+        for strategy in self.brokerstrategy:
+            if strategy.strategy_id == strategy_id:
+                return strategy
+
+        return None
 
     def get_broker(self, strategy_id: int) -> Union[Broker, None]:
         """Returns the broker object associated to a given strategy
@@ -229,6 +510,10 @@ class Bot(Mediator):
 
         return None
 
+    def invalidate_account(self, broker: Broker) -> None:
+        """Drops the broker's account snapshot, i.e. after its orders or positions changed."""
+        self.account_cache.invalidate(lambda key: key == broker.id)
+
     def get_all_strategies(self) -> list[str]:
         strategies = list[str]()
 
@@ -256,3 +541,87 @@ class Bot(Mediator):
         self, request: baseRR.ReadOpenDatabaseOrdersRequest
     ) -> Union[baseRR.ReadOpenDatabaseOrdersResponse, None]:
         return self.database.read_active_orders(request)
+
+    def reconcile_orders(
+        self, request: baseRR.ReconcileOrdersRequestMessage
+    ) -> Union[baseRR.ReconcileOrdersResponseMessage, None]:
+        """Refreshes a strategy's open database orders from one account snapshot, writing the changes in one batch."""
+        stored = self.database.read_active_orders(
+            baseRR.ReadOpenDatabaseOrdersRequest(request.strategy_id)
+        )
+
+        if stored is None:
+            return None
+
+        response = baseRR.ReconcileOrdersResponseMessage()
+        response.orders = []
+
+        if not stored.orders:
+            return response
+
+        account = self.get_account(
+            baseRR.GetAccountRequestMessage(request.strategy_id, True, False)
+        )
+        latest_orders = (
+            {}
+            if account is None or account.orders is None
+            else {order.order_id: order for order in account.orders}
+        )
+
+        updates = []
+
+        for order in stored.orders:
+            latest = latest_orders.get(order.order_id)
+
+            # Older orders can be missing from the account snapshot, ask for them directly
+            if latest is None:
+                single = self.get_order(
+                    baseRR.GetOrderRequestMessage(request.strategy_id, order.order_id)
+                )
+
+                if single is None:
+                    continue
+
+                latest = single.order
+
+            self.copy_database_ids(latest, order)
+
+            # Orders the broker reports unchanged don't need rewriting
+            if self.order_changed(latest, order):
+                updates.append(baseRR.UpdateDatabaseOrderRequest(latest))
+
+            if latest.isActive():
+                response.orders.append(latest)
+
+        self.database.write_orders(updates)
+
+        return response
+
+    @staticmethod
+    def order_changed(latest: baseModels.Order, stored: baseModels.Order) -> bool:
+        """Compares the order's own columns and its number of legs.
+
+        Stored orders are read with their legs only, touching their activities would lazy load from a closed session.
+        """
+        for field in attr.fields(baseModels.Order):
+            if field.name == "activities":
+                continue
+
+            if field.name == "legs":
+                if len(getattr(latest, "legs", None) or []) != len(stored.legs or []):
+                    return True
+            elif getattr(latest, field.name, None) != getattr(stored, field.name, None):
+                return True
+
+        return False
+
+    @staticmethod
+    def copy_database_ids(latest: baseModels.Order, stored: baseModels.Order) -> None:
+        """Points a broker order at its database record, so it updates rather than inserts."""
+        latest.id = stored.id
+        latest.strategy_id = stored.strategy_id
+
+        for leg in latest.legs:
+            for stored_leg in stored.legs:
+                if leg.cusip == stored_leg.cusip:
+                    leg.id = stored_leg.id
@@ -0,0 +1,179 @@
+"""
+An array-backed option chain expiration, holding one NumPy array per field sorted by strike instead of a dict of
+Strike objects. Legacy code can still read Strike views through `strikes`, `get` and `strike_at`.
+
+Classes:
+
+    ColumnarExpirationDate
+
+Functions:
+
+    as_columnar()
+    from_contracts()
+    strike_at()
+    get()
+"""
+
+import datetime as dt
+from typing import Union
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+import numpy as np
+
+ExpirationDate = baseRR.GetOptionChainResponseMessage.ExpirationDate
+Strike = ExpirationDate.Strike
+
+NUMERIC_FIELDS = {
+    "strike": "strikePrice",
+    "multiplier": "multiplier",
+    "bid": "bid",
+    "ask": "ask",
+    "delta": "delta",
+    "gamma": "gamma",
+    "theta": "theta",
+    "vega": "vega",
+    "rho": "rho",
+}
+
+TEXT_FIELDS = {
+    "symbol": "symbol",
+    "description": "description",
+    "putcall": "putCall",
+    "settlementtype": "settlementType",
+    "expirationtype": "expirationType",
+}
+
+
+def float_array(values: list) -> np.ndarray:
+    """Builds a float array, with NaN for missing or non-numeric values."""
+    return np.array(
+        [value if isinstance(value, (int, float)) else np.nan for value in values],
+        dtype=float,
+    )
+
+
+@attr.s(auto_attribs=True, eq=False)
+class ColumnarExpirationDate:
+    """The contracts for a single expiration, one array per field, sorted by strike."""
+
+    expirationdate: dt.datetime
+    daystoexpiration: int
+    strike: np.ndarray
+    multiplier: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    theta: np.ndarray
+    vega: np.ndarray
+    rho: np.ndarray
+    symbol: np.ndarray
+    description: np.ndarray
+    putcall: np.ndarray
+    settlementtype: np.ndarray
+    expirationtype: np.ndarray
+    legacy_strikes: Union[dict[float, Strike], None] = attr.ib(default=None, init=False)
+
+    @classmethod
+    def from_contracts(
+        cls, expirationdate: dt.datetime, daystoexpiration: int, contracts: list[dict]
+    ) -> "ColumnarExpirationDate":
+        """Builds an expiration from raw contract dictionaries, keeping the last contract per strike."""
+        bystrike = {contract.get("strikePrice"): contract for contract in contracts}
+        ordered = [bystrike[strike] for strike in sorted(bystrike)]
+
+        keys = list(NUMERIC_FIELDS.values())
+        rows = [[contract.get(key, np.nan) for key in keys] for contract in ordered]
+
+        try:
+            numeric = np.array(rows, dtype=float).reshape(len(ordered), len(keys))
+        except (TypeError, ValueError):
+            numeric = np.column_stack(
+                [float_array(list(column)) for column in zip(*rows)]
+            )
+
+        # Each field is a contiguous copy, so it doesn't keep the whole table alive
+        columns: dict = {
+            field: np.ascontiguousarray(numeric[:, index])
+            for index, field in enumerate(NUMERIC_FIELDS)
+        }
+        columns.update(
+            {
+                field: np.array(
+                    [contract.get(key, "") for contract in ordered], dtype=object
+                )
+                for field, key in TEXT_FIELDS.items()
+            }
+        )
+
+        return cls(expirationdate, daystoexpiration, **columns)
+
+    @classmethod
+    def from_expiration(cls, expiration: ExpirationDate) -> "ColumnarExpirationDate":
+        """Builds an expiration from a legacy dict-of-Strike expiration."""
+        contracts = [
+            {
+                **{
+                    key: getattr(details, field)
+                    for field, key in NUMERIC_FIELDS.items()
+                },
+                **{key: getattr(details, field) for field, key in TEXT_FIELDS.items()},
+            }
+            for details in expiration.strikes.values()
+        ]
+
+        return cls.from_contracts(
+            expiration.expirationdate, expiration.daystoexpiration, contracts
+        )
+
+    def __len__(self) -> int:
+        return len(self.strike)
+
+    def strike_at(self, index: int) -> Strike:
+        """Builds a legacy Strike view of the contract at a position in the arrays."""
+        view = Strike()
+
+        for field in NUMERIC_FIELDS:
+            setattr(view, field, float(getattr(self, field)[index]))
+
+        for field in TEXT_FIELDS:
+            setattr(view, field, getattr(self, field)[index])
+
+        return view
+
+    def index_of(self, strike: float) -> Union[int, None]:
+        """Finds a strike's position with a binary search, or None if it isn't in the chain."""
+        index = int(np.searchsorted(self.strike, strike))
+
+        if index < len(self.strike) and self.strike[index] == strike:
+            return index
+
+        return None
+
+    def get(self, strike: float) -> Union[Strike, None]:
+        """Returns a Strike view for a given strike price, or None if it isn't in the chain."""
+        index = self.index_of(strike)
+
+        return None if index is None else self.strike_at(index)
+
+    @property
+    def strikes(self) -> dict[float, Strike]:
+        """The chain as the legacy dict of Strike objects, built on first use."""
+        if self.legacy_strikes is None:
+            self.legacy_strikes = {
+                float(strike): self.strike_at(index)
+                for index, strike in enumerate(self.strike)
+            }
+
+        return self.legacy_strikes
+
+
+def as_columnar(
+    expiration: Union[ExpirationDate, ColumnarExpirationDate]
+) -> ColumnarExpirationDate:
+    """Returns the expiration as a ColumnarExpirationDate, converting it if a broker returned a legacy one."""
+    if isinstance(expiration, ColumnarExpirationDate):
+        return expiration
+
+    return ColumnarExpirationDate.from_expiration(expiration)
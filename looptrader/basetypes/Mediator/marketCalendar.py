@@ -0,0 +1,296 @@
+"""
+A locally persisted market-hours calendar, so strategies can look up the current or next session without a broker call.
+
+Classes:
+
+    MarketCalendar
+
+Functions:
+
+    get_session()
+    get_next_session()
+"""
+
+import bisect
+import datetime as dt
+import json
+import logging
+import os
+import threading
+from typing import Callable, Optional, Union
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Mediator.strategyScheduler import utc_now
+
+logger = logging.getLogger("autotrader")
+
+# Loads the hours for a (market, product) on a date. None means the request failed.
+HoursLoader = Callable[
+    [str, str, dt.date], Union[baseRR.GetMarketHoursResponseMessage, None]
+]
+
+
+@attr.s(auto_attribs=True)
+class _Sessions:
+    """Sorted days and their regular session (None if closed) for a single (market, product)."""
+
+    refreshed: Optional[dt.date] = None
+    days: list[dt.date] = attr.ib(factory=list)
+    sessions: list[Optional[tuple[dt.datetime, dt.datetime]]] = attr.ib(factory=list)
+    # When a fetch last came back incomplete, so a failing broker isn't asked again on every lookup
+    failed_at: Optional[dt.datetime] = None
+
+
+@attr.s(auto_attribs=True)
+class MarketCalendar:
+    """Fetches market sessions for a range of days in bulk once per day, persists them, and answers lookups from memory.
+
+    If some days fail to load, the ones that did are merged in, the stale sessions keep being served, and the fetch is
+    retried after retry_seconds.
+    """
+
+    filename: str = attr.ib(validator=attr.validators.instance_of(str))
+    days_ahead: int = attr.ib(default=14, validator=attr.validators.instance_of(int))
+    retry_seconds: float = attr.ib(
+        default=900.0, validator=attr.validators.instance_of(float)
+    )
+    clock: Callable[[], dt.datetime] = attr.ib(default=utc_now)
+    calendars: dict[tuple[str, str], _Sessions] = attr.ib(factory=dict, init=False)
+    lock: threading.RLock = attr.ib(factory=threading.RLock, init=False)
+
+    def __attrs_post_init__(self):
+        self.load()
+
+    ###########
+    # Lookups #
+    ###########
+    def get_session(
+        self, market: str, product: str, day: dt.date, loader: HoursLoader
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        """Returns the regular session on a given day, isopen=False if the market is closed, or None if the day
+        couldn't be loaded."""
+        with self.lock:
+            calendar = self.ensure(market, product, day, loader)
+
+            index = bisect.bisect_left(calendar.days, day)
+
+            if index < len(calendar.days) and calendar.days[index] == day:
+                session = calendar.sessions[index]
+
+                if session is None:
+                    return self.build_closed_response(day)
+
+                return self.build_response(session)
+
+            return None
+
+    def get_next_session(
+        self,
+        market: str,
+        product: str,
+        day: dt.date,
+        ends_after: dt.datetime,
+        loader: HoursLoader,
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        """Returns the first session on or after a given day that ends after a given time."""
+        with self.lock:
+            calendar = self.ensure(market, product, day, loader)
+
+            for _ in range(2):
+                index = bisect.bisect_left(calendar.days, day)
+
+                for session in calendar.sessions[index:]:
+                    if session is not None and session[1] > ends_after:
+                        return self.build_response(session)
+
+                # Nothing open in the window, look one window further before giving up
+                if not calendar.days:
+                    return None
+
+                day = calendar.days[-1] + dt.timedelta(days=1)
+                calendar = self.ensure(market, product, day, loader)
+
+            return None
+
+    ############
+    # Fetching #
+    ############
+    def ensure(
+        self, market: str, product: str, day: dt.date, loader: HoursLoader
+    ) -> _Sessions:
+        """Makes sure the calendar is fresh for today and covers the given day."""
+        now = self.clock()
+        today = now.date()
+        calendar = self.calendars.setdefault((market, product), _Sessions())
+        refreshing = calendar.refreshed != today
+
+        if refreshing:
+            start = min(today, day)
+        elif not calendar.days or calendar.days[-1] < day:
+            start = calendar.days[-1] + dt.timedelta(days=1) if calendar.days else day
+        else:
+            return calendar
+
+        # Don't hammer a failing broker, serve what we have until the retry interval passes
+        if (
+            calendar.failed_at is not None
+            and (now - calendar.failed_at).total_seconds() < self.retry_seconds
+        ):
+            return calendar
+
+        days, sessions, complete = self.fetch(market, product, start, day, loader)
+
+        # A complete refresh replaces the days before it, a partial one only adds the days that loaded
+        if refreshing and complete:
+            index = bisect.bisect_left(calendar.days, start)
+            calendar.days, calendar.sessions = (
+                calendar.days[index:],
+                calendar.sessions[index:],
+            )
+
+        self.merge(calendar, days, sessions)
+
+        if complete:
+            calendar.failed_at = None
+
+            if refreshing:
+                calendar.refreshed = today
+        else:
+            calendar.failed_at = now
+
+        if days:
+            self.save()
+
+        return calendar
+
+    def fetch(
+        self,
+        market: str,
+        product: str,
+        start: dt.date,
+        through: dt.date,
+        loader: HoursLoader,
+    ) -> tuple[list, list, bool]:
+        """Loads every day from start through days_ahead past the given day. Returns the days that loaded, their
+        sessions, and whether every day loaded."""
+        days = []
+        sessions = []
+        complete = True
+
+        end = max(through, start) + dt.timedelta(days=self.days_ahead)
+        day = start
+
+        while day <= end:
+            hours = loader(market, product, day)
+
+            if hours is None:
+                logger.error(
+                    "Failed to load market hours for {} {} on {}.".format(
+                        market, product, day
+                    )
+                )
+                complete = False
+            else:
+                days.append(day)
+                sessions.append((hours.start, hours.end) if hours.isopen else None)
+
+            day += dt.timedelta(days=1)
+
+        return days, sessions, complete
+
+    @staticmethod
+    def merge(calendar: _Sessions, days: list, sessions: list) -> None:
+        """Merges freshly loaded days into a calendar, replacing any stale sessions for the same days."""
+        merged = dict(zip(calendar.days, calendar.sessions))
+        merged.update(zip(days, sessions))
+
+        calendar.days = sorted(merged)
+        calendar.sessions = [merged[day] for day in calendar.days]
+
+    @staticmethod
+    def build_response(
+        session: Optional[tuple[dt.datetime, dt.datetime]]
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        if session is None:
+            return None
+
+        response = baseRR.GetMarketHoursResponseMessage()
+        response.start, response.end = session
+        response.isopen = True
+
+        return response
+
+    @staticmethod
+    def build_closed_response(day: dt.date) -> baseRR.GetMarketHoursResponseMessage:
+        """A response for a day the market is closed, like the brokers build."""
+        response = baseRR.GetMarketHoursResponseMessage()
+
+        midnight = dt.datetime.combine(day, dt.time(), dt.timezone.utc)
+        response.start = midnight
+        response.end = midnight
+        response.isopen = False
+
+        return response
+
+    ###############
+    # Persistence #
+    ###############
+    def load(self) -> None:
+        """Reads the persisted calendar, if there is one."""
+        if not os.path.exists(self.filename):
+            return
+
+        try:
+            with open(self.filename, "r") as file:
+                raw: dict = json.load(file)
+
+            for key, value in raw.items():
+                market, product = key.split("|")
+                calendar = _Sessions()
+                calendar.refreshed = dt.date.fromisoformat(value["refreshed"])
+
+                for day, session in value["days"]:
+                    calendar.days.append(dt.date.fromisoformat(day))
+                    calendar.sessions.append(
+                        None
+                        if session is None
+                        else (
+                            dt.datetime.fromisoformat(session[0]),
+                            dt.datetime.fromisoformat(session[1]),
+                        )
+                    )
+
+                self.calendars[(market, product)] = calendar
+        except Exception:
+            logger.exception("Failed to read market calendar {}.".format(self.filename))
+            self.calendars = {}
+
+    def save(self) -> None:
+        """Writes the calendar to disk so restarts don't need to refetch it."""
+        raw = {}
+
+        for (market, product), calendar in self.calendars.items():
+            if calendar.refreshed is None:
+                continue
+
+            raw["{}|{}".format(market, product)] = {
+                "refreshed": calendar.refreshed.isoformat(),
+                "days": [
+                    [
+                        day.isoformat(),
+                        None
+                        if session is None
+                        else [session[0].isoformat(), session[1].isoformat()],
+                    ]
+                    for day, session in zip(calendar.days, calendar.sessions)
+                ],
+            }
+
+        try:
+            with open(self.filename, "w") as file:
+                json.dump(raw, file)
+        except Exception:
+            logger.exception(
+                "Failed to write market calendar {}.".format(self.filename)
+            )
@@ -0,0 +1,187 @@
+"""
+Tracks placed orders until they fill, are cancelled or rejected, so strategies don't block waiting on fills.
+
+Each order moves WORKING -> CANCELING -> done. Working orders are polled on an adaptive schedule, fast at first and
+backing off. Orders still working at their fill timeout are cancelled, then polled until the broker reports their
+final status, so an order that filled while being cancelled is still reported as FILLED.
+
+Classes:
+
+    TrackedOrder
+    OrderTracker
+
+Functions:
+
+    track()
+    poll()
+    next_poll()
+"""
+
+import datetime as dt
+import logging
+import threading
+from typing import Callable, Union
+
+import attr
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Mediator.strategyScheduler import utc_now
+
+logger = logging.getLogger("autotrader")
+
+GetOrder = Callable[
+    [baseRR.GetOrderRequestMessage], Union[baseRR.GetOrderResponseMessage, None]
+]
+CancelOrder = Callable[
+    [baseRR.CancelOrderRequestMessage], Union[baseRR.CancelOrderResponseMessage, None]
+]
+
+
+@attr.s(auto_attribs=True)
+class TrackedOrder:
+    """A placed order and where it is in the tracking state machine."""
+
+    request: baseRR.TrackOrderRequestMessage
+    deadline: dt.datetime
+    next_poll: dt.datetime
+    interval: float
+    state: str = "WORKING"
+    cancel_polls: int = 0
+    last_order: Union[baseRR.GetOrderResponseMessage, None] = None
+
+
+@attr.s(auto_attribs=True)
+class OrderTracker:
+    """Polls tracked orders when they are due and returns an event for each order that reached a final status."""
+
+    initial_poll_seconds: float = attr.ib(
+        default=1.0, validator=attr.validators.instance_of(float)
+    )
+    max_poll_seconds: float = attr.ib(
+        default=10.0, validator=attr.validators.instance_of(float)
+    )
+    backoff: float = attr.ib(default=1.5, validator=attr.validators.instance_of(float))
+    max_cancel_polls: int = attr.ib(
+        default=10, validator=attr.validators.instance_of(int)
+    )
+    clock: Callable[[], dt.datetime] = attr.ib(default=utc_now)
+    orders: dict[int, TrackedOrder] = attr.ib(factory=dict, init=False)
+    lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+
+    def track(self, request: baseRR.TrackOrderRequestMessage) -> None:
+        """Starts tracking a placed order."""
+        now = self.clock()
+
+        with self.lock:
+            self.orders[request.order_id] = TrackedOrder(
+                request,
+                deadline=now + dt.timedelta(seconds=request.fill_timeout_seconds),
+                next_poll=now + dt.timedelta(seconds=self.initial_poll_seconds),
+                interval=self.initial_poll_seconds,
+            )
+
+    def next_poll(self) -> Union[dt.datetime, None]:
+        """When the next order is due to be polled, or None if nothing is tracked."""
+        with self.lock:
+            if not self.orders:
+                return None
+
+            return min(order.next_poll for order in self.orders.values())
+
+    def pending(self, strategy_id: int) -> list[int]:
+        """The IDs of a strategy's orders that are still being tracked."""
+        with self.lock:
+            return [
+                order_id
+                for order_id, order in self.orders.items()
+                if order.request.strategy_id == strategy_id
+            ]
+
+    def poll(
+        self, get_order: GetOrder, cancel_order: CancelOrder
+    ) -> list[baseRR.OrderEventMessage]:
+        """Polls every due order once and returns events for the orders that are done."""
+        now = self.clock()
+
+        with self.lock:
+            due = [order for order in self.orders.values() if order.next_poll <= now]
+
+        events = []
+
+        for order in due:
+            event = self.poll_order(order, now, get_order, cancel_order)
+
+            if event is None:
+                continue
+
+            with self.lock:
+                del self.orders[order.request.order_id]
+
+            events.append(event)
+
+        return events
+
+    def poll_order(
+        self,
+        order: TrackedOrder,
+        now: dt.datetime,
+        get_order: GetOrder,
+        cancel_order: CancelOrder,
+    ) -> Union[baseRR.OrderEventMessage, None]:
+        """Advances a single order's state machine, returning an event if it is done."""
+        request = order.request
+        response = get_order(
+            baseRR.GetOrderRequestMessage(request.strategy_id, request.order_id)
+        )
+
+        if response is not None:
+            order.last_order = response
+
+            if not response.order.isActive():
+                return self.build_event(order, response.order.status)
+
+        if order.state == "CANCELING":
+            order.cancel_polls += 1
+
+            if order.cancel_polls >= self.max_cancel_polls:
+                logger.error(
+                    "Order {} did not confirm its cancellation, no longer tracking it.".format(
+                        request.order_id
+                    )
+                )
+                return self.build_event(order, "UNKNOWN")
+
+        # Cancel working orders that reached their timeout, resending until the broker confirms
+        if now >= order.deadline:
+            if order.state == "WORKING":
+                logger.info(
+                    "Order {} not filled after {}s, cancelling.".format(
+                        request.order_id, request.fill_timeout_seconds
+                    )
+                )
+                order.state = "CANCELING"
+
+            cancel_order(
+                baseRR.CancelOrderRequestMessage(request.strategy_id, request.order_id)
+            )
+
+            order.next_poll = now + dt.timedelta(seconds=self.initial_poll_seconds)
+            return None
+
+        # Poll fast at first, backing off, but never past the fill timeout
+        order.interval = min(order.interval * self.backoff, self.max_poll_seconds)
+        order.next_poll = min(
+            now + dt.timedelta(seconds=order.interval), order.deadline
+        )
+
+        return None
+
+    @staticmethod
+    def build_event(order: TrackedOrder, status: str) -> baseRR.OrderEventMessage:
+        return baseRR.OrderEventMessage(
+            strategy_id=order.request.strategy_id,
+            order_id=order.request.order_id,
+            status=status,
+            timed_out=order.state == "CANCELING",
+            order=None if order.last_order is None else order.last_order.order,
+            order_request=order.request.order_request,
+        )
@@ -1,4 +1,5 @@
 from datetime import date, datetime
+from typing import Optional
 
 import attr
 import basetypes.Mediator.baseModels as base
@@ -31,6 +32,7 @@ class GetOptionChainRequestMessage:
     )
     fromdate: date = attr.ib(validator=attr.validators.instance_of(date))
     todate: date = attr.ib(validator=attr.validators.instance_of(date))
+    columnar: bool = attr.ib(default=False, validator=attr.validators.instance_of(bool))
 
 
 @attr.s(auto_attribs=True, init=False)
@@ -71,6 +73,7 @@ class GetOptionChainResponseMessage:
     status: str = attr.ib(validator=attr.validators.instance_of(str))
     underlyinglastprice: float = attr.ib(validator=attr.validators.instance_of(float))
     volatility: float = attr.ib(validator=attr.validators.instance_of(float))
+    # Lists of ColumnarExpirationDate instead when the request asked for a columnar chain
     putexpdatemap: list[ExpirationDate] = attr.ib(
         validator=attr.validators.instance_of(list[ExpirationDate])
     )
@@ -192,6 +195,34 @@ class GetOrderResponseMessage:
     order: base.Order = attr.ib(validator=attr.validators.instance_of(base.Order))
 
 
+@attr.s(auto_attribs=True)
+class TrackOrderRequestMessage:
+    """Generic request object for tracking a placed order until it fills, cancelling it after a timeout."""
+
+    strategy_id: int = attr.ib(validator=attr.validators.instance_of(int))
+    order_id: int = attr.ib(validator=attr.validators.instance_of(int))
+    order_request: PlaceOrderRequestMessage = attr.ib(
+        validator=attr.validators.instance_of(PlaceOrderRequestMessage)
+    )
+    fill_timeout_seconds: float = attr.ib(validator=attr.validators.instance_of(float))
+
+
+@attr.s(auto_attribs=True)
+class OrderEventMessage:
+    """Generic event object for a tracked order that was filled, cancelled, rejected or expired."""
+
+    strategy_id: int = attr.ib(validator=attr.validators.instance_of(int))
+    order_id: int = attr.ib(validator=attr.validators.instance_of(int))
+    status: str = attr.ib(validator=attr.validators.instance_of(str))
+    timed_out: bool = attr.ib(validator=attr.validators.instance_of(bool))
+    order: Optional[base.Order] = attr.ib(
+        validator=attr.validators.optional(attr.validators.instance_of(base.Order))
+    )
+    order_request: PlaceOrderRequestMessage = attr.ib(
+        validator=attr.validators.instance_of(PlaceOrderRequestMessage)
+    )
+
+
 @attr.s(auto_attribs=True)
 class GetMarketHoursRequestMessage:
     """Generic request object for getting Market Hours."""
@@ -206,6 +237,20 @@ class GetMarketHoursRequestMessage:
     )
 
 
+@attr.s(auto_attribs=True)
+class GetNextMarketHoursRequestMessage:
+    """Generic request object for getting the first Market Hours session on or after a date that ends after a given time."""
+
+    strategy_id: int = attr.ib(validator=attr.validators.instance_of(int))
+    market: str = attr.ib(
+        validator=attr.validators.in_(["OPTION", "EQUITY", "FUTURE", "FOREX", "BOND"])
+    )
+    product: str = attr.ib(validator=attr.validators.in_(["EQO", "IND"]))
+    # Declared before the datetime field, which shadows the datetime class in the class body
+    ends_after: datetime = attr.ib(validator=attr.validators.instance_of(datetime))
+    datetime: datetime = attr.ib(validator=attr.validators.instance_of(datetime))
+
+
 @attr.s(auto_attribs=True, init=False)
 class GetMarketHoursResponseMessage:
     """Generic reponse object for getting Market Hours."""
@@ -334,6 +379,25 @@ class ReadOpenDatabaseOrdersResponse:
     )
 
 
+####################
+# Reconcile Orders #
+####################
+@attr.s(auto_attribs=True)
+class ReconcileOrdersRequestMessage:
+    """Generic request object for refreshing a strategy's open database orders from its broker."""
+
+    strategy_id: int = attr.ib(validator=attr.validators.instance_of(int))
+
+
+@attr.s(auto_attribs=True, init=False)
+class ReconcileOrdersResponseMessage:
+    """Generic response object with a strategy's latest orders that are still open at the broker."""
+
+    orders: list[base.Order] = attr.ib(
+        validator=attr.validators.instance_of(list[base.Order])
+    )
+
+
 @attr.s(auto_attribs=True)
 class GetQuoteRequestMessage:
     strategy_id: int = attr.ib(validator=attr.validators.instance_of(int))
@@ -0,0 +1,151 @@
+"""
+A deadline-driven scheduler for strategies, so the Bot sleeps until the earliest wake-up any strategy asked for
+instead of polling every strategy on a fixed interval.
+
+Classes:
+
+    StrategyScheduler
+
+Functions:
+
+    schedule()
+    reschedule()
+    pop_due()
+    wait()
+    wake()
+"""
+
+import datetime as dt
+import heapq
+import itertools
+import logging
+import threading
+from typing import Callable, Iterator, Union
+
+import attr
+from basetypes.Strategy.abstractAsyncStrategy import AsyncStrategy
+from basetypes.Strategy.abstractStrategy import Strategy
+
+logger = logging.getLogger("autotrader")
+
+# The async bot schedules its AsyncStrategies on the same queue
+Schedulable = Union[Strategy, AsyncStrategy]
+
+
+def utc_now() -> dt.datetime:
+    return dt.datetime.now().astimezone(dt.timezone.utc)
+
+
+@attr.s(auto_attribs=True)
+class StrategyScheduler:
+    """A priority queue of strategy deadlines.
+
+    Strategies report their next wake-up through Strategy.next_wakeup. Strategies without an opinion run every
+    default_interval_seconds, and no strategy is scheduled sooner than min_interval_seconds after it last ran.
+    """
+
+    default_interval_seconds: float = attr.ib(
+        default=60.0, validator=attr.validators.instance_of(float)
+    )
+    min_interval_seconds: float = attr.ib(
+        default=1.0, validator=attr.validators.instance_of(float)
+    )
+    clock: Callable[[], dt.datetime] = attr.ib(default=utc_now)
+    # Blocks on the wake-up event for up to a timeout, a simulated clock jumps ahead instead
+    wait_on: Callable[[threading.Event, float], bool] = attr.ib(
+        default=threading.Event.wait
+    )
+    queue: list[tuple[dt.datetime, int, Schedulable]] = attr.ib(
+        factory=list, init=False
+    )
+    current: dict[int, int] = attr.ib(factory=dict, init=False)
+    counter: Iterator[int] = attr.ib(factory=itertools.count, init=False)
+    wakeup: threading.Event = attr.ib(factory=threading.Event, init=False)
+    lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+
+    def schedule(self, strategy: Schedulable, when: dt.datetime) -> None:
+        """Sets a strategy's next deadline, replacing any earlier one."""
+        with self.lock:
+            sequence = next(self.counter)
+            self.current[id(strategy)] = sequence
+            heapq.heappush(self.queue, (when, sequence, strategy))
+
+    def reschedule(self, strategy: Schedulable) -> dt.datetime:
+        """Schedules a strategy at the wake-up it reports, bounded by the minimum interval."""
+        now = self.clock()
+        when = None
+
+        try:
+            when = strategy.next_wakeup(now)
+        except Exception:
+            logger.exception(
+                "Strategy {} failed to report its next wake-up.".format(
+                    strategy.strategy_name
+                )
+            )
+
+        if when is None:
+            when = now + dt.timedelta(seconds=self.default_interval_seconds)
+
+        when = max(when, now + dt.timedelta(seconds=self.min_interval_seconds))
+
+        self.schedule(strategy, when)
+
+        return when
+
+    def pop_due(self) -> list[Schedulable]:
+        """Removes and returns every strategy whose deadline has passed, earliest first."""
+        now = self.clock()
+        due = []
+
+        with self.lock:
+            while self.queue and self.queue[0][0] <= now:
+                _, sequence, strategy = heapq.heappop(self.queue)
+
+                # Skip entries superseded by a later schedule() call
+                if self.current.get(id(strategy)) != sequence:
+                    continue
+
+                del self.current[id(strategy)]
+                due.append(strategy)
+
+        return due
+
+    def next_deadline(self) -> Union[dt.datetime, None]:
+        """The earliest pending deadline, or None if nothing is scheduled."""
+        with self.lock:
+            while (
+                self.queue
+                and self.current.get(id(self.queue[0][2])) != self.queue[0][1]
+            ):
+                heapq.heappop(self.queue)
+
+            return self.queue[0][0] if self.queue else None
+
+    def wait(self, until: Union[dt.datetime, None] = None) -> None:
+        """Blocks until the earliest deadline, an optional earlier time, or until wake() is called."""
+        deadlines = [
+            deadline
+            for deadline in (self.next_deadline(), until)
+            if deadline is not None
+        ]
+
+        timeout = (
+            (min(deadlines) - self.clock()).total_seconds()
+            if deadlines
+            else self.default_interval_seconds
+        )
+
+        if timeout > 0:
+            logger.info(
+                "Sleeping until {}.".format(
+                    self.clock() + dt.timedelta(seconds=timeout)
+                )
+            )
+            self.wait_on(self.wakeup, timeout)
+
+        self.wakeup.clear()
+
+    def wake(self) -> None:
+        """Interrupts wait(), i.e. when the kill switch is set or the bot resumes."""
+        self.wakeup.set()
@@ -0,0 +1,113 @@
+"""
+A small thread-safe TTL cache with request coalescing, used by the Mediator to share broker responses between strategies.
+
+Classes:
+
+    CacheStats
+    TtlCache
+
+Functions:
+
+    get_or_load()
+    invalidate()
+    clear()
+"""
+
+import threading
+import time
+from typing import Any, Callable, Hashable, Union
+
+import attr
+
+
+@attr.s(auto_attribs=True)
+class CacheStats:
+    """Hit/miss counters for a TtlCache."""
+
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+
+
+@attr.s(auto_attribs=True)
+class TtlCache:
+    """Caches loader results per key for ttl_seconds. Concurrent misses on the same key share one load.
+
+    Failed loads (None) are never cached.
+    """
+
+    ttl_seconds: float = attr.ib(validator=attr.validators.instance_of(float))
+    clock: Callable[[], float] = attr.ib(default=time.monotonic)
+    stats: CacheStats = attr.ib(factory=CacheStats, init=False)
+    entries: dict = attr.ib(factory=dict, init=False)
+    inflight: dict = attr.ib(factory=dict, init=False)
+    lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Union[Any, None]:
+        """Returns the cached value for key, calling loader on a miss.
+
+        Args:
+            key (Hashable): Cache key
+            loader (Callable[[], Any]): Called to produce the value on a miss
+
+        Returns:
+            Union[Any, None]: The cached or freshly loaded value
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None:
+                loaded_at, value = entry
+                if self.clock() - loaded_at < self.ttl_seconds:
+                    self.stats.hits += 1
+                    return value
+
+                del self.entries[key]
+                self.stats.evictions += 1
+
+            # Someone else is already loading this key, wait for their result
+            pending = self.inflight.get(key)
+            owner = pending is None
+
+            if owner:
+                self.stats.misses += 1
+                pending = self.inflight[key] = _PendingLoad()
+            else:
+                self.stats.coalesced += 1
+
+        if not owner:
+            pending.event.wait()
+            return pending.value
+
+        try:
+            pending.value = loader()
+        finally:
+            with self.lock:
+                if pending.value is not None:
+                    self.entries[key] = (self.clock(), pending.value)
+                del self.inflight[key]
+            pending.event.set()
+
+        return pending.value
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drops every cached key matching the predicate."""
+        with self.lock:
+            for key in [key for key in self.entries if predicate(key)]:
+                del self.entries[key]
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Drops every cached key."""
+        with self.lock:
+            self.stats.evictions += len(self.entries)
+            self.entries.clear()
+
+
+@attr.s(auto_attribs=True)
+class _PendingLoad:
+    """A load in progress that other callers of the same key can wait on."""
+
+    event: threading.Event = attr.ib(factory=threading.Event)
+    value: Any = None
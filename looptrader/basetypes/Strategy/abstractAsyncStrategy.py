@@ -0,0 +1,27 @@
+import abc
+import datetime as dt
+from typing import Union
+
+import attr
+from basetypes.Component.abstractAsyncComponent import AsyncComponent
+
+
+@attr.s(auto_attribs=True, eq=False)
+class AsyncStrategy(abc.ABC, AsyncComponent):
+    """
+    The AsyncStrategy class is the asyncio counterpart of Strategy, for strategies that await their I/O through an AsyncMediator.
+    """
+
+    strategy_name: str = attr.ib(validator=attr.validators.instance_of(str))
+    underlying: str = attr.ib(validator=attr.validators.instance_of(str))
+    strategy_id: int = attr.ib(default=-1, validator=attr.validators.instance_of(int))
+
+    @abc.abstractmethod
+    async def process_strategy(self):
+        raise NotImplementedError(
+            "Each strategy must implement the 'ProcessStrategy' method."
+        )
+
+    def next_wakeup(self, now: dt.datetime) -> Union[dt.datetime, None]:
+        """Returns when the strategy next needs to run, or None to run on the bot's default cadence."""
+        return None
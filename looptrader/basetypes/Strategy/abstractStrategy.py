@@ -1,8 +1,14 @@
 import abc
+import datetime as dt
+import logging
+from typing import Union
 
 import attr
+import basetypes.Mediator.reqRespTypes as baseRR
 from basetypes.Component.abstractComponent import Component
 
+logger = logging.getLogger("autotrader")
+
 
 @attr.s(auto_attribs=True, eq=False)
 class Strategy(abc.ABC, Component):
@@ -13,9 +19,99 @@ class Strategy(abc.ABC, Component):
     strategy_name: str = attr.ib(validator=attr.validators.instance_of(str))
     underlying: str = attr.ib(validator=attr.validators.instance_of(str))
     strategy_id: int = attr.ib(default=-1, validator=attr.validators.instance_of(int))
+    pending_order_ids: set[int] = attr.ib(factory=set, init=False)
+    # How long to wait before placing again after the broker rejects, cancels or expires an order
+    rejected_order_backoff_seconds: float = attr.ib(
+        default=120.0, kw_only=True, validator=attr.validators.instance_of(float)
+    )
+    retry_after: dt.datetime = attr.ib(
+        init=False,
+        default=dt.datetime.min.replace(tzinfo=dt.timezone.utc),
+        validator=attr.validators.instance_of(dt.datetime),
+    )
 
     @abc.abstractmethod
     def process_strategy(self):
         raise NotImplementedError(
             "Each strategy must implement the 'ProcessStrategy' method."
         )
+
+    def now(self) -> dt.datetime:
+        """The current time in UTC, read from the mediator's clock so simulations don't wait in real time."""
+        return self.mediator.clock.now()
+
+    def today(self) -> dt.date:
+        """Today's local date from the mediator's clock."""
+        return self.mediator.clock.today()
+
+    def next_wakeup(self, now: dt.datetime) -> Union[dt.datetime, None]:
+        """Returns when the strategy next needs to run, or None to run on the bot's default cadence."""
+        return None
+
+    def backing_off(self, now: dt.datetime) -> bool:
+        """Whether the strategy is waiting out a rejected order before placing again."""
+        return now < self.retry_after
+
+    def track_order(
+        self,
+        orderrequest: baseRR.PlaceOrderRequestMessage,
+        order_id: int,
+        fill_timeout_seconds: float,
+    ) -> None:
+        """Hands a placed order to the mediator to watch, its outcome arrives in process_order_event."""
+        self.pending_order_ids.add(order_id)
+        self.mediator.track_order(
+            baseRR.TrackOrderRequestMessage(
+                self.strategy_id, order_id, orderrequest, fill_timeout_seconds
+            )
+        )
+
+    def handle_order_event(self, event: baseRR.OrderEventMessage) -> None:
+        """Called by the mediator when a tracked order is done."""
+        # The broker never confirmed the cancel, so the order may still be live. Placing another could double the
+        # position, so it stays pending and the user is asked to check it.
+        if event.status == "UNKNOWN":
+            logger.error(
+                "Order {} did not confirm its cancellation, not placing another.".format(
+                    event.order_id
+                )
+            )
+            self.mediator.send_notification(
+                baseRR.SendNotificationRequestMessage(
+                    "{}: order {} did not confirm its cancellation and may still be live. Check it with the "
+                    "broker, the strategy won't place another until it restarts.".format(
+                        self.strategy_name, event.order_id
+                    )
+                )
+            )
+            return
+
+        self.pending_order_ids.discard(event.order_id)
+
+        # Orders cancelled at their fill timeout are re-placed at the current price. Anything else the broker ended,
+        # i.e. a rejection, waits out the backoff so the same order isn't sent straight back.
+        if event.status != "FILLED" and not event.timed_out:
+            self.retry_after = self.now() + dt.timedelta(
+                seconds=self.rejected_order_backoff_seconds
+            )
+            logger.warning(
+                "Order {} was {}, not placing again until {}.".format(
+                    event.order_id, event.status, self.retry_after
+                )
+            )
+            return
+
+        # A paused bot places no new orders, the strategy places again once it resumes
+        if event.status != "FILLED" and self.mediator.pause:
+            logger.info(
+                "Order {} timed out while paused, not placing again.".format(
+                    event.order_id
+                )
+            )
+            return
+
+        self.process_order_event(event)
+
+    def process_order_event(self, event: baseRR.OrderEventMessage) -> None:
+        """Reacts to a tracked order filling, or being cancelled at its fill timeout."""
+        return None
@@ -1,14 +1,15 @@
-import datetime as dt
 import logging
 import logging.config
 import math
 from typing import Union
 
 import basetypes.Mediator.reqRespTypes as baseRR
-import requests
+import numpy as np
 from basetypes.Mediator.abstractMediator import Mediator
+from basetypes.Strategy.riskFreeRate import RiskFreeRateProvider
 from py_vollib.black.greeks.analytical import delta
 from py_vollib.black.implied_volatility import implied_volatility
+from scipy.special import ndtr
 
 logger = logging.getLogger("autotrader")
 
@@ -74,26 +75,17 @@ def send_notification(
 ###############################
 ### Volatility Calculations ###
 ###############################
-def get_risk_free_rate() -> float:
-    now = dt.datetime.now()
-
-    url = (
-        "https://home.treasury.gov/resource-center/data-chart-center/interest-rates/daily-treasury-rates.csv/all/"
-        + str(now.year)
-        + str(now.strftime("%m"))
-        + "?type=daily_treasury_yield_curve"
-    )
-
-    r = requests.get(url)
+# Used when a calculation isn't given a rate, strategies read theirs from the mediator's provider
+risk_free_rate_provider = RiskFreeRateProvider()
 
-    date_curve = r.text.split("\n")
 
-    for line in date_curve[1:]:
-        columns = line.split(",")
-        print(float(columns[3]))
-        return float(columns[3])
+def get_risk_free_rate() -> float:
+    """Returns the risk-free rate as a decimal, fetched at most once a day.
 
-    return 0.0
+    Returns:
+        float: The current 3 month Treasury yield
+    """
+    return risk_free_rate_provider.get_rate()
 
 
 def calculate_iv(
@@ -175,3 +167,176 @@ def calculate_delta(
     time_in_years = time_in_days / 365
 
     return delta(flag, underlying_price, strike, time_in_years, risk_free_rate, iv)
+
+
+#########################################
+### Vectorized Volatility Calculations ###
+#########################################
+def black_price(
+    underlying_price: Union[float, np.ndarray],
+    strikes: np.ndarray,
+    risk_free_rate: float,
+    time_in_years: np.ndarray,
+    is_put: np.ndarray,
+    sigma: np.ndarray,
+) -> np.ndarray:
+    """Black model prices for arrays of options, the same model py_vollib.black uses."""
+    sqrt_time = np.sqrt(time_in_years)
+    d1 = (np.log(underlying_price / strikes) + 0.5 * sigma ** 2 * time_in_years) / (
+        sigma * sqrt_time
+    )
+    d2 = d1 - sigma * sqrt_time
+    discount = np.exp(-risk_free_rate * time_in_years)
+
+    call = discount * (underlying_price * ndtr(d1) - strikes * ndtr(d2))
+    put = discount * (strikes * ndtr(-d2) - underlying_price * ndtr(-d1))
+
+    return np.where(is_put, put, call)
+
+
+def calculate_iv_vectorized(
+    option_prices: np.ndarray,
+    underlying_price: float,
+    strikes: np.ndarray,
+    risk_free_rate: float,
+    time_in_days: Union[float, np.ndarray],
+    put_or_call: Union[str, np.ndarray],
+    tolerance: float = 1e-10,
+    max_iterations: int = 100,
+) -> np.ndarray:
+    """Calculates the implied volatility of a whole chain at once
+
+    Uses Newton's method on every option simultaneously, falling back to bisection when a step leaves the bracket
+    the volatility is known to be in.
+
+    Args:
+        option_prices (np.ndarray): The options' prices
+        underlying_price (float): The stock price
+        strikes (np.ndarray): The options' strikes
+        risk_free_rate (float): The Risk-Free rate of return
+        time_in_days (Union[float, np.ndarray]): Days until expiration, per option or for all of them
+        put_or_call (Union[str, np.ndarray]): "PUT" or "CALL", per option or for all of them
+        tolerance (float, optional): Price error to stop at. Defaults to 1e-10.
+        max_iterations (int, optional): Maximum solver iterations. Defaults to 100.
+
+    Returns:
+        np.ndarray: Each option's implied volatility, NaN where the price has no solution
+    """
+    option_prices = np.asarray(option_prices, dtype=float)
+    strikes = np.asarray(strikes, dtype=float)
+    time_in_days = np.broadcast_to(np.asarray(time_in_days, dtype=float), strikes.shape)
+
+    if np.any(time_in_days <= 0):
+        raise ValueError("Days to Expiration should be > 0")
+
+    # Set Variables
+    is_put = np.broadcast_to(np.asarray(put_or_call) == "PUT", strikes.shape)
+    time_in_years = time_in_days / 365
+    sqrt_time = np.sqrt(time_in_years)
+    discount = np.exp(-risk_free_rate * time_in_years)
+
+    # Prices outside the no-arbitrage bounds have no implied volatility
+    intrinsic = discount * np.where(
+        is_put,
+        np.maximum(strikes - underlying_price, 0),
+        np.maximum(underlying_price - strikes, 0),
+    )
+    upper = discount * np.where(is_put, strikes, underlying_price)
+    valid = (option_prices > intrinsic) & (option_prices < upper)
+
+    # Start from the Brenner-Subrahmanyam approximation, inside the bracket
+    low = np.full(strikes.shape, 1e-6)
+    high = np.full(strikes.shape, 10.0)
+    sigma = np.clip(
+        np.sqrt(2 * np.pi / time_in_years) * option_prices / underlying_price,
+        0.01,
+        5.0,
+    )
+
+    for _ in range(max_iterations):
+        error = (
+            black_price(
+                underlying_price, strikes, risk_free_rate, time_in_years, is_put, sigma
+            )
+            - option_prices
+        )
+
+        converged = ~valid | (np.abs(error) < tolerance)
+        if np.all(converged):
+            break
+
+        # Price increases with volatility, so the error tells us which side of the solution we are on
+        high = np.where(error > 0, sigma, high)
+        low = np.where(error <= 0, sigma, low)
+
+        d1 = (np.log(underlying_price / strikes) + 0.5 * sigma ** 2 * time_in_years) / (
+            sigma * sqrt_time
+        )
+        vega = (
+            discount
+            * underlying_price
+            * np.exp(-0.5 * d1 ** 2)
+            / np.sqrt(2 * np.pi)
+            * sqrt_time
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            newton = sigma - error / vega
+
+        bisect = ~np.isfinite(newton) | (newton <= low) | (newton >= high)
+        sigma = np.where(converged, sigma, np.where(bisect, 0.5 * (low + high), newton))
+
+    return np.where(valid, sigma, np.nan)
+
+
+def calculate_delta_vectorized(
+    underlying_price: float,
+    strikes: np.ndarray,
+    risk_free_rate: float,
+    time_in_days: Union[float, np.ndarray],
+    put_or_call: Union[str, np.ndarray],
+    iv: Union[np.ndarray, None],
+    option_prices: Union[np.ndarray, None],
+) -> np.ndarray:
+    """Calculates the Black delta of a whole chain at once
+
+    Args:
+        underlying_price (float): Price of the Underlying
+        strikes (np.ndarray): Strike Prices
+        risk_free_rate (float): Risk-Free Rate of Return
+        time_in_days (Union[float, np.ndarray]): Days to Expiration, per option or for all of them
+        put_or_call (Union[str, np.ndarray]): 'PUT' or 'CALL', per option or for all of them
+        iv (Union[np.ndarray, None]): Implied volatilities, if not provided, they will be calculated
+        option_prices (Union[np.ndarray, None]): If IV is not provided, this is required
+
+    Returns:
+        np.ndarray: Each option's delta, NaN where the IV has no solution
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    time_in_days = np.broadcast_to(np.asarray(time_in_days, dtype=float), strikes.shape)
+
+    if np.any(time_in_days <= 0):
+        raise ValueError("Days to Expiration should be > 0")
+
+    # Set Variables
+    if iv is None:
+        if option_prices is None:
+            raise KeyError("Option Price is required when IV is None")
+
+        iv = calculate_iv_vectorized(
+            option_prices,
+            underlying_price,
+            strikes,
+            risk_free_rate,
+            time_in_days,
+            put_or_call,
+        )
+
+    is_put = np.broadcast_to(np.asarray(put_or_call) == "PUT", strikes.shape)
+    time_in_years = time_in_days / 365
+    d1 = (np.log(underlying_price / strikes) + 0.5 * iv ** 2 * time_in_years) / (
+        iv * np.sqrt(time_in_years)
+    )
+    discount = np.exp(-risk_free_rate * time_in_years)
+
+    return np.where(is_put, -discount * ndtr(-d1), discount * ndtr(d1))
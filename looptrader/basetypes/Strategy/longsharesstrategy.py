@@ -2,7 +2,7 @@ import datetime as dt
 import logging
 import logging.config
 import math
-import time
+from typing import Union
 
 import attr
 import basetypes.Mediator.baseModels as baseModels
@@ -31,7 +31,7 @@ class LongSharesStrategy(Strategy, Component):
     )
     sleep_until: dt.datetime = attr.ib(
         init=False,
-        default=dt.datetime.now().astimezone(dt.timezone.utc),
+        default=dt.datetime.min.replace(tzinfo=dt.timezone.utc),
         validator=attr.validators.instance_of(dt.datetime),
     )
     minutes_after_open_delay: int = attr.ib(
@@ -44,13 +44,17 @@ class LongSharesStrategy(Strategy, Component):
         logger.debug("processstrategy")
 
         # Get current datetime
-        now = dt.datetime.now().astimezone(dt.timezone.utc)
+        now = self.now()
 
         # Check if should be sleeping
         if now < self.sleep_until:
             logger.debug("Markets Closed. Sleeping until {}".format(self.sleep_until))
             return
 
+        # Wait out a rejected order before placing again
+        if self.backing_off(now):
+            return
+
         # Check market hours
         hours = self.get_market_session_loop(now)
 
@@ -79,11 +83,18 @@ class LongSharesStrategy(Strategy, Component):
             self.process_after_hours(now)
 
     # Process Market
+    def next_wakeup(self, now: dt.datetime) -> Union[dt.datetime, None]:
+        """Wakes the strategy when its sleep or a rejected order's backoff ends, otherwise on the bot's default cadence."""
+        if now < self.sleep_until:
+            return self.sleep_until
+
+        return self.retry_after if self.backing_off(now) else None
+
     def process_pre_market(self):
         """Pre-Market Trading Logic"""
         logger.debug("Processing Pre-Market.")
 
-        self.go_to_sleep(dt.datetime.now())
+        self.go_to_sleep(self.now().astimezone())
 
     def process_open_market(self, now: dt.datetime):
         """Open Market Trading Logic"""
@@ -181,7 +192,7 @@ class LongSharesStrategy(Strategy, Component):
         return request
 
     def place_order(self, orderrequest: baseRR.PlaceOrderRequestMessage) -> bool:
-        """Method for placing new Orders and handling fills"""
+        """Method for placing new Orders, fills are handled in process_order_event"""
         # Try to place the Order
         neworderresult = self.mediator.place_order(orderrequest)
 
@@ -193,57 +204,37 @@ class LongSharesStrategy(Strategy, Component):
         ):
             return False
 
-        # Wait to let the Order process
-        time.sleep(self.opening_order_loop_seconds)
-
-        # Re-get the Order
-        getorderrequest = baseRR.GetOrderRequestMessage(
-            self.strategy_id, int(neworderresult.order_id)
+        # Track the order until it fills or times out
+        self.track_order(
+            orderrequest,
+            int(neworderresult.order_id),
+            float(self.opening_order_loop_seconds),
         )
-        processedorder = self.mediator.get_order(getorderrequest)
 
-        if processedorder is None:
-            # Log the Error
-            logger.error(
-                "Failed to get re-get placed order, ID: {}.".format(
-                    neworderresult.order_id
-                )
-            )
-
-            # Cancel it
-            cancelorderrequest = baseRR.CancelOrderRequestMessage(
-                self.strategy_id, int(neworderresult.order_id)
-            )
-            self.mediator.cancel_order(cancelorderrequest)
-
-            return False
+        return True
 
-        # If the order isn't filled
-        if processedorder.order.status != "FILLED":
-            # Cancel it
-            cancelorderrequest = baseRR.CancelOrderRequestMessage(
-                self.strategy_id, int(neworderresult.order_id)
+    def process_order_event(self, event: baseRR.OrderEventMessage) -> None:
+        """Handles fills of placed orders"""
+        # If the order timed out and was cancelled, wake up and try again straight away
+        if event.status != "FILLED" or event.order is None:
+            logger.info(
+                "Order {} was not filled: {}.".format(event.order_id, event.status)
             )
-            self.mediator.cancel_order(cancelorderrequest)
-
-            # Return failure to fill order
-            return False
+            self.sleep_until = self.now()
+            return
 
         # Otherwise, add Position to the DB
-        for leg in orderrequest.order.legs:
-            db_position_request = baseRR.CreateDatabaseOrderRequest(
-                processedorder.order
-            )
+        db_position_request = baseRR.CreateDatabaseOrderRequest(event.order)
         self.mediator.create_db_order(db_position_request)
 
         # Send a notification
         message = "Sold:<code>"
 
-        for leg in orderrequest.order.legs:
+        for leg in event.order_request.order.legs:
             price = (
                 "Market"
-                if orderrequest.order.price is None
-                else "{:,.2f}".format(orderrequest.order.price)
+                if event.order_request.order.price is None
+                else "{:,.2f}".format(event.order_request.order.price)
             )
             message += "\r\n - {}x {} @ ${}".format(
                 str(leg.quantity), str(leg.symbol), price
@@ -255,9 +246,6 @@ class LongSharesStrategy(Strategy, Component):
 
         self.mediator.send_notification(notification)
 
-        # If we got here, return success
-        return True
-
     @staticmethod
     def truncate(number: float, digits: int) -> float:
         """Truncates a float to a specified number of digits."""
@@ -267,30 +255,31 @@ class LongSharesStrategy(Strategy, Component):
 
     def get_market_session_loop(
         self, date: dt.datetime
-    ) -> baseRR.GetMarketHoursResponseMessage:
-        """Looping Logic for getting the next open session start and end times"""
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        """Gets the next open session start and end times"""
 
         logger.debug("get_market_session_loop")
 
-        request = baseRR.GetMarketHoursRequestMessage(
-            self.strategy_id, market="OPTION", product="EQO", datetime=date
+        # Skip sessions that ended more than 15 minutes ago, i.e. Weekends.
+        # The 15 minute check is to allow the after-hours market logic to run
+        request = baseRR.GetNextMarketHoursRequestMessage(
+            self.strategy_id,
+            market="OPTION",
+            product="EQO",
+            datetime=date,
+            ends_after=self.now() - dt.timedelta(minutes=15),
         )
 
-        # Get the market hours
-        hours = self.mediator.get_market_hours(request)
-
-        # If we didn't get hours, i.e. Weekend or if we are more than 15 minutes past market close, check tomorrow.
-        # The 15 minute check is to allow the after-hours market logic to run
-        if hours is None or hours.end + dt.timedelta(
-            minutes=15
-        ) < dt.datetime.now().astimezone(dt.timezone.utc):
-            return self.get_market_session_loop(date + dt.timedelta(days=1))
-        return hours
+        return self.mediator.get_next_market_hours(request)
 
     def go_to_sleep(self, start_date: dt.datetime):
         # Get Next Open
         nextmarketsession = self.get_market_session_loop(start_date)
 
+        if nextmarketsession is None:
+            logger.error("Failed to get market hours.")
+            return
+
         # Set sleepuntil
         self.sleep_until = (
             nextmarketsession.start
@@ -0,0 +1,191 @@
+"""
+A cached risk-free rate provider, so strategies don't download the Treasury yield curve on every strike selection.
+
+Classes:
+
+    RiskFreeRateProvider
+
+Functions:
+
+    treasury_source()
+    local_file_source()
+    parse_yield_curve()
+"""
+
+import datetime as dt
+import json
+import logging
+import os
+import threading
+from typing import Callable, Union
+
+import attr
+import requests
+from basetypes.Clock.abstractClock import Clock
+from basetypes.Clock.realClock import RealClock
+
+logger = logging.getLogger("autotrader")
+
+# Returns the current risk-free rate as a decimal, or None if it couldn't be read
+RateSource = Callable[[], Union[float, None]]
+
+
+def parse_yield_curve(text: str) -> Union[float, None]:
+    """Reads the latest 3 month yield, as a decimal, from a Treasury daily yield curve CSV."""
+    for line in text.splitlines()[1:]:
+        columns = line.split(",")
+
+        if len(columns) > 3 and columns[3] != "":
+            # The Treasury publishes percentages, newest day first
+            return float(columns[3]) / 100
+
+    return None
+
+
+def treasury_source(
+    timeout: float = 10.0, clock: Callable[[], dt.datetime] = RealClock()
+) -> RateSource:
+    """Builds a source that downloads this month's Treasury daily yield curve."""
+
+    def fetch() -> Union[float, None]:
+        now = clock()
+
+        url = (
+            "https://home.treasury.gov/resource-center/data-chart-center/interest-rates/daily-treasury-rates.csv/all/"
+            + str(now.year)
+            + str(now.strftime("%m"))
+            + "?type=daily_treasury_yield_curve"
+        )
+
+        r = requests.get(url, timeout=timeout)
+        r.raise_for_status()
+
+        return parse_yield_curve(r.text)
+
+    return fetch
+
+
+def local_file_source(filename: str) -> RateSource:
+    """Builds a source that reads a local file, either a single decimal rate or a Treasury yield curve CSV."""
+
+    def read() -> Union[float, None]:
+        with open(filename, "r") as file:
+            text = file.read().strip()
+
+        try:
+            return float(text)
+        except ValueError:
+            return parse_yield_curve(text)
+
+    return read
+
+
+@attr.s(auto_attribs=True)
+class RiskFreeRateProvider:
+    """Serves the risk-free rate from memory, refreshing it from its source once a day.
+
+    The last known rate is persisted, so restarts don't refetch it, and is used when the source fails.
+    """
+
+    # Declared first so the default source can read it
+    clock: Clock = attr.ib(  # type: ignore[misc]
+        factory=RealClock,
+        kw_only=True,
+        validator=attr.validators.instance_of(Clock),  # type: ignore[misc]
+    )
+    filename: str = attr.ib(
+        default="riskfreerate.json", validator=attr.validators.instance_of(str)
+    )
+    source: RateSource = attr.ib(
+        default=attr.Factory(
+            lambda self: treasury_source(clock=self.clock), takes_self=True
+        )
+    )
+    default_rate: float = attr.ib(
+        default=0.0, validator=attr.validators.instance_of(float)
+    )
+    retry_seconds: float = attr.ib(
+        default=900.0, validator=attr.validators.instance_of(float)
+    )
+    rate: Union[float, None] = attr.ib(default=None, init=False)
+    fetched_on: Union[dt.date, None] = attr.ib(default=None, init=False)
+    last_attempt: Union[dt.datetime, None] = attr.ib(default=None, init=False)
+    loaded: bool = attr.ib(default=False, init=False)
+    lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+
+    def get_rate(self) -> float:
+        """Returns today's rate, the last known rate if today's can't be fetched, or the default rate."""
+        with self.lock:
+            # Read the persisted rate on first use
+            if not self.loaded:
+                self.load()
+                self.loaded = True
+
+            now = self.clock.now()
+
+            if self.rate is not None and self.fetched_on == now.date():
+                return self.rate
+
+            # Don't hammer a failing source
+            if (
+                self.last_attempt is None
+                or (now - self.last_attempt).total_seconds() >= self.retry_seconds
+            ):
+                self.last_attempt = now
+                self.refresh(now.date())
+
+            if self.rate is None:
+                return self.default_rate
+
+            return self.rate
+
+    def refresh(self, today: dt.date) -> None:
+        """Fetches the rate from the source, keeping the last known rate if it fails."""
+        try:
+            rate = self.source()
+        except Exception:
+            logger.exception("Failed to fetch the risk-free rate.")
+            rate = None
+
+        if rate is None:
+            logger.warning(
+                "No risk-free rate available, using {}.".format(
+                    self.default_rate if self.rate is None else self.rate
+                )
+            )
+            return
+
+        self.rate = rate
+        self.fetched_on = today
+        self.save()
+
+    ###############
+    # Persistence #
+    ###############
+    def load(self) -> None:
+        """Reads the persisted rate, if there is one."""
+        if not os.path.exists(self.filename):
+            return
+
+        try:
+            with open(self.filename, "r") as file:
+                raw: dict = json.load(file)
+
+            self.rate = float(raw["rate"])
+            self.fetched_on = dt.date.fromisoformat(raw["fetched_on"])
+        except Exception:
+            logger.exception("Failed to read risk-free rate {}.".format(self.filename))
+
+    def save(self) -> None:
+        """Writes the rate to disk so restarts don't need to refetch it."""
+        if self.rate is None or self.fetched_on is None:
+            return
+
+        try:
+            with open(self.filename, "w") as file:
+                json.dump(
+                    {"rate": self.rate, "fetched_on": self.fetched_on.isoformat()},
+                    file,
+                )
+        except Exception:
+            logger.exception("Failed to write risk-free rate {}.".format(self.filename))
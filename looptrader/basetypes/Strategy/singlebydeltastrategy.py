@@ -2,7 +2,6 @@ import datetime as dt
 import logging
 import logging.config
 import math
-import time
 from typing import Union
 
 import attr
@@ -10,7 +9,9 @@ import basetypes.Mediator.baseModels as baseModels
 import basetypes.Mediator.reqRespTypes as baseRR
 import basetypes.Strategy.helpers as helpers
 from basetypes.Component.abstractComponent import Component
+from basetypes.Mediator.columnarChain import ColumnarExpirationDate, as_columnar
 from basetypes.Strategy.abstractStrategy import Strategy
+from basetypes.Strategy.strikeIndex import StrikeIndex
 
 logger = logging.getLogger("autotrader")
 
@@ -53,7 +54,7 @@ class SingleByDeltaStrategy(Strategy, Component):
     )
     sleep_until: dt.datetime = attr.ib(
         init=False,
-        default=dt.datetime.now().astimezone(dt.timezone.utc),
+        default=dt.datetime.min.replace(tzinfo=dt.timezone.utc),
         validator=attr.validators.instance_of(dt.datetime),
     )
     minutes_after_open_delay: int = attr.ib(
@@ -81,12 +82,20 @@ class SingleByDeltaStrategy(Strategy, Component):
         logger.debug("processstrategy")
 
         # Now
-        now = dt.datetime.now().astimezone(dt.timezone.utc)
+        now = self.now()
 
         # Check if we should be sleeping
         if now < self.sleep_until:
             return
 
+        # Wait out a rejected order before placing again
+        if self.backing_off(now):
+            return
+
+        # Wait for placed orders to fill or be cancelled
+        if self.pending_order_ids:
+            return
+
         # Get Market Hours
         market_hours = self.get_next_market_hours(date=now)
 
@@ -130,6 +139,13 @@ class SingleByDeltaStrategy(Strategy, Component):
 
         return
 
+    def next_wakeup(self, now: dt.datetime) -> Union[dt.datetime, None]:
+        """Wakes the strategy when its sleep or a rejected order's backoff ends, otherwise on the bot's default cadence."""
+        if now < self.sleep_until:
+            return self.sleep_until
+
+        return self.retry_after if self.backing_off(now) else None
+
     ###############################
     ### Closed Market Functions ###
     ###############################
@@ -191,13 +207,10 @@ class SingleByDeltaStrategy(Strategy, Component):
         else:
             for order in current_orders:
                 # Check if the position expires today
-                if order.legs[0].expiration_date == dt.date.today():
-                    # Offset
+                if order.legs[0].expiration_date == self.today():
+                    # Offset, a new position is opened once it fills
                     self.place_offsetting_order_loop(order.quantity)
 
-                    # Open a new position
-                    self.place_new_orders_loop()
-
     #############################
     ### After Hours Functions ###
     #############################
@@ -223,6 +236,9 @@ class SingleByDeltaStrategy(Strategy, Component):
         # Sleep until market opens
         market = self.get_next_market_hours()
 
+        if market is None:
+            return
+
         self.sleep_until_market_open(market.start)
         return
 
@@ -243,8 +259,8 @@ class SingleByDeltaStrategy(Strategy, Component):
             return None
 
         # Get option chain
-        min_date = dt.date.today() + dt.timedelta(days=self.minimum_dte)
-        max_date = dt.date.today() + dt.timedelta(days=self.maximum_dte)
+        min_date = self.today() + dt.timedelta(days=self.minimum_dte)
+        max_date = self.today() + dt.timedelta(days=self.maximum_dte)
         chainrequest = self.build_option_chain_request(min_date, max_date)
 
         chain = self.mediator.get_option_chain(chainrequest)
@@ -268,7 +284,7 @@ class SingleByDeltaStrategy(Strategy, Component):
 
         # Find best strike to trade
         strike = self.get_best_strike(
-            expiration.strikes,
+            as_columnar(expiration),
             availbp,
             account.currentbalances.liquidationvalue,
             expiration.daystoexpiration,
@@ -298,7 +314,7 @@ class SingleByDeltaStrategy(Strategy, Component):
         logger.debug("build_offsetting_order")
 
         # Get option chain
-        chainrequest = self.build_option_chain_request(dt.date.today(), dt.date.today())
+        chainrequest = self.build_option_chain_request(self.today(), self.today())
         chain = self.mediator.get_option_chain(chainrequest)
 
         if chain is None or chain.status == "FAILED":
@@ -441,10 +457,8 @@ class SingleByDeltaStrategy(Strategy, Component):
         if new_order_request is None:
             return
 
-        # Place the order and if we get a result, build the closing order.
+        # Place the order, the closing order is built once it fills.
         if self.place_order(new_order_request):
-            closing_order = self.new_build_closing_order(new_order_request.order)
-            self.place_order(closing_order)
             return
 
         # Otherwise, try again
@@ -453,7 +467,7 @@ class SingleByDeltaStrategy(Strategy, Component):
         return
 
     def place_order(self, orderrequest: baseRR.PlaceOrderRequestMessage) -> bool:
-        """Method for placing new Orders and handling fills"""
+        """Method for placing new Orders, fills are handled in process_order_event"""
         # Try to place the Order
         new_order_result = self.mediator.place_order(orderrequest)
 
@@ -465,29 +479,26 @@ class SingleByDeltaStrategy(Strategy, Component):
         ):
             return False
 
-        # Wait to let the Order process
-        time.sleep(self.opening_order_loop_seconds)
-
-        # Re-get the Order
-        order_request = baseRR.GetOrderRequestMessage(
-            self.strategy_id, int(new_order_result.order_id)
-        )
-        processed_order = self.mediator.get_order(order_request)
+        # If closing order, add Order to the DB and let the order ride
+        for leg in orderrequest.order.legs:
+            if leg.position_effect == "CLOSING":
+                # Re-get the Order
+                order_request = baseRR.GetOrderRequestMessage(
+                    self.strategy_id, int(new_order_result.order_id)
+                )
+                processed_order = self.mediator.get_order(order_request)
 
-        if processed_order is None:
-            # Log the Error
-            logger.error(
-                f"Failed to get re-get placed order, ID: {new_order_result.order_id}."
-            )
+                if processed_order is None:
+                    # Log the Error
+                    logger.error(
+                        f"Failed to get re-get placed order, ID: {new_order_result.order_id}."
+                    )
 
-            # Cancel it
-            self.cancel_order(new_order_result.order_id)
+                    # Cancel it
+                    self.cancel_order(new_order_result.order_id)
 
-            return False
+                    return False
 
-        # If closing order, add Order to DB and let the order ride, otherwise continue logic
-        for leg in processed_order.order.legs:
-            if leg.position_effect == "CLOSING":
                 # Add Position to the DB
                 db_position_request = baseRR.CreateDatabaseOrderRequest(
                     processed_order.order
@@ -496,73 +507,73 @@ class SingleByDeltaStrategy(Strategy, Component):
                 # Return Success
                 return True
 
-        # If the order isn't filled
-        if processed_order.order.status != "FILLED":
-            # Cancel it
-            self.cancel_order(new_order_result.order_id)
+        # Otherwise track the order until it fills or times out
+        self.track_order(
+            orderrequest,
+            int(new_order_result.order_id),
+            float(self.opening_order_loop_seconds),
+        )
 
-            # Return failure to fill order
-            return False
+        return True
+
+    def process_order_event(self, event: baseRR.OrderEventMessage) -> None:
+        """Handles fills of opening and offsetting orders"""
+        offsetting = self.is_offsetting_order(event.order_request.order)
+
+        # If the order timed out and was cancelled, try again at the current price
+        if event.status != "FILLED" or event.order is None:
+            logger.info(f"Order {event.order_id} was not filled: {event.status}.")
+
+            if offsetting:
+                self.place_offsetting_order_loop(
+                    event.order_request.order.legs[0].quantity
+                )
+            else:
+                self.place_new_orders_loop()
+
+            return
 
         # Otherwise, add Position to the DB
-        db_position_request = baseRR.CreateDatabaseOrderRequest(processed_order.order)
+        db_position_request = baseRR.CreateDatabaseOrderRequest(event.order)
         self.mediator.create_db_order(db_position_request)
 
         # Send a notification
         message = "Sold:<code>"
 
-        for leg in orderrequest.order.legs:
-            message += (
-                f"\r\n - {leg.quantity}x {leg.symbol} @ ${orderrequest.order.price:.2f}"
-            )
+        for leg in event.order_request.order.legs:
+            message += f"\r\n - {leg.quantity}x {leg.symbol} @ ${event.order_request.order.price:.2f}"
         message += "</code>"
 
         helpers.send_notification(
             message, self.strategy_name, self.strategy_id, self.mediator
         )
 
-        # If we got here, return success
-        return True
+        # Open a new position once offset, unless the bot is paused, otherwise place the closing order
+        if offsetting:
+            if not self.mediator.pause:
+                self.place_new_orders_loop()
+        else:
+            closing_order = self.new_build_closing_order(event.order_request.order)
+            self.place_order(closing_order)
+
+    def is_offsetting_order(self, order: baseModels.Order) -> bool:
+        """Offsetting orders open in the opposite direction to the strategy"""
+        buying = order.legs[0].instruction == "BUY_TO_OPEN"
+        return buying == (self.buy_or_sell == "SELL")
 
     ########################
     ### Shared Functions ###
     ########################
     def get_current_orders(self) -> list[baseModels.Order]:
-        current_orders = []  # type: list[baseModels.Order]
-
-        # Read DB Orders
-        open_orders_request = baseRR.ReadOpenDatabaseOrdersRequest(self.strategy_id)
-        open_orders = self.mediator.read_active_orders(open_orders_request)
+        # Refresh our open DB Orders from the broker in one call
+        reconcile_request = baseRR.ReconcileOrdersRequestMessage(self.strategy_id)
+        reconciled = self.mediator.reconcile_orders(reconcile_request)
 
-        if open_orders is None:
-            logger.error("Read_Open_Orders failed. Please check the logs.")
-            return current_orders
-
-        # Iterate through any open Orders
-        for order in open_orders.orders:
-            # Get latest status
-            get_order_req = baseRR.GetOrderRequestMessage(
-                self.strategy_id, order.order_id
-            )
-            latest_order = self.mediator.get_order(get_order_req)
+        if reconciled is None:
+            logger.error("Reconcile_Orders failed. Please check the logs.")
+            return []
 
-            if latest_order is not None:
-                latest_order.order.id = order.id
-
-                for leg in latest_order.order.legs:
-                    for leg2 in order.legs:
-                        if leg.cusip == leg2.cusip:
-                            leg.id = leg2.id
-
-                # Update the DB record
-                create_order_req = baseRR.UpdateDatabaseOrderRequest(latest_order.order)
-                self.mediator.update_db_order(create_order_req)
-
-                # If the Order's status is still open, update our flag
-                if latest_order.order.isActive():
-                    current_orders.append(latest_order.order)
-
-        return current_orders
+        return reconciled.orders
 
     ####################
     ### Option Chain ###
@@ -583,6 +594,7 @@ class SingleByDeltaStrategy(Strategy, Component):
             symbol=self.underlying,
             includequotes=False,
             optionrange="OTM",
+            columnar=True,
         )
 
     @staticmethod
@@ -611,9 +623,7 @@ class SingleByDeltaStrategy(Strategy, Component):
 
     def get_best_strike(
         self,
-        strikes: dict[
-            float, baseRR.GetOptionChainResponseMessage.ExpirationDate.Strike
-        ],
+        expiration: ColumnarExpirationDate,
         buying_power: float,
         liquidation_value: float,
         days_to_expiration: int,
@@ -626,47 +636,48 @@ class SingleByDeltaStrategy(Strategy, Component):
 
         # Set Variables
         best_premium = float(0)
-        best_strike = None
+        best_position = None
+
+        # Sell @ Bid, Buy @ Ask
+        option_prices = expiration.bid if self.buy_or_sell == "SELL" else expiration.ask
+
+        # Calculate Deltas for the whole chain at once
+        if self.use_vollib_for_greeks:
+            # Calculate Risk Free Rate
+            risk_free_rate = self.mediator.risk_free_rate_provider.get_rate()
+
+            deltas = helpers.calculate_delta_vectorized(
+                underlying_last_price,
+                expiration.strike,
+                risk_free_rate,
+                days_to_expiration,
+                self.put_or_call,
+                None,
+                option_prices,
+            )
+        else:
+            deltas = expiration.delta
 
-        # Calculate Risk Free Rate
-        risk_free_rate = helpers.get_risk_free_rate()
+        # Only strikes with deltas between our minimum and target delta are candidates
+        index = StrikeIndex.from_expiration(expiration, deltas)
 
-        # Iterate through strikes
-        for strike, details in strikes.items():
-            # Sell @ Bid, Buy @ Ask
-            option_price = details.bid if self.buy_or_sell == "SELL" else details.ask
-
-            # Calculate Delta
-            if self.use_vollib_for_greeks:
-                calculated_delta = helpers.calculate_delta(
-                    underlying_last_price,
-                    strike,
-                    risk_free_rate,
-                    days_to_expiration,
-                    self.put_or_call,
-                    None,
-                    option_price,
-                )
-            else:
-                calculated_delta = details.delta
+        for position in index.delta_band(self.min_delta, self.target_delta):
+            # Calculate the total premium for the strike based on our buying power
+            qty = self.calculate_order_quantity(
+                float(expiration.strike[position]), buying_power, liquidation_value
+            )
+            total_premium = float(option_prices[position]) * qty
 
-            # Make sure strike delta is less then our target delta
-            if (abs(calculated_delta) <= abs(self.target_delta)) and (
-                abs(calculated_delta) >= abs(self.min_delta)
-            ):
-                # Calculate the total premium for the strike based on our buying power
-                qty = self.calculate_order_quantity(
-                    strike, buying_power, liquidation_value
-                )
-                total_premium = option_price * qty
+            # If the strike's premium is larger than our best premium, update it
+            if total_premium > best_premium:
+                best_premium = total_premium
+                best_position = position
 
-                # If the strike's premium is larger than our best premium, update it
-                if total_premium > best_premium:
-                    best_premium = total_premium
-                    best_strike = details
+        if best_position is None:
+            return None
 
         # Return the strike with the highest premium
-        return best_strike
+        return expiration.strike_at(best_position)
 
     def get_offsetting_strike(
         self,
@@ -706,15 +717,21 @@ class SingleByDeltaStrategy(Strategy, Component):
         return self.mediator.get_market_hours(request)
 
     def get_next_market_hours(
-        self,
-        date: dt.datetime = dt.datetime.now().astimezone(dt.timezone.utc),
+        self, date: Union[dt.datetime, None] = None
     ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
-        hours = self.get_market_hours(date)
+        now = self.now()
 
-        if hours is None or hours.end < dt.datetime.now().astimezone(dt.timezone.utc):
-            return self.get_next_market_hours(date + dt.timedelta(days=1))
+        # Build Request
+        request = baseRR.GetNextMarketHoursRequestMessage(
+            self.strategy_id,
+            market="OPTION",
+            product="IND",
+            datetime=now if date is None else date,
+            ends_after=now,
+        )
 
-        return hours
+        # Get the first session on or after the date that hasn't closed yet
+        return self.mediator.get_next_market_hours(request)
 
     def sleep_until_market_open(self, datetime: dt.datetime):
         # Populate sleep-until variable
@@ -2,14 +2,15 @@ import datetime as dt
 import logging
 import logging.config
 import math
-import time
 from typing import Union
 
 import attr
 import basetypes.Mediator.baseModels as baseModels
 import basetypes.Mediator.reqRespTypes as baseRR
 from basetypes.Component.abstractComponent import Component
+from basetypes.Mediator.columnarChain import ColumnarExpirationDate, as_columnar
 from basetypes.Strategy.abstractStrategy import Strategy
+from basetypes.Strategy.strikeIndex import StrikeIndex
 
 logger = logging.getLogger("autotrader")
 
@@ -42,11 +43,15 @@ class SpreadsByDeltaStrategy(Strategy, Component):
     openingorderloopseconds: int = attr.ib(
         default=60, validator=attr.validators.instance_of(int)
     )
+    closingwindowloopseconds: int = attr.ib(
+        default=10, validator=attr.validators.instance_of(int)
+    )
     sleepuntil: dt.datetime = attr.ib(
         init=False,
-        default=dt.datetime.now().astimezone(dt.timezone.utc),
+        default=dt.datetime.min.replace(tzinfo=dt.timezone.utc),
         validator=attr.validators.instance_of(dt.datetime),
     )
+    marketclose: Union[dt.datetime, None] = attr.ib(init=False, default=None)
 
     # Core Strategy Process
     def process_strategy(self):
@@ -54,13 +59,17 @@ class SpreadsByDeltaStrategy(Strategy, Component):
         logger.debug("processstrategy")
 
         # Get current datetime
-        now = dt.datetime.now().astimezone(dt.timezone.utc)
+        now = self.now()
 
         # Check if should be sleeping
         if now < self.sleepuntil:
             logger.debug("Markets Closed. Sleeping until {}".format(self.sleepuntil))
             return
 
+        # Wait out a rejected order before placing again
+        if self.backing_off(now):
+            return
+
         # Check market hours
         hours = self.get_market_session_loop(now)
 
@@ -68,6 +77,8 @@ class SpreadsByDeltaStrategy(Strategy, Component):
             logger.error("Failed to get market hours, exiting and retrying.")
             return
 
+        self.marketclose = hours.end
+
         # If the next market session is not today, wait until 10 minutes before close
         if hours.start.day != now.day:
             self.sleepuntil = hours.end - dt.timedelta(minutes=10)
@@ -86,12 +97,38 @@ class SpreadsByDeltaStrategy(Strategy, Component):
         elif (hours.end - dt.timedelta(minutes=10)) < now < hours.end:
             self.process_open_market()
 
+    def next_wakeup(self, now: dt.datetime) -> Union[dt.datetime, None]:
+        """Wakes the strategy when its sleep ends, and every few seconds in the last 10 minutes before the close."""
+        if now < self.sleepuntil:
+            return self.sleepuntil
+
+        if self.backing_off(now):
+            return self.retry_after
+
+        if self.marketclose is None:
+            return None
+
+        windowopen = self.marketclose - dt.timedelta(minutes=10)
+
+        # Wake exactly when the closing window opens, then poll quickly until the close
+        if now < windowopen:
+            return windowopen
+
+        if now < self.marketclose:
+            return now + dt.timedelta(seconds=self.closingwindowloopseconds)
+
+        return None
+
     def process_pre_market(self):
         """Pre-Market Trading Logic"""
         logger.debug("Processing Pre-Market.")
 
         # Get Next Open
-        nextmarketsession = self.get_market_session_loop(dt.datetime.now())
+        nextmarketsession = self.get_market_session_loop(self.now().astimezone())
+
+        if nextmarketsession is None:
+            logger.error("Failed to get market hours.")
+            return
 
         # Set sleepuntil
         self.sleepuntil = (
@@ -109,6 +146,10 @@ class SpreadsByDeltaStrategy(Strategy, Component):
         """Open Market Trading Logic"""
         logger.debug("Processing Open-Market")
 
+        # Wait for placed orders to fill or be cancelled
+        if self.pending_order_ids:
+            return
+
         # Place New Orders
         self.place_new_orders_loop()
 
@@ -152,8 +193,8 @@ class SpreadsByDeltaStrategy(Strategy, Component):
             return None
 
         # Calculate trade date
-        startdate = dt.date.today() + dt.timedelta(days=self.minimumdte)
-        enddate = dt.date.today() + dt.timedelta(days=self.maximumdte)
+        startdate = self.today() + dt.timedelta(days=self.minimumdte)
+        enddate = self.today() + dt.timedelta(days=self.maximumdte)
 
         # Get option chain
         chainrequest = baseRR.GetOptionChainRequestMessage(
@@ -164,6 +205,7 @@ class SpreadsByDeltaStrategy(Strategy, Component):
             symbol=self.underlying,
             includequotes=False,
             optionrange="OTM",
+            columnar=True,
         )
 
         chain = self.mediator.get_option_chain(chainrequest)
@@ -181,14 +223,18 @@ class SpreadsByDeltaStrategy(Strategy, Component):
         if expiration is None:
             return None
 
+        # Index the strikes by price and delta
+        columnar = as_columnar(expiration)
+        index = StrikeIndex.from_expiration(columnar)
+
         # Get the short strike
-        short_strike = self.get_short_strike(expiration.strikes)
+        short_strike = self.get_short_strike(columnar, index)
 
         # If no short strike, exit.
         if short_strike is None:
             return None
 
-        long_strike = self.get_long_strike(expiration.strikes, short_strike.strike)
+        long_strike = self.get_long_strike(columnar, index, short_strike.strike)
 
         # If no valid long strike, exit.
         if long_strike is None:
@@ -273,7 +319,7 @@ class SpreadsByDeltaStrategy(Strategy, Component):
         # Check if we have positions on already that expire today.
         nonexpiring = any(
             position.underlyingsymbol == self.underlying
-            and position.expirationdate.date() != dt.date.today()
+            and position.expirationdate.date() != self.today()
             for position in account.positions
         )
 
@@ -286,7 +332,7 @@ class SpreadsByDeltaStrategy(Strategy, Component):
         # Check if we have positions on already that expire today.
         expiring_day = any(
             position.underlyingsymbol == self.underlying
-            and position.expirationdate.date() == dt.date.today()
+            and position.expirationdate.date() == self.today()
             for position in account.positions
         )
 
@@ -300,7 +346,7 @@ class SpreadsByDeltaStrategy(Strategy, Component):
         return expiring_day or tradable_today
 
     def place_order(self, orderrequest: baseRR.PlaceOrderRequestMessage) -> bool:
-        """Method for placing new Orders and handling fills"""
+        """Method for placing new Orders, fills are handled in process_order_event"""
         # Try to place the Order
         neworderresult = self.mediator.place_order(orderrequest)
 
@@ -312,48 +358,37 @@ class SpreadsByDeltaStrategy(Strategy, Component):
         ):
             return False
 
-        # Add Order to the DB
-        # db_order_request = baseRR.CreateDatabaseOrderRequest(orderrequest.order)
-        # db_order_response = self.mediator.create_db_order(db_order_request)
-
-        # Wait to let the Order process
-        time.sleep(self.openingorderloopseconds)
-
-        # Fetch the Order status
-        getorderrequest = baseRR.GetOrderRequestMessage(
-            self.strategy_id, int(neworderresult.order_id)
+        # Track the order until it fills or times out
+        self.track_order(
+            orderrequest,
+            int(neworderresult.order_id),
+            float(self.openingorderloopseconds),
         )
-        processedorder = self.mediator.get_order(getorderrequest)
 
-        if processedorder is None:
-            return False
+        return True
 
-        # If the order isn't filled
-        if processedorder.order.status != "FILLED":
-            # Cancel it
-            cancelorderrequest = baseRR.CancelOrderRequestMessage(
-                self.strategy_id, int(neworderresult.order_id)
+    def process_order_event(self, event: baseRR.OrderEventMessage) -> None:
+        """Handles fills of placed orders"""
+        # If the order timed out and was cancelled, try again at the current price
+        if event.status != "FILLED" or event.order is None:
+            logger.info(
+                "Order {} was not filled: {}.".format(event.order_id, event.status)
             )
-            self.mediator.cancel_order(cancelorderrequest)
-
-            # Return failure to fill order
-            return False
+            self.place_new_orders_loop()
+            return
 
         # Otherwise, add Position to the DB
-        for leg in orderrequest.order.legs:
-            db_position_request = baseRR.CreateDatabaseOrderRequest(
-                processedorder.order
-            )
+        db_position_request = baseRR.CreateDatabaseOrderRequest(event.order)
         self.mediator.create_db_order(db_position_request)
 
         # Send a notification
         message = "Sold:<code>"
 
-        for leg in orderrequest.order.legs:
+        for leg in event.order_request.order.legs:
             message += "\r\n - {}x {} @ ${}".format(
                 str(leg.quantity),
                 str(leg.symbol),
-                "{:,.2f}".format(orderrequest.order.price),
+                "{:,.2f}".format(event.order_request.order.price),
             )
 
         message += "</code>"
@@ -362,26 +397,22 @@ class SpreadsByDeltaStrategy(Strategy, Component):
 
         self.mediator.send_notification(notification)
 
-        # If we got here, return success
-        return True
-
     # Market Hours Functions
     def get_market_session_loop(
         self, date: dt.datetime
-    ) -> baseRR.GetMarketHoursResponseMessage:
-        """Looping Logic for getting the next open session start and end times"""
+    ) -> Union[baseRR.GetMarketHoursResponseMessage, None]:
+        """Gets the next open session start and end times"""
         logger.debug("get_market_session_loop")
 
-        request = baseRR.GetMarketHoursRequestMessage(
-            self.strategy_id, market="OPTION", product="EQO", datetime=date
+        request = baseRR.GetNextMarketHoursRequestMessage(
+            self.strategy_id,
+            market="OPTION",
+            product="EQO",
+            datetime=date,
+            ends_after=self.now(),
         )
 
-        hours = self.mediator.get_market_hours(request)
-
-        if hours is None or hours.end < dt.datetime.now().astimezone(dt.timezone.utc):
-            return self.get_market_session_loop(date + dt.timedelta(days=1))
-
-        return hours
+        return self.mediator.get_next_market_hours(request)
 
     # Option Chain Functions
     @staticmethod
@@ -409,57 +440,36 @@ class SpreadsByDeltaStrategy(Strategy, Component):
         return minexpiration
 
     def get_short_strike(
-        self,
-        strikes: dict[
-            float, baseRR.GetOptionChainResponseMessage.ExpirationDate.Strike
-        ],
+        self, expiration: ColumnarExpirationDate, index: StrikeIndex
     ) -> Union[baseRR.GetOptionChainResponseMessage.ExpirationDate.Strike, None]:
         """Searches an option chain for the optimal strike."""
-        logger.debug("get_best_strike")
-
-        # Set Variables
-        best_price = float(0)
-        best_strike = None
+        logger.debug("get_short_strike")
 
-        # Iterate through strikes
-        for details in strikes.values():
-            if details.delta is None or details.delta == "NaN":
-                continue
+        # Out of the money, premium grows with delta, so the best strike is the one nearest our target delta
+        position = index.nearest_delta_at_most(self.targetdelta)
 
-            # Make sure strike delta is less then our target delta
-            if abs(details.delta) <= abs(self.targetdelta):
-                # Calculate the total premium for the strike based on our buying power
-                mid_price = (details.bid + details.ask) / 2
-                if mid_price > best_price:
-                    best_strike = details
-                    best_price = mid_price
+        if position is None:
+            return None
 
         # Return the strike with the highest premium, under our delta
-        return best_strike
+        return expiration.strike_at(position)
 
     def get_long_strike(
         self,
-        strikes: dict[
-            float, baseRR.GetOptionChainResponseMessage.ExpirationDate.Strike
-        ],
+        expiration: ColumnarExpirationDate,
+        index: StrikeIndex,
         short_strike: float,
     ) -> Union[baseRR.GetOptionChainResponseMessage.ExpirationDate.Strike, None]:
-        """Searches an option chain for the optimal strike."""
-        logger.debug("get_best_strike")
+        """Searches an option chain for the strike closest to our width away from the short strike."""
+        logger.debug("get_long_strike")
 
-        new_strike = short_strike - self.width
+        position = index.nearest_strike(short_strike - self.width)
 
-        best_strike = 0.0
-        best_delta = 1000000.0
-
-        for strike in strikes:
-            delta = strike - new_strike
-            if abs(delta) < best_delta:
-                best_strike = strike
-                best_delta = abs(delta)
+        if position is None:
+            return None
 
         # Return the strike
-        return strikes[best_strike]
+        return expiration.strike_at(position)
 
     def calculate_order_quantity(
         self,
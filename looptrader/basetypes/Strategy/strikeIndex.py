@@ -0,0 +1,89 @@
+"""
+A sorted index over a single expiration's strikes, so strategies can target strikes by price or delta with binary
+searches instead of scanning the whole chain.
+
+Classes:
+
+    StrikeIndex
+
+Functions:
+
+    nearest_strike()
+    nearest_delta_at_most()
+    delta_band()
+"""
+
+from typing import Union
+
+import attr
+import numpy as np
+from basetypes.Mediator.columnarChain import ColumnarExpirationDate
+
+
+@attr.s(auto_attribs=True, eq=False)
+class StrikeIndex:
+    """Positions into an expiration's arrays, sorted by strike price and by absolute delta.
+
+    Lookups return positions, use ColumnarExpirationDate.strike_at to get the Strike. Contracts without a delta
+    are left out of the delta lookups.
+    """
+
+    strikes: np.ndarray
+    deltas: np.ndarray
+    by_strike: np.ndarray = attr.ib(init=False)
+    sorted_strikes: np.ndarray = attr.ib(init=False)
+    by_delta: np.ndarray = attr.ib(init=False)
+    sorted_deltas: np.ndarray = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        self.strikes = np.asarray(self.strikes, dtype=float)
+        self.deltas = np.abs(np.asarray(self.deltas, dtype=float))
+
+        # Stable sorts, so ties keep the chain's order
+        self.by_strike = np.argsort(self.strikes, kind="stable")
+        self.sorted_strikes = self.strikes[self.by_strike]
+
+        valid = np.flatnonzero(~np.isnan(self.deltas))
+        self.by_delta = valid[np.argsort(self.deltas[valid], kind="stable")]
+        self.sorted_deltas = self.deltas[self.by_delta]
+
+    @classmethod
+    def from_expiration(
+        cls,
+        expiration: ColumnarExpirationDate,
+        deltas: Union[np.ndarray, None] = None,
+    ) -> "StrikeIndex":
+        """Indexes an expiration, by its own deltas unless others (i.e. calculated ones) are given."""
+        return cls(expiration.strike, expiration.delta if deltas is None else deltas)
+
+    def nearest_strike(self, price: float) -> Union[int, None]:
+        """The position of the strike closest to a price, the lower one on a tie."""
+        if len(self.sorted_strikes) == 0:
+            return None
+
+        index = int(np.searchsorted(self.sorted_strikes, price))
+
+        if index == len(self.sorted_strikes):
+            index -= 1
+        elif index > 0 and (
+            price - self.sorted_strikes[index - 1] <= self.sorted_strikes[index] - price
+        ):
+            index -= 1
+
+        return int(self.by_strike[index])
+
+    def nearest_delta_at_most(self, target: float) -> Union[int, None]:
+        """The position of the strike with the largest absolute delta that is still at most the target's."""
+        index = int(np.searchsorted(self.sorted_deltas, abs(target), side="right"))
+
+        if index == 0:
+            return None
+
+        return int(self.by_delta[index - 1])
+
+    def delta_band(self, low: float, high: float) -> np.ndarray:
+        """The positions of every strike with an absolute delta between low and high, inclusive."""
+        start = np.searchsorted(self.sorted_deltas, abs(low), side="left")
+        end = np.searchsorted(self.sorted_deltas, abs(high), side="right")
+
+        return self.by_delta[start:end]
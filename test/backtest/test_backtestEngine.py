@@ -0,0 +1,54 @@
+import datetime as dt
+
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Backtest.backtestEngine import Backtest
+from basetypes.Backtest.chainHistory import ChainHistory, HistoricalMarket
+from basetypes.Broker.simulatedMarket import SyntheticMarket
+from basetypes.Strategy.singlebydeltastrategy import SingleByDeltaStrategy
+
+SYMBOL = "$SPX.X"
+# Monday and Tuesday, 10 minute snapshots through the session
+DAYS = [dt.date(2022, 1, 10), dt.date(2022, 1, 11)]
+
+
+def build_market() -> HistoricalMarket:
+    source = SyntheticMarket({SYMBOL: 4500.0}, strikes_per_side=30)
+    snapshots = []
+
+    for day in DAYS:
+        opening = dt.datetime.combine(day, dt.time(14, 30), dt.timezone.utc)
+
+        for minutes in range(0, 390, 10):
+            now = opening + dt.timedelta(minutes=minutes)
+            request = baseRR.GetOptionChainRequestMessage(
+                0,
+                SYMBOL,
+                "PUT",
+                True,
+                "ALL",
+                day,
+                day + dt.timedelta(days=7),
+                columnar=True,
+            )
+            snapshots.append((now, source.get_option_chain(request, now)))
+
+    return HistoricalMarket({SYMBOL: ChainHistory.from_snapshots(SYMBOL, snapshots)})
+
+
+def test_backtest_trades_the_history():
+    backtest = Backtest(
+        [SingleByDeltaStrategy(strategy_name="single")],
+        build_market(),
+        dt.datetime(2022, 1, 10, 14, tzinfo=dt.timezone.utc),
+        dt.datetime(2022, 1, 11, 22, tzinfo=dt.timezone.utc),
+        step_seconds=600.0,
+    )
+
+    report = backtest.run()
+
+    assert report.fills.placed > 0
+    assert report.fills.filled > 0
+    assert len(report.times) == len(report.equity) > 0
+    assert report.profit == report.equity[-1] - 100000.0
+    assert report.drawdown()[0] >= 0
+    assert "placed" in report.summary()
@@ -0,0 +1,92 @@
+import datetime as dt
+
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Backtest.chainHistory import ChainHistory, HistoricalMarket
+from basetypes.Broker.simulatedMarket import SyntheticMarket, option_symbol
+
+# Monday and Wednesday mornings, Tuesday the 11th has no snapshots
+TIMES = [
+    dt.datetime(2022, 1, 10, 15, tzinfo=dt.timezone.utc),
+    dt.datetime(2022, 1, 10, 16, tzinfo=dt.timezone.utc),
+    dt.datetime(2022, 1, 12, 15, tzinfo=dt.timezone.utc),
+]
+
+
+def build_request(columnar: bool = True) -> baseRR.GetOptionChainRequestMessage:
+    return baseRR.GetOptionChainRequestMessage(
+        0,
+        "SPX",
+        "PUT",
+        True,
+        "ALL",
+        dt.date(2022, 1, 10),
+        dt.date(2022, 1, 20),
+        columnar=columnar,
+    )
+
+
+def build_history() -> tuple[SyntheticMarket, list, ChainHistory]:
+    source = SyntheticMarket({"SPX": 4500.0}, strikes_per_side=10)
+    snapshots = [(now, source.get_option_chain(build_request(), now)) for now in TIMES]
+
+    return source, snapshots, ChainHistory.from_snapshots("SPX", snapshots)
+
+
+def test_historical_market_serves_the_recorded_chains():
+    _, snapshots, history = build_history()
+    market = HistoricalMarket({"SPX": history})
+
+    assert len(history) == len(TIMES)
+    assert market.get_option_chain(build_request(), TIMES[0] - dt.timedelta(1)) is None
+
+    # Between snapshots the earlier one is served
+    recorded = snapshots[1][1]
+    chain = market.get_option_chain(
+        build_request(), TIMES[1] + dt.timedelta(minutes=30)
+    )
+
+    assert chain.underlyinglastprice == recorded.underlyinglastprice
+    assert len(chain.putexpdatemap) == len(recorded.putexpdatemap)
+
+    for served, expected in zip(chain.putexpdatemap, recorded.putexpdatemap):
+        assert served.expirationdate == expected.expirationdate
+        assert list(served.strike) == list(expected.strike)
+        assert list(served.bid) == list(expected.bid)
+        assert list(served.symbol) == list(expected.symbol)
+
+    symbol = recorded.putexpdatemap[0].symbol[3]
+    assert market.option_quote(symbol, TIMES[1]) == (
+        recorded.putexpdatemap[0].bid[3],
+        recorded.putexpdatemap[0].ask[3],
+    )
+    # Only puts were recorded
+    call = option_symbol(
+        "SPX",
+        recorded.putexpdatemap[0].expirationdate.date(),
+        "CALL",
+        float(recorded.putexpdatemap[0].strike[3]),
+    )
+    assert market.option_quote(call, TIMES[1]) is None
+
+
+def test_history_round_trips_through_a_directory(tmp_path):
+    _, _, history = build_history()
+    history.save(str(tmp_path / "SPX"))
+
+    loaded = ChainHistory.load(str(tmp_path / "SPX"))
+
+    assert loaded.symbol == "SPX"
+    assert list(loaded.times) == list(history.times)
+    assert list(loaded.offsets) == list(history.offsets)
+    assert list(loaded.bid) == list(history.bid)
+
+
+def test_days_without_snapshots_are_holidays():
+    _, _, history = build_history()
+    market = HistoricalMarket({"SPX": history})
+
+    assert market.market_hours(dt.date(2022, 1, 10)) is not None
+    assert market.market_hours(dt.date(2022, 1, 11)) is None
+    # Past the data the weekday schedule applies
+    assert market.market_hours(dt.date(2022, 1, 13)) is not None
+    assert market.market_hours(dt.date(2022, 1, 15)) is None
@@ -0,0 +1,89 @@
+import datetime as dt
+
+import basetypes.Mediator.reqRespTypes as baseRR
+import numpy as np
+import pytest
+from basetypes.Backtest.chainHistory import ChainHistory
+from basetypes.Backtest.parameterSweep import ParameterSweep
+from basetypes.Broker.simulatedMarket import SyntheticMarket
+
+SYMBOL = "$SPX.X"
+DAY = dt.date(2022, 1, 10)
+
+
+def save_history(path: str) -> None:
+    source = SyntheticMarket({SYMBOL: 4500.0}, strikes_per_side=30)
+    opening = dt.datetime.combine(DAY, dt.time(14, 30), dt.timezone.utc)
+    snapshots = []
+
+    for minutes in range(0, 390, 10):
+        now = opening + dt.timedelta(minutes=minutes)
+        request = baseRR.GetOptionChainRequestMessage(
+            0,
+            SYMBOL,
+            "PUT",
+            True,
+            "ALL",
+            DAY,
+            DAY + dt.timedelta(days=7),
+            columnar=True,
+        )
+        snapshots.append((now, source.get_option_chain(request, now)))
+
+    ChainHistory.from_snapshots(SYMBOL, snapshots).save(path)
+
+
+def build_sweep(tmp_path, grid: dict) -> ParameterSweep:
+    return ParameterSweep(
+        str(tmp_path / "histories"),
+        str(tmp_path / "sweep.db"),
+        dt.datetime(2022, 1, 10, 14, tzinfo=dt.timezone.utc),
+        dt.datetime(2022, 1, 10, 22, tzinfo=dt.timezone.utc),
+        grid,
+        processes=1,
+        backtest_options={"step_seconds": 600.0},
+    )
+
+
+def test_combinations_skip_untradeable_parameters(tmp_path):
+    sweep = build_sweep(
+        tmp_path,
+        {"minimum_dte": [1, 3], "maximum_dte": [2, 4], "min_delta": [-0.03, -0.1]},
+    )
+
+    combinations = sweep.combinations()
+
+    # min_delta -0.1 is past the default target_delta, minimum_dte 3 is past maximum_dte 2
+    assert len(combinations) == 3
+    assert all(c["min_delta"] == -0.03 for c in combinations)
+    assert {"min_delta": -0.03, "minimum_dte": 3, "maximum_dte": 2} not in combinations
+
+    with pytest.raises(ValueError):
+        build_sweep(tmp_path, {"underlying": ["SPY"]})
+
+
+def test_memory_mapped_histories_load(tmp_path):
+    save_history(str(tmp_path / "SPX"))
+
+    history = ChainHistory.load(str(tmp_path / "SPX"), mmap_mode="r")
+
+    assert isinstance(history.bid, np.memmap)
+    assert history.symbol == SYMBOL
+
+
+def test_sweep_resumes_from_its_checkpoint(tmp_path):
+    save_history(str(tmp_path / "histories" / "SPX"))
+    sweep = build_sweep(tmp_path, {"target_delta": [-0.07, -0.1]})
+
+    results = sweep.run()
+
+    assert len(results) == 2
+    assert results[0].profit >= results[1].profit
+    assert all(result.placed > 0 for result in results)
+    assert sweep.pending() == []
+
+    # A wider grid only backtests the new combination
+    wider = build_sweep(tmp_path, {"target_delta": [-0.07, -0.1, -0.15]})
+
+    assert wider.pending() == [{"target_delta": -0.15}]
+    assert len(wider.results()) == 2
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from basetypes.Broker.rateLimiter import (
+    PRIORITY_ORDER_ENTRY,
+    PRIORITY_POLLING,
+    RateLimiter,
+    limiter_for,
+)
+
+
+def wait_for_waiters(limiter: RateLimiter, count: int) -> None:
+    deadline = time.monotonic() + 5
+
+    while limiter.queue_depth() < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_burst_is_served_without_waiting():
+    limiter = RateLimiter(1.0, 3.0)
+
+    waits = [limiter.acquire() for _ in range(3)]
+
+    assert waits == [0.0, 0.0, 0.0]
+    assert limiter.stats[PRIORITY_POLLING].calls == 3
+    assert limiter.stats[PRIORITY_POLLING].waited == 0
+
+
+def test_orders_preempt_waiting_polls():
+    limiter = RateLimiter(20.0, 1.0)
+    limiter.acquire()
+    served = []
+
+    def call(name: str, priority: int) -> None:
+        limiter.acquire(priority)
+        served.append(name)
+
+    threads = [
+        threading.Thread(target=call, args=("poll 1", PRIORITY_POLLING)),
+        threading.Thread(target=call, args=("poll 2", PRIORITY_POLLING)),
+        threading.Thread(target=call, args=("order", PRIORITY_ORDER_ENTRY)),
+    ]
+
+    # The polls queue first, the order arrives last
+    for count, thread in enumerate(threads, start=1):
+        thread.start()
+        wait_for_waiters(limiter, count)
+
+    for thread in threads:
+        thread.join()
+
+    assert served == ["order", "poll 1", "poll 2"]
+    assert limiter.stats[PRIORITY_ORDER_ENTRY].waited == 1
+    assert limiter.stats[PRIORITY_POLLING].max_wait >= 0.1
+
+
+def test_brokers_on_one_credentials_file_share_a_limiter(tmp_path):
+    credentials = str(tmp_path / "td_state.json")
+
+    assert limiter_for(credentials) is limiter_for(credentials)
+    assert limiter_for(credentials) is not limiter_for(str(tmp_path / "other.json"))
+
+
+def test_brokers_sharing_a_limiter_get_the_strictest_rate(tmp_path):
+    credentials = str(tmp_path / "td_state.json")
+
+    limiter = limiter_for(credentials, 2.0, 10.0)
+    assert limiter_for(credentials, 1.0, 20.0) is limiter
+    limiter_for(credentials, 3.0, 5.0)
+
+    assert limiter.requests_per_second == 1.0
+    assert limiter.burst == 5.0
+    assert limiter.tokens <= 5.0
@@ -0,0 +1,137 @@
+import datetime as dt
+import os
+from types import SimpleNamespace
+
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Broker.brokerJournal import dumps, loads, read_journal
+from basetypes.Broker.recordingBroker import RecordingBroker
+from basetypes.Broker.replayBroker import ReplayBroker
+from basetypes.Broker.simulatedBroker import SimulatedBroker
+from basetypes.Broker.simulatedMarket import (
+    ReplayedMarket,
+    SyntheticMarket,
+    option_symbol,
+)
+from basetypes.Database.ormDatabase import ormDatabase
+
+START = dt.datetime(2022, 1, 10, 15, tzinfo=dt.timezone.utc)
+EXPIRATION = dt.date(2022, 1, 14)
+
+
+def build_order(symbol: str) -> baseRR.PlaceOrderRequestMessage:
+    leg = baseModels.OrderLeg()
+    leg.symbol = symbol
+    leg.instruction = "SELL_TO_OPEN"
+    leg.asset_type = "OPTION"
+    leg.quantity = 1
+
+    request = baseRR.PlaceOrderRequestMessage()
+    request.order = baseModels.Order()
+    request.order.order_type = "MARKET"
+    request.order.duration = "DAY"
+    request.order.quantity = 1
+    request.order.legs = [leg]
+
+    return request
+
+
+def chain_request() -> baseRR.GetOptionChainRequestMessage:
+    return baseRR.GetOptionChainRequestMessage(
+        1, "SPX", "PUT", True, "ALL", EXPIRATION, EXPIRATION
+    )
+
+
+def record_session(path: str) -> list:
+    """Records a chain read, an order and its fill, returning what the live broker answered."""
+    simulated = SimulatedBroker(
+        "paper",
+        market=SyntheticMarket({"SPX": 4500.0}),
+        clock=lambda: START,
+        fill_latency_seconds=0.0,
+    )
+    broker = RecordingBroker(simulated, path)
+    broker.mediator = SimpleNamespace(killswitch=False)
+
+    chain = broker.get_option_chain(chain_request())
+    placed = broker.place_order(
+        build_order(option_symbol("SPX", EXPIRATION, "PUT", 4400.0))
+    )
+    order = broker.get_order(baseRR.GetOrderRequestMessage(1, placed.order_id))
+    broker.close()
+
+    return [chain, placed, order]
+
+
+def test_recorded_session_replays(tmp_path):
+    path = os.path.join(tmp_path, "session.journal.gz")
+    chain, placed, order = record_session(path)
+
+    assert [record.method for record in read_journal(path)] == [
+        "get_option_chain",
+        "place_order",
+        "get_order",
+    ]
+
+    sleeps = []
+    broker = ReplayBroker("paper", path, speed=2.0, sleep=sleeps.append)
+    broker.mediator = SimpleNamespace(killswitch=False)
+
+    replayed_chain = broker.get_option_chain(chain_request())
+    replayed_placed = broker.place_order(
+        build_order(option_symbol("SPX", EXPIRATION, "PUT", 4400.0))
+    )
+    # Asked for differently, so answered from the next recorded get_order
+    replayed_order = broker.get_order(baseRR.GetOrderRequestMessage(2, 1))
+
+    assert replayed_chain.underlyinglastprice == chain.underlyinglastprice
+    assert replayed_chain.putexpdatemap[0].strikes.keys() == (
+        chain.putexpdatemap[0].strikes.keys()
+    )
+    assert replayed_placed.order_id == placed.order_id
+    assert replayed_order.order.status == order.order.status == "FILLED"
+    assert replayed_order.order.legs[0].symbol == order.order.legs[0].symbol
+    assert broker.stats.exact == 2
+    assert broker.stats.fallback == 1
+    assert len(sleeps) == 3
+
+    # Everything recorded has been answered
+    assert broker.get_order(baseRR.GetOrderRequestMessage(2, 1)) is None
+    assert broker.stats.missing == 1
+
+
+def test_journaled_chains_feed_a_replayed_market(tmp_path):
+    path = os.path.join(tmp_path, "session.journal.gz")
+    chain, _, _ = record_session(path)
+
+    market = ReplayedMarket.from_journal(path)
+    symbol = option_symbol("SPX", EXPIRATION, "PUT", 4400.0)
+    strike = chain.putexpdatemap[0].strikes[4400.0]
+
+    assert market.underlying_price("SPX", dt.datetime.now(dt.timezone.utc)) == (
+        chain.underlyinglastprice
+    )
+    assert market.option_quote(symbol, dt.datetime.now(dt.timezone.utc)) == (
+        strike.bid,
+        strike.ask,
+    )
+    assert market.underlying_price("SPX", START - dt.timedelta(days=1)) is None
+
+    # Quotes from the same chain share one columnar conversion
+    now = dt.datetime.now(dt.timezone.utc)
+    converted = market.columnar["SPX"][1]
+    market.option_quote(option_symbol("SPX", EXPIRATION, "PUT", 4410.0), now)
+    assert market.columnar["SPX"][1] is converted
+
+
+def test_journal_round_trips_mapped_orders():
+    # Mapping the models gives orders SQLAlchemy state and backrefs, neither is journaled
+    database = ormDatabase(":memory:")
+    order = build_order("SPX_011422P4400").order
+    order.status = "FILLED"
+
+    restored = loads(dumps(order))
+    database.close()
+
+    assert restored.status == "FILLED"
+    assert [leg.symbol for leg in restored.legs] == ["SPX_011422P4400"]
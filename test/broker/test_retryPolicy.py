@@ -0,0 +1,121 @@
+from basetypes.Broker.retryPolicy import RetryPolicy
+
+
+def build_policy(**kwargs) -> RetryPolicy:
+    return RetryPolicy(sleep=lambda seconds: None, **kwargs)
+
+
+def test_success_runs_once():
+    policy = build_policy()
+    calls = []
+
+    result = policy.execute(lambda: calls.append(1) or "ok", "test")
+
+    assert result == "ok"
+    assert len(calls) == 1
+    assert policy.stats.attempts == 1
+    assert policy.stats.retries == 0
+
+
+def test_retries_until_success():
+    policy = build_policy()
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError()
+        return "ok"
+
+    assert policy.execute(flaky, "test") == "ok"
+    assert policy.stats.attempts == 3
+    assert policy.stats.retries == 2
+
+
+def test_fatal_and_non_idempotent_errors_are_not_retried():
+    policy = build_policy(
+        fatal_exceptions=(KeyError,), rejected_exceptions=(TimeoutError,)
+    )
+
+    def fail(error):
+        def func():
+            raise error
+
+        return func
+
+    assert policy.execute(fail(KeyError()), "test") is None
+    assert policy.stats.attempts == 1
+
+    assert policy.execute(fail(ConnectionError()), "test", idempotent=False) is None
+    assert policy.stats.attempts == 2
+
+    assert policy.execute(fail(TimeoutError()), "test", idempotent=False) is None
+    assert policy.stats.attempts == 5
+
+
+def test_circuit_trips_after_repeated_failures():
+    policy = build_policy(max_attempts=1, failure_threshold=2)
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise ConnectionError()
+
+    policy.execute(fail, "test")
+    policy.execute(fail, "test")
+    policy.execute(fail, "test")
+
+    assert len(calls) == 2
+    assert policy.is_open()
+    assert policy.stats.circuit_trips == 1
+    assert policy.stats.fast_failures == 1
+
+
+def test_retry_budget_limits_retries():
+    policy = build_policy(max_attempts=5, retry_budget=2, failure_threshold=100)
+
+    def fail():
+        raise ConnectionError()
+
+    policy.execute(fail, "test")
+
+    assert policy.stats.retries == 2
+    assert policy.stats.attempts == 3
+
+
+def test_fatal_errors_do_not_trip_the_circuit():
+    policy = build_policy(
+        max_attempts=1, failure_threshold=2, fatal_exceptions=(KeyError,)
+    )
+
+    def reject():
+        raise KeyError()
+
+    for _ in range(5):
+        policy.execute(reject, "test")
+
+    assert not policy.is_open()
+    assert policy.stats.failures == 5
+    assert policy.stats.circuit_trips == 0
+
+
+def test_half_open_circuit_allows_a_single_trial():
+    policy = build_policy(
+        max_attempts=1, failure_threshold=1, reset_timeout_seconds=0.0
+    )
+    concurrent = []
+
+    def fail():
+        raise ConnectionError()
+
+    def trial():
+        # A second caller arriving while the trial is in flight fails fast
+        concurrent.append(policy.execute(lambda: "ok", "test"))
+        return "ok"
+
+    policy.execute(fail, "test")
+
+    assert policy.execute(trial, "test") == "ok"
+    assert concurrent == [None]
+    assert policy.stats.fast_failures == 1
+    assert not policy.is_open()
@@ -0,0 +1,173 @@
+import datetime as dt
+from types import SimpleNamespace
+
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Broker.simulatedBroker import SimulatedBroker
+from basetypes.Broker.simulatedMarket import SyntheticMarket, option_symbol
+
+# A Monday morning, 10am Eastern
+START = dt.datetime(2022, 1, 10, 15, tzinfo=dt.timezone.utc)
+EXPIRATION = dt.date(2022, 1, 14)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = START
+
+    def __call__(self) -> dt.datetime:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += dt.timedelta(seconds=seconds)
+
+
+def build_broker(clock: Clock, **kwargs) -> SimulatedBroker:
+    broker = SimulatedBroker(
+        "paper", market=SyntheticMarket({"SPX": 4500.0}), clock=clock, **kwargs
+    )
+    broker.mediator = SimpleNamespace(killswitch=False)
+
+    return broker
+
+
+def build_order(symbol: str, instruction: str, price: float) -> baseModels.Order:
+    leg = baseModels.OrderLeg()
+    leg.symbol = symbol
+    leg.instruction = instruction
+    leg.asset_type = "OPTION"
+    leg.quantity = 1
+
+    order = baseModels.Order()
+    order.order_strategy_type = "SINGLE"
+    order.order_type = "LIMIT"
+    order.session = "NORMAL"
+    order.duration = "GOOD_TILL_CANCEL"
+    order.quantity = 1
+    order.price = price
+    order.legs = [leg]
+
+    return order
+
+
+def place(broker: SimulatedBroker, order: baseModels.Order) -> int:
+    request = baseRR.PlaceOrderRequestMessage()
+    request.order = order
+    response = broker.place_order(request)
+    assert response is not None
+
+    return response.order_id
+
+
+def get_order(broker: SimulatedBroker, order_id: int) -> baseModels.Order:
+    response = broker.get_order(baseRR.GetOrderRequestMessage(1, order_id))
+    assert response is not None
+
+    return response.order
+
+
+def test_marketable_order_fills_after_latency():
+    clock = Clock()
+    broker = build_broker(clock, fill_latency_seconds=5.0)
+    symbol = option_symbol("SPX", EXPIRATION, "PUT", 4400.0)
+
+    # Leave room for the underlying to move before the fill
+    bid, _ = broker.market.option_quote(symbol, clock.now)
+    price = round(bid - 1, 2)
+    order_id = place(broker, build_order(symbol, "SELL_TO_OPEN", price))
+
+    assert get_order(broker, order_id).status == "WORKING"
+
+    clock.advance(5)
+    order = get_order(broker, order_id)
+
+    assert order.status == "FILLED"
+    assert order.strategy_id == 1
+    assert order.activities[0].execution_legs[0].price == price
+
+    account = broker.get_account(baseRR.GetAccountRequestMessage(1, False, True))
+    assert account is not None
+    assert account.positions[0].symbol == symbol
+    assert account.positions[0].shortquantity == 1
+    assert account.positions[0].strikeprice == 4400.0
+    assert broker.cash == 100000.0 + price * 100
+    # Cash secured, the strike is held against the short put
+    assert account.currentbalances.buyingpower == broker.cash - 440000.0
+
+
+def test_unmarketable_order_works_until_cancelled():
+    clock = Clock()
+    broker = build_broker(clock)
+    symbol = option_symbol("SPX", EXPIRATION, "PUT", 4400.0)
+
+    _, ask = broker.market.option_quote(symbol, clock.now)
+    order_id = place(broker, build_order(symbol, "SELL_TO_OPEN", ask + 5))
+
+    clock.advance(60)
+    assert get_order(broker, order_id).status == "WORKING"
+
+    cancelled = broker.cancel_order(baseRR.CancelOrderRequestMessage(1, order_id))
+    assert cancelled is not None
+    assert get_order(broker, order_id).status == "CANCELED"
+    assert broker.cash == 100000.0
+
+
+def test_orders_placed_after_the_close_wait_for_the_open():
+    clock = Clock()
+    clock.now = dt.datetime(2022, 1, 10, 22, tzinfo=dt.timezone.utc)
+    broker = build_broker(clock, fill_latency_seconds=0.0)
+    symbol = option_symbol("SPX", EXPIRATION, "PUT", 4400.0)
+
+    order_id = place(broker, build_order(symbol, "SELL_TO_OPEN", 0.05))
+
+    clock.now = dt.datetime(2022, 1, 11, 14, 29, tzinfo=dt.timezone.utc)
+    assert get_order(broker, order_id).status == "WORKING"
+
+    clock.now = dt.datetime(2022, 1, 11, 14, 30, tzinfo=dt.timezone.utc)
+    order = get_order(broker, order_id)
+
+    assert order.status == "FILLED"
+    assert order.close_time == clock.now
+
+
+def test_short_option_settles_at_expiration():
+    clock = Clock()
+    broker = build_broker(clock, fill_latency_seconds=0.0)
+    symbol = option_symbol("SPX", EXPIRATION, "CALL", 6000.0)
+
+    order_id = place(broker, build_order(symbol, "SELL_TO_OPEN", 0.0))
+
+    clock.now = dt.datetime(2022, 1, 15, tzinfo=dt.timezone.utc)
+    account = broker.get_account(baseRR.GetAccountRequestMessage(1, False, True))
+
+    assert account is not None
+    assert account.positions == []
+    assert get_order(broker, order_id).status == "FILLED"
+
+
+def test_synthetic_chain_and_market_hours():
+    clock = Clock()
+    broker = build_broker(clock)
+
+    chain = broker.get_option_chain(
+        baseRR.GetOptionChainRequestMessage(
+            1, "SPX", "PUT", True, "ALL", EXPIRATION, EXPIRATION, columnar=True
+        )
+    )
+
+    assert chain is not None
+    assert len(chain.putexpdatemap) == 1
+    assert chain.callexpdatemap == []
+
+    expiration = chain.putexpdatemap[0]
+    assert (expiration.bid <= expiration.ask).all()
+    assert (expiration.delta <= 0).all()
+    assert expiration.symbol[0].startswith("SPX_011422P")
+
+    saturday = broker.get_market_hours(
+        baseRR.GetMarketHoursRequestMessage(
+            1, "OPTION", "IND", dt.datetime(2022, 1, 15)
+        )
+    )
+    assert saturday is not None
+    assert saturday.isopen is False
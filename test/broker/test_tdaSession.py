@@ -0,0 +1,51 @@
+import json
+import time
+
+from basetypes.Broker.tdaSession import TdaSessionManager
+
+
+def build_manager(tmp_path, expires_in: float) -> TdaSessionManager:
+    credentials = tmp_path / "creds.json"
+    credentials.write_text(
+        json.dumps(
+            {
+                "access_token": "token",
+                "refresh_token": "refresh",
+                "access_token_expires_at": time.time() + expires_in,
+                "refresh_token_expires_at": time.time() + 60 * 60 * 24,
+            }
+        )
+    )
+
+    return TdaSessionManager("id", "http://localhost", "123", str(credentials))
+
+
+def test_get_client_reuses_session(tmp_path):
+    manager = build_manager(tmp_path, 60 * 60)
+
+    first = manager.get_client()
+
+    assert manager.get_client() is first
+    assert first.http_session is manager.get_client().http_session
+
+    manager.close()
+
+    assert manager.get_client() is not first
+
+
+def test_get_client_refreshes_expiring_token(tmp_path, monkeypatch):
+    manager = build_manager(tmp_path, 60)
+    refreshes = []
+
+    def fake_refresh(self):
+        refreshes.append(1)
+        self.state["access_token_expires_at"] = time.time() + 60 * 30
+
+    monkeypatch.setattr(
+        "basetypes.Broker.tdaSession.PooledTDClient.grab_access_token", fake_refresh
+    )
+
+    manager.get_client()
+    manager.get_client()
+
+    assert len(refreshes) == 1
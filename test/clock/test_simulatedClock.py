@@ -0,0 +1,55 @@
+import asyncio
+import datetime as dt
+import threading
+import time
+
+import pytest
+from basetypes.Clock.realClock import RealClock
+from basetypes.Clock.simulatedClock import SimulatedClock
+
+START = dt.datetime(2022, 1, 10, 15, tzinfo=dt.timezone.utc)
+
+
+def test_sleeping_jumps_the_clock_instead_of_waiting():
+    clock = SimulatedClock(START)
+    began = time.monotonic()
+
+    clock.sleep(3600)
+    asyncio.run(clock.sleep_async(60))
+
+    assert clock() == START + dt.timedelta(hours=1, minutes=1)
+    assert clock.monotonic() == (START + dt.timedelta(hours=1, minutes=1)).timestamp()
+    assert time.monotonic() - began < 1
+
+
+def test_waiting_returns_early_when_the_event_is_set():
+    clock = SimulatedClock(START)
+    event = threading.Event()
+
+    assert clock.wait(event, 30) is False
+    assert clock() == START + dt.timedelta(seconds=30)
+
+    event.set()
+
+    assert clock.wait(event, 30) is True
+    assert clock() == START + dt.timedelta(seconds=30)
+
+
+def test_the_clock_never_goes_back():
+    clock = SimulatedClock(START)
+
+    clock.advance_to(START - dt.timedelta(days=1))
+
+    assert clock() == START
+    assert clock.today() == START.astimezone().date()
+
+    with pytest.raises(ValueError):
+        SimulatedClock(dt.datetime(2022, 1, 10))
+
+
+def test_real_clock_reads_the_system_time():
+    clock = RealClock()
+
+    assert abs((clock.now() - dt.datetime.now(dt.timezone.utc)).total_seconds()) < 1
+    assert clock.now().tzinfo == dt.timezone.utc
+    assert clock.today() == dt.date.today()
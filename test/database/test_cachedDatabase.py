@@ -0,0 +1,83 @@
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Database.abstractDatabase import Database
+from basetypes.Database.cachedDatabase import CachedDatabase
+
+
+def build_order(order_id: int, status: str) -> baseModels.Order:
+    order = baseModels.Order()
+    order.id = order_id
+    order.order_id = order_id
+    order.strategy_id = 1
+    order.status = status
+    order.legs = []
+    order.activities = []
+
+    return order
+
+
+class CountingDatabase(Database):
+    def __init__(self):
+        self.reads = 0
+        self.flushes = 0
+
+    def create_order(self, request):
+        return baseRR.CreateDatabaseOrderResponse()
+
+    def update_order(self, request):
+        return baseRR.UpdateDatabaseOrderResponse()
+
+    def create_strategy(self, request):
+        return None
+
+    def read_first_strategy_by_name(self, request):
+        return None
+
+    def read_active_orders(self, request):
+        self.reads += 1
+        response = baseRR.ReadOpenDatabaseOrdersResponse()
+        response.orders = [build_order(1, "WORKING")]
+        return response
+
+    def flush(self):
+        self.flushes += 1
+
+
+def active_ids(db: CachedDatabase) -> list[int]:
+    response = db.read_active_orders(baseRR.ReadOpenDatabaseOrdersRequest(1))
+    return sorted(order.order_id for order in response.orders)
+
+
+def test_active_orders_are_written_through():
+    inner = CountingDatabase()
+    db = CachedDatabase(inner)
+
+    assert active_ids(db) == [1]
+
+    db.create_order(baseRR.CreateDatabaseOrderRequest(build_order(2, "QUEUED")))
+    db.update_order(baseRR.UpdateDatabaseOrderRequest(build_order(1, "FILLED")))
+    db.write_orders(
+        [
+            baseRR.CreateDatabaseOrderRequest(build_order(3, "WORKING")),
+            baseRR.UpdateDatabaseOrderRequest(build_order(2, "WORKING")),
+        ]
+    )
+
+    assert active_ids(db) == [2, 3]
+
+    # Loaded once, then served from memory
+    assert inner.reads == 1
+    assert inner.flushes == 0
+
+
+def test_queued_orders_are_flushed_for_their_ids():
+    inner = CountingDatabase()
+    db = CachedDatabase(inner)
+    active_ids(db)
+
+    queued = build_order(2, "WORKING")
+    queued.id = None
+    db.create_order(baseRR.CreateDatabaseOrderRequest(queued))
+
+    assert active_ids(db) == [1, 2]
+    assert inner.flushes == 1
@@ -0,0 +1,174 @@
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Database.ormDatabase import ormDatabase
+from sqlalchemy import event
+
+
+def build_order(strategy_id: int, status: str) -> baseModels.Order:
+    order = baseModels.Order()
+    order.strategy_id = strategy_id
+    order.order_id = 1
+    order.price = 1.1
+    order.status = status
+    order.legs = []
+    order.activities = []
+
+    return order
+
+
+def create_strategy(db: ormDatabase, name: str) -> int:
+    strategy = baseModels.Strategy()
+    strategy.name = name
+
+    return db.create_strategy(baseRR.CreateDatabaseStrategyRequest(strategy)).id
+
+
+def test_operations_share_one_engine(tmp_path):
+    db = ormDatabase(str(tmp_path / "test.db"))
+    engine = db.engine
+
+    strategy_id = create_strategy(db, "puts")
+    created = db.create_order(
+        baseRR.CreateDatabaseOrderRequest(build_order(strategy_id, "WORKING"))
+    )
+
+    active = db.read_active_orders(baseRR.ReadOpenDatabaseOrdersRequest(strategy_id))
+    assert [order.id for order in active.orders] == [created.id]
+
+    filled = build_order(strategy_id, "FILLED")
+    filled.id = created.id
+    db.update_order(baseRR.UpdateDatabaseOrderRequest(filled))
+
+    active = db.read_active_orders(baseRR.ReadOpenDatabaseOrdersRequest(strategy_id))
+    assert active.orders == []
+
+    strategy = db.read_first_strategy_by_name(
+        baseRR.ReadDatabaseStrategyByNameRequest("puts")
+    )
+    assert strategy.strategy.id == strategy_id
+
+    # Every session went back to the same pool
+    assert db.engine is engine
+    assert engine.pool.checkedout() == 0
+
+    db.close()
+
+
+def test_databases_in_one_process(tmp_path):
+    first = ormDatabase(str(tmp_path / "first.db"))
+    second = ormDatabase(str(tmp_path / "second.db"))
+
+    create_strategy(first, "calls")
+
+    found = second.read_first_strategy_by_name(
+        baseRR.ReadDatabaseStrategyByNameRequest("calls")
+    )
+    assert found.strategy is None
+
+    first.close()
+    second.close()
+
+
+def test_tuned_profile(tmp_path):
+    db = ormDatabase(str(tmp_path / "test.db"))
+
+    with db.engine.connect() as connection:
+        journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+        synchronous = connection.exec_driver_sql("PRAGMA synchronous").scalar()
+        plan = connection.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT * FROM orders WHERE strategy_id = 1"
+        ).all()
+
+    assert journal_mode == "wal"
+    assert synchronous == 1
+    assert "ix_orders_strategy_id_status" in str(plan)
+
+    db.close()
+
+
+def test_write_orders_in_one_batch(tmp_path):
+    db = ormDatabase(str(tmp_path / "test.db"))
+    strategy_id = create_strategy(db, "spreads")
+
+    existing = build_order(strategy_id, "WORKING")
+    db.create_order(baseRR.CreateDatabaseOrderRequest(existing))
+
+    filled = build_order(strategy_id, "FILLED")
+    filled.id = existing.id
+    created = build_order(strategy_id, "WORKING")
+
+    db.write_orders(
+        [
+            baseRR.UpdateDatabaseOrderRequest(filled),
+            baseRR.CreateDatabaseOrderRequest(created),
+        ]
+    )
+
+    active = db.read_active_orders(baseRR.ReadOpenDatabaseOrdersRequest(strategy_id))
+    assert [order.id for order in active.orders] == [created.id]
+
+    db.close()
+
+
+def build_order_with_children(strategy_id: int, status: str) -> baseModels.Order:
+    order = build_order(strategy_id, status)
+
+    for leg_id in range(2):
+        leg = baseModels.OrderLeg()
+        leg.leg_id = leg_id
+        leg.symbol = "SPX"
+        order.legs.append(leg)
+
+        activity = baseModels.OrderActivity()
+        activity.activity_type = "EXECUTION"
+        activity.execution_legs = []
+        execution_leg = baseModels.ExecutionLeg()
+        execution_leg.leg_id = leg_id
+        execution_leg.price = 1.1
+        activity.execution_legs.append(execution_leg)
+        order.activities.append(activity)
+
+    return order
+
+
+def test_upserts_use_a_fixed_number_of_statements(tmp_path):
+    db = ormDatabase(str(tmp_path / "test.db"))
+    strategy_id = create_strategy(db, "bulk")
+    statements = []
+    event.listen(
+        db.engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    orders = [build_order_with_children(strategy_id, "WORKING") for _ in range(20)]
+    db.write_orders([baseRR.CreateDatabaseOrderRequest(order) for order in orders])
+    created = len(statements)
+
+    for order in orders:
+        order.status = "FILLED"
+        order.legs[0].symbol = "SPXW"
+
+    statements.clear()
+    db.write_orders([baseRR.UpdateDatabaseOrderRequest(order) for order in orders])
+
+    # Four ID lookups and four inserts, then four upserts, however many orders there are
+    assert created == 8
+    assert len(statements) == 4
+
+    with db.engine.connect() as connection:
+        legs = connection.exec_driver_sql(
+            "SELECT order_id, symbol FROM orderlegs ORDER BY id"
+        ).all()
+        executions = connection.exec_driver_sql(
+            "SELECT COUNT(*) FROM executionlegs JOIN orderactivities"
+            " ON orderactivities.id = executionlegs.orderactivity_id"
+            " JOIN orders ON orders.id = orderactivities.order_id"
+            " WHERE orders.status = 'FILLED'"
+        ).scalar()
+
+    assert legs[:2] == [(orders[0].id, "SPXW"), (orders[0].id, "SPX")]
+    assert len(legs) == 40
+    assert executions == 40
+
+    db.close()
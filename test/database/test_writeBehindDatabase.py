@@ -0,0 +1,130 @@
+import threading
+
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Database.abstractDatabase import Database
+from basetypes.Database.writeBehindDatabase import WriteBehindDatabase
+
+
+class RecordingDatabase(Database):
+    def __init__(self):
+        self.batches: list[list] = []
+        self.closed = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def create_order(self, request):
+        return None
+
+    def update_order(self, request):
+        return None
+
+    def create_strategy(self, request):
+        return None
+
+    def read_first_strategy_by_name(self, request):
+        return None
+
+    def read_active_orders(self, request):
+        return sum(len(batch) for batch in self.batches)
+
+    def write_orders(self, requests):
+        self.release.wait()
+        self.batches.append(list(requests))
+
+    def close(self):
+        self.closed = True
+
+
+def build_order(id, status: str) -> baseModels.Order:
+    order = baseModels.Order()
+    order.id = id
+    order.status = status
+    order.legs = []
+    order.activities = []
+
+    return order
+
+
+def test_updates_to_an_order_are_coalesced():
+    inner = RecordingDatabase()
+    db = WriteBehindDatabase(inner, batch_seconds=10.0)
+
+    db.create_order(baseRR.CreateDatabaseOrderRequest(build_order(None, "WORKING")))
+    db.update_order(baseRR.UpdateDatabaseOrderRequest(build_order(1, "WORKING")))
+    db.update_order(baseRR.UpdateDatabaseOrderRequest(build_order(2, "WORKING")))
+    db.update_order(baseRR.UpdateDatabaseOrderRequest(build_order(1, "FILLED")))
+    db.flush()
+
+    # One batch, the latest update to order 1 kept in its original place
+    assert len(inner.batches) == 1
+    assert [
+        (request.order.id, request.order.status) for request in inner.batches[0]
+    ] == [
+        (None, "WORKING"),
+        (1, "FILLED"),
+        (2, "WORKING"),
+    ]
+
+    db.close()
+
+
+def test_reads_see_queued_writes():
+    inner = RecordingDatabase()
+    db = WriteBehindDatabase(inner, batch_seconds=10.0)
+
+    db.create_order(baseRR.CreateDatabaseOrderRequest(build_order(None, "WORKING")))
+
+    assert db.read_active_orders(baseRR.ReadOpenDatabaseOrdersRequest(1)) == 1
+
+    db.close()
+
+
+def test_close_flushes_writes_in_flight():
+    inner = RecordingDatabase()
+    inner.release.clear()
+    db = WriteBehindDatabase(inner, batch_seconds=0.0)
+
+    db.update_order(baseRR.UpdateDatabaseOrderRequest(build_order(1, "WORKING")))
+    db.update_order(baseRR.UpdateDatabaseOrderRequest(build_order(2, "WORKING")))
+
+    closer = threading.Thread(target=db.close)
+    closer.start()
+    inner.release.set()
+    closer.join(5)
+
+    assert not closer.is_alive()
+    assert sum(len(batch) for batch in inner.batches) == 2
+    assert inner.closed
+    assert not db.writer.is_alive()
+
+
+def test_a_batch_of_writes_is_queued_together():
+    inner = RecordingDatabase()
+    db = WriteBehindDatabase(inner, batch_seconds=10.0)
+    wakeups = []
+    notify_all = db.condition.notify_all
+
+    def count_wakeups():
+        wakeups.append(1)
+        notify_all()
+
+    db.condition.notify_all = count_wakeups
+
+    db.write_orders(
+        [
+            baseRR.CreateDatabaseOrderRequest(build_order(None, "WORKING")),
+            baseRR.UpdateDatabaseOrderRequest(build_order(1, "WORKING")),
+            baseRR.UpdateDatabaseOrderRequest(build_order(1, "FILLED")),
+        ]
+    )
+
+    assert len(wakeups) == 1
+
+    db.flush()
+
+    assert [
+        (request.order.id, request.order.status) for request in inner.batches[0]
+    ] == [(None, "WORKING"), (1, "FILLED")]
+
+    db.close()
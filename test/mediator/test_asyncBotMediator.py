@@ -0,0 +1,95 @@
+import asyncio
+import datetime as dt
+import time
+from test.mediator.test_botMediator import (
+    FakeBroker,
+    FakeDatabase,
+    FakeNotifier,
+    build_bot,
+)
+
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Broker.asyncBrokerAdapter import AsyncBrokerAdapter
+from basetypes.Clock.simulatedClock import SimulatedClock
+from basetypes.Mediator.asyncBotMediator import AsyncBot
+from basetypes.Mediator.botMediator import Bot
+from basetypes.Strategy.abstractAsyncStrategy import AsyncStrategy
+
+
+class SlowBroker(FakeBroker):
+    def get_quote(self, request):
+        time.sleep(0.2)
+        return super().get_quote(request)
+
+
+class QuotingStrategy(AsyncStrategy):
+    async def process_strategy(self):
+        self.started = time.monotonic()
+        await self.mediator.get_quote(
+            baseRR.GetQuoteRequestMessage(self.strategy_id, [self.underlying])
+        )
+        self.finished = time.monotonic()
+
+
+def test_async_strategies_get_ids_and_mediator(tmp_path):
+    bot = build_bot(tmp_path, {})
+    strategy = QuotingStrategy("async", "SPX")
+    asyncbot = AsyncBot(bot, {strategy: AsyncBrokerAdapter(FakeBroker("individual"))})
+
+    assert strategy.strategy_id == 1
+    assert strategy.mediator is asyncbot
+
+
+def test_async_strategies_on_different_brokers_run_concurrently(tmp_path):
+    bot = build_bot(tmp_path, {})
+    first = QuotingStrategy("first", "SPX")
+    second = QuotingStrategy("second", "SPX")
+    firstbroker = SlowBroker("individual")
+    secondbroker = SlowBroker("ira")
+    asyncbot = AsyncBot(
+        bot,
+        {
+            first: AsyncBrokerAdapter(firstbroker),
+            second: AsyncBrokerAdapter(secondbroker),
+        },
+    )
+
+    asyncio.run(asyncbot.process_tick())
+
+    assert firstbroker.calls == ["get_quote"]
+    assert secondbroker.calls == ["get_quote"]
+    assert first.started < second.finished and second.started < first.finished
+
+
+class FastStrategy(AsyncStrategy):
+    """Asks to run every 10 seconds, like a strategy in its closing window, and stops the bot after a minute."""
+
+    async def process_strategy(self):
+        self.runs.append(self.mediator.clock.now())
+
+        if self.mediator.clock.now() >= self.stop_at:
+            self.mediator.bot.set_kill_switch(baseRR.SetKillSwitchRequestMessage(True))
+
+    def next_wakeup(self, now):
+        return now + dt.timedelta(seconds=10)
+
+
+def test_async_strategies_run_at_the_wake_up_they_ask_for(tmp_path):
+    clock = SimulatedClock(dt.datetime(2022, 1, 10, 15, tzinfo=dt.timezone.utc))
+    bot = Bot(
+        notifier=FakeNotifier(),
+        database=FakeDatabase(),
+        brokerstrategy={},
+        market_calendar_filename=str(tmp_path / "calendar.json"),
+        clock=clock,
+    )
+    strategy = FastStrategy("fast", "SPX")
+    strategy.runs = []
+    strategy.stop_at = clock.now() + dt.timedelta(seconds=60)
+    asyncbot = AsyncBot(bot, {strategy: AsyncBrokerAdapter(FakeBroker("individual"))})
+
+    asyncio.run(asyncbot.process_strategies())
+
+    gaps = [(b - a).total_seconds() for a, b in zip(strategy.runs, strategy.runs[1:])]
+    assert len(strategy.runs) == 7
+    assert gaps == [10.0] * 6
@@ -0,0 +1,449 @@
+import datetime as dt
+import time
+
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Broker.abstractBroker import Broker
+from basetypes.Broker.simulatedBroker import SimulatedBroker
+from basetypes.Broker.simulatedMarket import SyntheticMarket
+from basetypes.Clock.simulatedClock import SimulatedClock
+from basetypes.Database.abstractDatabase import Database
+from basetypes.Database.cachedDatabase import CachedDatabase
+from basetypes.Database.ormDatabase import ormDatabase
+from basetypes.Database.writeBehindDatabase import WriteBehindDatabase
+from basetypes.Mediator.botMediator import Bot
+from basetypes.Notifier.abstractnotifier import Notifier
+from basetypes.Strategy.abstractStrategy import Strategy
+from basetypes.Strategy.singlebydeltastrategy import SingleByDeltaStrategy
+
+
+class FakeBroker(Broker):
+    def __init__(self, id: str):
+        self.id = id
+        self.calls: list[str] = []
+
+    def get_account(self, request):
+        self.calls.append("get_account")
+        response = baseRR.GetAccountResponseMessage()
+        response.accountnumber = len(self.calls)
+        return response
+
+    def place_order(self, request):
+        self.calls.append("place_order")
+        response = baseRR.PlaceOrderResponseMessage()
+        response.order_id = 1
+        return response
+
+    def cancel_order(self, request):
+        self.calls.append("cancel_order")
+        return None
+
+    def get_option_chain(self, request):
+        self.calls.append("get_option_chain")
+        return None
+
+    def get_market_hours(self, request):
+        self.calls.append("get_market_hours")
+        return None
+
+    def get_order(self, request):
+        self.calls.append("get_order")
+        return None
+
+    def get_quote(self, request):
+        self.calls.append("get_quote")
+        return None
+
+
+class FakeDatabase(Database):
+    def __init__(self):
+        self.strategies: list[str] = []
+
+    def create_order(self, request):
+        return None
+
+    def update_order(self, request):
+        return None
+
+    def create_strategy(self, request):
+        self.strategies.append(request.strategy.name)
+        response = baseRR.CreateDatabaseStrategyResponse()
+        response.id = len(self.strategies)
+        return response
+
+    def read_first_strategy_by_name(self, request):
+        response = baseRR.ReadDatabaseStrategyByNameResponse()
+        response.strategy = None
+        return response
+
+    def read_active_orders(self, request):
+        return None
+
+
+class FakeNotifier(Notifier):
+    def __init__(self):
+        self.messages: list[str] = []
+
+    def send_notification(self, request):
+        self.messages.append(request.message)
+
+
+class FakeStrategy(Strategy):
+    def process_strategy(self):
+        pass
+
+
+def build_bot(tmp_path, brokerstrategy) -> Bot:
+    return Bot(
+        notifier=FakeNotifier(),
+        database=FakeDatabase(),
+        brokerstrategy=brokerstrategy,
+        market_calendar_filename=str(tmp_path / "calendar.json"),
+    )
+
+
+def test_strategies_sharing_a_broker_share_one_account_snapshot(tmp_path):
+    broker = FakeBroker("individual")
+    first = FakeStrategy("first", "SPX")
+    second = FakeStrategy("second", "SPX")
+    bot = build_bot(tmp_path, {first: broker, second: broker})
+
+    one = bot.get_account(
+        baseRR.GetAccountRequestMessage(first.strategy_id, False, True)
+    )
+    two = bot.get_account(
+        baseRR.GetAccountRequestMessage(second.strategy_id, True, True)
+    )
+
+    assert one is two
+    assert broker.calls == ["get_account"]
+
+
+def test_placing_an_order_invalidates_the_account_snapshot(tmp_path):
+    broker = FakeBroker("individual")
+    strategy = FakeStrategy("first", "SPX")
+    bot = build_bot(tmp_path, {strategy: broker})
+    request = baseRR.GetAccountRequestMessage(strategy.strategy_id, False, True)
+
+    bot.get_account(request)
+
+    order = baseRR.PlaceOrderRequestMessage()
+    order.order = baseModels.Order()
+    order.order.strategy_id = strategy.strategy_id
+    bot.place_order(order)
+
+    bot.get_account(request)
+
+    assert broker.calls == ["get_account", "place_order", "get_account"]
+
+
+class SleepyStrategy(Strategy):
+    def process_strategy(self):
+        self.started = time.monotonic()
+        time.sleep(0.2)
+        self.finished = time.monotonic()
+
+
+def test_strategies_on_different_brokers_run_concurrently(tmp_path):
+    individual = FakeBroker("individual")
+    ira = FakeBroker("ira")
+    first = SleepyStrategy("first", "SPX")
+    second = SleepyStrategy("second", "SPX")
+    third = SleepyStrategy("third", "SPX")
+    bot = Bot(
+        notifier=FakeNotifier(),
+        database=FakeDatabase(),
+        brokerstrategy={first: individual, second: individual, third: ira},
+        market_calendar_filename=str(tmp_path / "calendar.json"),
+        max_concurrency=2,
+    )
+
+    bot.process_strategies_concurrently()
+
+    # Same broker: serialized. Different broker: overlapping.
+    assert second.started >= first.finished
+    assert third.started < first.finished
+
+
+class TrackingStrategy(Strategy):
+    def process_strategy(self):
+        pass
+
+    def process_order_event(self, event):
+        self.events.append(event.status)
+
+
+def test_finished_orders_are_handed_back_to_their_strategy(tmp_path):
+    broker = FakeBroker("individual")
+    strategy = TrackingStrategy("first", "SPX")
+    strategy.events = []
+    bot = build_bot(tmp_path, {strategy: broker})
+
+    order = baseRR.PlaceOrderRequestMessage()
+    order.order = baseModels.Order()
+    strategy.track_order(order, 7, 20.0)
+
+    assert strategy.pending_order_ids == {7}
+
+    # FakeBroker.get_order returns None, so fake a fill straight from the tracker
+    event = baseRR.OrderEventMessage(
+        strategy.strategy_id, 7, "FILLED", False, None, order
+    )
+    bot.order_tracker.poll = lambda get_order, cancel_order: [event]
+    bot.process_order_events()
+
+    assert strategy.events == ["FILLED"]
+    assert strategy.pending_order_ids == set()
+
+
+def test_an_unconfirmed_cancel_is_not_replaced(tmp_path):
+    clock = SimulatedClock(dt.datetime(2022, 1, 10, 15, tzinfo=dt.timezone.utc))
+    broker = FakeBroker("individual")
+    strategy = TrackingStrategy("first", "SPX")
+    strategy.events = []
+    bot = Bot(
+        notifier=FakeNotifier(),
+        database=FakeDatabase(),
+        brokerstrategy={strategy: broker},
+        market_calendar_filename=str(tmp_path / "calendar.json"),
+        clock=clock,
+    )
+
+    order = baseRR.PlaceOrderRequestMessage()
+    order.order = baseModels.Order()
+    strategy.track_order(order, 7, 0.0)
+
+    # FakeBroker never reports the order, so its cancellation is never confirmed
+    for _ in range(bot.order_tracker.max_cancel_polls + 2):
+        clock.advance(bot.order_tracker.initial_poll_seconds)
+        bot.process_order_events()
+
+    assert "cancel_order" in broker.calls
+    assert not bot.order_tracker.orders
+    assert strategy.events == []
+    assert strategy.pending_order_ids == {7}
+    assert "may still be live" in bot.notifier.messages[-1]
+
+
+def test_a_paused_bot_does_not_replace_timed_out_orders(tmp_path):
+    strategy = TrackingStrategy("first", "SPX")
+    strategy.events = []
+    bot = build_bot(tmp_path, {strategy: FakeBroker("individual")})
+    bot.pause_bot()
+
+    order = baseRR.PlaceOrderRequestMessage()
+    order.order = baseModels.Order()
+    events = [
+        baseRR.OrderEventMessage(
+            strategy.strategy_id, 7, "CANCELED", True, None, order
+        ),
+        baseRR.OrderEventMessage(strategy.strategy_id, 8, "FILLED", False, None, order),
+    ]
+    bot.order_tracker.poll = lambda get_order, cancel_order: events
+    bot.process_order_events()
+
+    # Fills are still handled, timeouts aren't placed again
+    assert strategy.events == ["FILLED"]
+
+
+class RetryingStrategy(Strategy):
+    def process_strategy(self):
+        pass
+
+    def next_wakeup(self, now):
+        return self.sleep_until if now < self.sleep_until else None
+
+    def process_order_event(self, event):
+        # Timed out, try again next time
+        self.sleep_until = self.now()
+
+
+def test_a_strategy_is_rescheduled_after_its_order_times_out(tmp_path):
+    clock = SimulatedClock(dt.datetime(2022, 1, 10, 15, tzinfo=dt.timezone.utc))
+    strategy = RetryingStrategy("first", "SPX")
+    bot = Bot(
+        notifier=FakeNotifier(),
+        database=FakeDatabase(),
+        brokerstrategy={strategy: FakeBroker("individual")},
+        market_calendar_filename=str(tmp_path / "calendar.json"),
+        clock=clock,
+    )
+
+    # Placing the order put the strategy to sleep until tomorrow
+    strategy.sleep_until = clock() + dt.timedelta(days=1)
+    bot.scheduler.reschedule(strategy)
+
+    order = baseRR.PlaceOrderRequestMessage()
+    order.order = baseModels.Order()
+    event = baseRR.OrderEventMessage(
+        strategy.strategy_id, 7, "CANCELED", True, None, order
+    )
+    bot.order_tracker.poll = lambda get_order, cancel_order: [event]
+    bot.process_order_events()
+
+    clock.advance(bot.scheduler.default_interval_seconds)
+
+    assert bot.scheduler.pop_due() == [strategy]
+
+
+def test_a_rejected_order_backs_off_instead_of_being_replaced(tmp_path):
+    clock = SimulatedClock(dt.datetime(2022, 1, 10, 15, tzinfo=dt.timezone.utc))
+    broker = FakeBroker("individual")
+    strategy = SingleByDeltaStrategy(strategy_name="single")
+    bot = Bot(
+        notifier=FakeNotifier(),
+        database=FakeDatabase(),
+        brokerstrategy={strategy: broker},
+        market_calendar_filename=str(tmp_path / "calendar.json"),
+        clock=clock,
+    )
+
+    order = baseRR.PlaceOrderRequestMessage()
+    order.order = baseModels.Order()
+    event = baseRR.OrderEventMessage(
+        strategy.strategy_id, 7, "REJECTED", False, None, order
+    )
+    bot.order_tracker.poll = lambda get_order, cancel_order: [event]
+    bot.process_order_events()
+
+    backoff = dt.timedelta(seconds=strategy.rejected_order_backoff_seconds)
+
+    assert broker.calls == []
+    assert strategy.next_wakeup(clock()) == clock() + backoff
+
+    # Running before the backoff ends doesn't touch the broker
+    clock.advance(1)
+    strategy.process_strategy()
+
+    assert broker.calls == []
+
+
+def build_order(id, order_id: int, status: str) -> baseModels.Order:
+    order = baseModels.Order()
+    order.id = id
+    order.strategy_id = 1
+    order.order_id = order_id
+    order.status = status
+    order.legs = []
+    order.activities = []
+
+    return order
+
+
+class AccountOrdersBroker(FakeBroker):
+    def get_account(self, request):
+        response = super().get_account(request)
+        response.orders = [build_order(None, 101, "FILLED")]
+        return response
+
+    def get_order(self, request):
+        self.calls.append("get_order")
+        response = baseRR.GetOrderResponseMessage()
+        response.order = build_order(None, request.orderid, "WORKING")
+        return response
+
+
+class StoredOrdersDatabase(FakeDatabase):
+    def read_active_orders(self, request):
+        response = baseRR.ReadOpenDatabaseOrdersResponse()
+        response.orders = [
+            build_order(1, 101, "WORKING"),
+            build_order(2, 102, "QUEUED"),
+        ]
+        return response
+
+    def write_orders(self, requests):
+        self.batches.append(requests)
+
+
+def test_orders_are_reconciled_from_one_account_snapshot(tmp_path):
+    broker = AccountOrdersBroker("individual")
+    strategy = FakeStrategy("first", "SPX")
+    database = StoredOrdersDatabase()
+    database.batches = []
+    bot = Bot(
+        notifier=FakeNotifier(),
+        database=database,
+        brokerstrategy={strategy: broker},
+        market_calendar_filename=str(tmp_path / "calendar.json"),
+    )
+
+    response = bot.reconcile_orders(
+        baseRR.ReconcileOrdersRequestMessage(strategy.strategy_id)
+    )
+
+    # Only the order missing from the snapshot is fetched on its own
+    assert broker.calls == ["get_account", "get_order"]
+    assert [order.order_id for order in response.orders] == [102]
+
+    # Both updates point at their database records and are written together
+    assert len(database.batches) == 1
+    assert [
+        (update.order.id, update.order.status) for update in database.batches[0]
+    ] == [(1, "FILLED"), (2, "WORKING")]
+
+
+class UnchangedOrdersBroker(FakeBroker):
+    def get_account(self, request):
+        response = super().get_account(request)
+        response.orders = [build_order(None, 101, "WORKING")]
+        return response
+
+
+def test_unchanged_orders_are_reconciled_after_a_restart(tmp_path):
+    filename = str(tmp_path / "bot.db")
+
+    def start(broker):
+        return Bot(
+            notifier=FakeNotifier(),
+            database=CachedDatabase(WriteBehindDatabase(ormDatabase(filename))),
+            brokerstrategy={FakeStrategy("first", "SPX"): broker},
+            market_calendar_filename=str(tmp_path / "calendar.json"),
+        )
+
+    bot = start(FakeBroker("individual"))
+    bot.create_db_order(
+        baseRR.CreateDatabaseOrderRequest(build_order(None, 101, "WORKING"))
+    )
+    bot.shutdown()
+
+    # Stored orders are read back detached from their session
+    bot = start(UnchangedOrdersBroker("individual"))
+    response = bot.reconcile_orders(baseRR.ReconcileOrdersRequestMessage(1))
+    bot.shutdown()
+
+    assert [order.order_id for order in response.orders] == [101]
+
+
+class StopAtStrategy(Strategy):
+    def process_strategy(self):
+        if self.now() >= self.stop_at:
+            self.mediator.set_kill_switch(baseRR.SetKillSwitchRequestMessage(True))
+
+    def next_wakeup(self, now):
+        return self.stop_at
+
+
+def test_a_market_day_runs_in_seconds_on_a_simulated_clock(tmp_path):
+    # Monday, from before the open until after the close
+    clock = SimulatedClock(dt.datetime(2022, 1, 10, 13, tzinfo=dt.timezone.utc))
+    broker = SimulatedBroker(
+        "paper", market=SyntheticMarket({"$SPX.X": 4500.0}), clock=clock
+    )
+    strategy = SingleByDeltaStrategy(strategy_name="single")
+    stop = StopAtStrategy("stop", "SPX")
+    stop.stop_at = dt.datetime(2022, 1, 10, 22, tzinfo=dt.timezone.utc)
+    bot = Bot(
+        notifier=FakeNotifier(),
+        database=ormDatabase(str(tmp_path / "bot.db")),
+        brokerstrategy={strategy: broker, stop: broker},
+        market_calendar_filename=str(tmp_path / "calendar.json"),
+        clock=clock,
+    )
+
+    began = time.monotonic()
+    bot.process_strategies()
+
+    assert time.monotonic() - began < 30
+    assert clock.now() >= stop.stop_at
+    assert any(order.status == "FILLED" for order in broker.orders.values())
@@ -0,0 +1,53 @@
+from basetypes.Broker.tdaBroker import TdaBroker
+
+
+def contract(strike: float, settlement: str = "P", bid=1.0) -> dict:
+    return {
+        "strikePrice": strike,
+        "multiplier": 100.0,
+        "bid": bid,
+        "ask": bid + 0.1,
+        "delta": -strike / 10000,
+        "gamma": 0.01,
+        "theta": -0.5,
+        "vega": 0.2,
+        "rho": "NaN",
+        "symbol": "SPXW_012822P{}".format(int(strike)),
+        "description": "SPXW Jan 28 2022 {} Put".format(int(strike)),
+        "putCall": "PUT",
+        "settlementType": settlement,
+        "expirationType": "W",
+    }
+
+
+RAW = {
+    "2022-01-28:3": {
+        "4500.0": [contract(4500.0)],
+        "4400.0": [contract(4400.0, "A"), contract(4400.0)],
+        "4450.0": [contract(4450.0)],
+    }
+}
+
+
+def test_columnar_chain_matches_legacy_chain():
+    legacy = TdaBroker.translate_option_chain(RAW)[0]
+    columnar = TdaBroker.translate_option_chain_columnar(RAW)[0]
+
+    assert columnar.expirationdate == legacy.expirationdate
+    assert columnar.daystoexpiration == 3
+    assert list(columnar.strike) == [4400.0, 4450.0, 4500.0]
+    assert columnar.strikes.keys() == legacy.strikes.keys()
+
+    for strike, details in legacy.strikes.items():
+        view = columnar.get(strike)
+        assert view.symbol == details.symbol
+        assert view.bid == details.bid
+        assert view.delta == details.delta
+
+
+def test_missing_strikes_and_non_numeric_values():
+    columnar = TdaBroker.translate_option_chain_columnar(RAW)[0]
+
+    assert columnar.get(4425.0) is None
+    assert columnar.index_of(4450.0) == 1
+    assert all(value != value for value in columnar.rho)
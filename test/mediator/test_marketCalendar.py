@@ -0,0 +1,110 @@
+import datetime as dt
+
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Mediator.marketCalendar import MarketCalendar
+
+
+class FakeLoader:
+    """Weekdays are open 14:30-21:00 UTC, weekends are closed."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, market: str, product: str, day: dt.date):
+        self.calls += 1
+        response = baseRR.GetMarketHoursResponseMessage()
+        response.isopen = day.weekday() < 5
+        response.start = dt.datetime.combine(day, dt.time(14, 30), dt.timezone.utc)
+        response.end = dt.datetime.combine(day, dt.time(21), dt.timezone.utc)
+        return response
+
+
+def today() -> dt.date:
+    return dt.datetime.now().astimezone(dt.timezone.utc).date()
+
+
+def test_sessions_are_fetched_in_bulk_once(tmp_path):
+    loader = FakeLoader()
+    calendar = MarketCalendar(str(tmp_path / "calendar.json"), days_ahead=7)
+
+    for offset in range(7):
+        calendar.get_session(
+            "OPTION", "IND", today() + dt.timedelta(days=offset), loader
+        )
+
+    assert loader.calls == 8
+
+
+def test_next_session_skips_closed_days(tmp_path):
+    loader = FakeLoader()
+    calendar = MarketCalendar(str(tmp_path / "calendar.json"), days_ahead=7)
+    saturday = today() + dt.timedelta(days=(5 - today().weekday()) % 7)
+    after = dt.datetime.combine(saturday, dt.time(), dt.timezone.utc)
+
+    # A closed day is answered as closed, None is kept for failures
+    closed = calendar.get_session("OPTION", "IND", saturday, loader)
+    assert closed is not None and not closed.isopen
+
+    hours = calendar.get_next_session("OPTION", "IND", saturday, after, loader)
+
+    assert hours is not None
+    assert hours.start.date() == saturday + dt.timedelta(days=2)
+
+
+def test_calendar_is_persisted(tmp_path):
+    filename = str(tmp_path / "calendar.json")
+    MarketCalendar(filename, days_ahead=3).get_session(
+        "OPTION", "EQO", today(), FakeLoader()
+    )
+
+    loader = FakeLoader()
+    hours = MarketCalendar(filename, days_ahead=3).get_session(
+        "OPTION", "EQO", today() + dt.timedelta(days=1), loader
+    )
+
+    assert loader.calls == 0
+    assert hours is None or hours.end.tzinfo is not None
+
+
+class FlakyLoader(FakeLoader):
+    """Fails for the given days."""
+
+    def __init__(self, failing):
+        super().__init__()
+        self.failing = failing
+
+    def __call__(self, market: str, product: str, day: dt.date):
+        if day in self.failing:
+            self.calls += 1
+            return None
+
+        return super().__call__(market, product, day)
+
+
+def test_a_partial_fetch_keeps_what_loaded_and_backs_off(tmp_path):
+    now = [dt.datetime.now().astimezone(dt.timezone.utc)]
+    calendar = MarketCalendar(
+        str(tmp_path / "calendar.json"),
+        days_ahead=7,
+        retry_seconds=60.0,
+        clock=lambda: now[0],
+    )
+    tomorrow = today() + dt.timedelta(days=1)
+    loader = FlakyLoader({tomorrow})
+
+    calendar.get_session("OPTION", "IND", today(), loader)
+    assert loader.calls == 8
+
+    # The days that loaded are served and the failed day isn't refetched until the retry interval passes
+    hours = calendar.get_session("OPTION", "IND", today(), loader)
+    missing = calendar.get_session("OPTION", "IND", tomorrow, loader)
+    assert loader.calls == 8
+    assert hours.isopen == (today().weekday() < 5)
+    assert missing is None
+
+    loader.failing = set()
+    now[0] += dt.timedelta(seconds=60)
+    hours = calendar.get_session("OPTION", "IND", tomorrow, loader)
+
+    assert loader.calls == 17
+    assert hours.isopen == (tomorrow.weekday() < 5)
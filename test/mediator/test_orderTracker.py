@@ -0,0 +1,112 @@
+import datetime as dt
+
+import basetypes.Mediator.baseModels as baseModels
+import basetypes.Mediator.reqRespTypes as baseRR
+from basetypes.Mediator.orderTracker import OrderTracker
+
+START = dt.datetime(2022, 1, 3, 15, 0, tzinfo=dt.timezone.utc)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self) -> dt.datetime:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += dt.timedelta(seconds=seconds)
+
+
+class FakeOrders:
+    """Answers get_order with a scripted status and records cancels."""
+
+    def __init__(self, status: str = "WORKING"):
+        self.status = status
+        self.gets = 0
+        self.cancels = 0
+
+    def get_order(self, request):
+        self.gets += 1
+        response = baseRR.GetOrderResponseMessage()
+        response.order = baseModels.Order()
+        response.order.order_id = request.orderid
+        response.order.status = self.status
+        return response
+
+    def cancel_order(self, request):
+        self.cancels += 1
+        return None
+
+
+def track(tracker: OrderTracker, timeout: float = 20.0) -> None:
+    orderrequest = baseRR.PlaceOrderRequestMessage()
+    orderrequest.order = baseModels.Order()
+    tracker.track(baseRR.TrackOrderRequestMessage(1, 42, orderrequest, timeout))
+
+
+def test_fill_is_reported_on_the_first_poll():
+    clock = FakeClock()
+    tracker = OrderTracker(clock=clock)
+    orders = FakeOrders("FILLED")
+    track(tracker)
+
+    assert tracker.poll(orders.get_order, orders.cancel_order) == []
+
+    clock.advance(1)
+    events = tracker.poll(orders.get_order, orders.cancel_order)
+
+    assert [(event.order_id, event.status, event.timed_out) for event in events] == [
+        (42, "FILLED", False)
+    ]
+    assert tracker.next_poll() is None
+
+
+def test_polling_backs_off_but_not_past_the_timeout():
+    clock = FakeClock()
+    tracker = OrderTracker(1.0, 4.0, 2.0, clock=clock)
+    orders = FakeOrders()
+    track(tracker, timeout=10.0)
+
+    polls = []
+    while clock.now < START + dt.timedelta(seconds=10):
+        clock.now = tracker.next_poll()
+        tracker.poll(orders.get_order, orders.cancel_order)
+        polls.append((clock.now - START).total_seconds())
+
+    assert polls == [1.0, 3.0, 7.0, 10.0]
+    assert orders.cancels == 1
+
+
+def test_unfilled_order_is_cancelled_then_reported():
+    clock = FakeClock()
+    tracker = OrderTracker(clock=clock)
+    orders = FakeOrders()
+    track(tracker, timeout=5.0)
+
+    clock.advance(5)
+    assert tracker.poll(orders.get_order, orders.cancel_order) == []
+    assert orders.cancels == 1
+
+    orders.status = "CANCELED"
+    clock.advance(1)
+    events = tracker.poll(orders.get_order, orders.cancel_order)
+
+    assert [(event.status, event.timed_out) for event in events] == [("CANCELED", True)]
+
+
+def test_order_filling_while_being_cancelled_is_reported_filled():
+    clock = FakeClock()
+    tracker = OrderTracker(clock=clock)
+    orders = FakeOrders()
+    track(tracker, timeout=5.0)
+
+    clock.advance(5)
+    tracker.poll(orders.get_order, orders.cancel_order)
+
+    orders.status = "FILLED"
+    clock.advance(1)
+    events = tracker.poll(orders.get_order, orders.cancel_order)
+
+    assert [event.status for event in events] == ["FILLED"]
+    assert tracker.pending(1) == []
@@ -0,0 +1,98 @@
+import datetime as dt
+import threading
+
+from basetypes.Mediator.strategyScheduler import StrategyScheduler
+from basetypes.Strategy.abstractStrategy import Strategy
+from basetypes.Strategy.spreadsbydeltastrategy import SpreadsByDeltaStrategy
+
+START = dt.datetime(2022, 1, 3, 15, 0, tzinfo=dt.timezone.utc)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self) -> dt.datetime:
+        return self.now
+
+
+class WakingStrategy(Strategy):
+    def __init__(self, name: str, wakeup=None):
+        self.strategy_name = name
+        self.wakeup = wakeup
+
+    def process_strategy(self):
+        pass
+
+    def next_wakeup(self, now):
+        return self.wakeup
+
+
+def test_pop_due_returns_only_passed_deadlines_in_order():
+    clock = FakeClock()
+    scheduler = StrategyScheduler(clock=clock)
+    early = WakingStrategy("early")
+    late = WakingStrategy("late")
+    scheduler.schedule(late, START + dt.timedelta(seconds=30))
+    scheduler.schedule(early, START + dt.timedelta(seconds=10))
+
+    assert scheduler.pop_due() == []
+    assert scheduler.next_deadline() == START + dt.timedelta(seconds=10)
+
+    clock.now = START + dt.timedelta(seconds=45)
+
+    assert scheduler.pop_due() == [early, late]
+    assert scheduler.next_deadline() is None
+
+
+def test_reschedule_replaces_the_previous_deadline():
+    clock = FakeClock()
+    scheduler = StrategyScheduler(clock=clock)
+    strategy = WakingStrategy("strategy")
+    scheduler.schedule(strategy, START)
+
+    strategy.wakeup = START + dt.timedelta(hours=1)
+    scheduler.reschedule(strategy)
+
+    assert scheduler.pop_due() == []
+    assert scheduler.next_deadline() == START + dt.timedelta(hours=1)
+
+
+def test_reschedule_falls_back_to_default_and_respects_minimum():
+    clock = FakeClock()
+    scheduler = StrategyScheduler(60.0, 5.0, clock=clock)
+
+    assert scheduler.reschedule(WakingStrategy("default")) == START + dt.timedelta(
+        seconds=60
+    )
+    assert scheduler.reschedule(
+        WakingStrategy("eager", START - dt.timedelta(seconds=1))
+    ) == START + dt.timedelta(seconds=5)
+
+
+def test_wake_interrupts_wait():
+    scheduler = StrategyScheduler()
+    scheduler.schedule(WakingStrategy("far"), START + dt.timedelta(days=365))
+
+    threading.Timer(0.05, scheduler.wake).start()
+    finished = threading.Event()
+    waiter = threading.Thread(target=lambda: (scheduler.wait(), finished.set()))
+    waiter.start()
+
+    assert finished.wait(2)
+
+
+def test_spreads_run_quickly_in_the_closing_window():
+    strategy = SpreadsByDeltaStrategy()
+    strategy.sleepuntil = START - dt.timedelta(days=1)
+    strategy.marketclose = START + dt.timedelta(hours=1)
+
+    # Before the window, wake exactly when it opens
+    assert strategy.next_wakeup(START) == START + dt.timedelta(minutes=50)
+
+    # In the window, poll every few seconds
+    inwindow = START + dt.timedelta(minutes=55)
+    assert strategy.next_wakeup(inwindow) == inwindow + dt.timedelta(seconds=10)
+
+    # After the close, fall back to the bot's cadence
+    assert strategy.next_wakeup(START + dt.timedelta(hours=2)) is None
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from basetypes.Mediator.ttlCache import TtlCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_hits_within_ttl_and_reloads_after():
+    clock = FakeClock()
+    cache = TtlCache(10.0, clock=clock)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return len(loads)
+
+    assert cache.get_or_load("SPX", loader) == 1
+    clock.now = 5.0
+    assert cache.get_or_load("SPX", loader) == 1
+    clock.now = 11.0
+    assert cache.get_or_load("SPX", loader) == 2
+
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 2
+
+
+def test_failed_loads_are_not_cached():
+    cache = TtlCache(10.0)
+
+    assert cache.get_or_load("SPX", lambda: None) is None
+    assert cache.get_or_load("SPX", lambda: "chain") == "chain"
+
+
+def test_invalidate_by_predicate():
+    cache = TtlCache(10.0)
+    cache.get_or_load(("a", 1), lambda: 1)
+    cache.get_or_load(("b", 1), lambda: 2)
+
+    cache.invalidate(lambda key: key[0] == "a")
+
+    assert cache.get_or_load(("a", 1), lambda: 3) == 3
+    assert cache.get_or_load(("b", 1), lambda: 4) == 2
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    cache = TtlCache(10.0)
+    loads = []
+    results = []
+
+    def loader():
+        loads.append(1)
+        time.sleep(0.1)
+        return "chain"
+
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_load("SPX", loader))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert results == ["chain"] * 5
+    assert cache.stats.coalesced == 4
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from basetypes.Strategy import helpers
+
+UNDERLYING = 4500.0
+RATE = 0.02
+DTE = 3.0
+
+
+def build_chain(count: int = 50):
+    strikes = np.linspace(4000.0, 5000.0, count)
+    vols = 0.15 + 0.5 * ((strikes - UNDERLYING) / UNDERLYING) ** 2
+    is_put = strikes <= UNDERLYING
+    prices = helpers.black_price(UNDERLYING, strikes, RATE, DTE / 365, is_put, vols)
+    flags = np.where(is_put, "PUT", "CALL")
+
+    return strikes, vols, prices, flags
+
+
+def test_vectorized_iv_recovers_volatility():
+    strikes, vols, prices, flags = build_chain()
+    priced = prices > 0.05
+
+    iv = helpers.calculate_iv_vectorized(prices, UNDERLYING, strikes, RATE, DTE, flags)
+
+    assert np.allclose(iv[priced], vols[priced], atol=1e-8)
+
+
+def test_vectorized_delta_matches_scalar_path():
+    strikes, _, prices, flags = build_chain()
+
+    deltas = helpers.calculate_delta_vectorized(
+        UNDERLYING, strikes, RATE, DTE, flags, None, prices
+    )
+
+    for index in np.flatnonzero(prices > 0.05):
+        scalar = helpers.calculate_delta(
+            UNDERLYING,
+            strikes[index],
+            RATE,
+            DTE,
+            flags[index],
+            None,
+            prices[index],
+        )
+        assert deltas[index] == pytest.approx(scalar, abs=1e-8)
+
+
+def test_prices_without_a_solution_are_nan():
+    iv = helpers.calculate_iv_vectorized(
+        np.array([0.0, 6000.0]),
+        UNDERLYING,
+        np.array([4000.0, 5000.0]),
+        RATE,
+        DTE,
+        "PUT",
+    )
+
+    assert np.isnan(iv).all()
+
+
+def test_zero_days_to_expiration_is_rejected():
+    with pytest.raises(ValueError):
+        helpers.calculate_iv_vectorized(
+            np.array([1.0]), UNDERLYING, np.array([4000.0]), RATE, 0.0, "PUT"
+        )
@@ -0,0 +1,91 @@
+import datetime as dt
+
+from basetypes.Clock.simulatedClock import SimulatedClock
+from basetypes.Strategy.riskFreeRate import (
+    RiskFreeRateProvider,
+    local_file_source,
+    parse_yield_curve,
+)
+
+CURVE = """Date,1 Mo,2 Mo,3 Mo,4 Mo,6 Mo
+01/31/2022,0.03,0.12,0.22,,0.39
+01/28/2022,0.04,0.11,0.20,,0.35
+"""
+
+
+class CountingSource:
+    def __init__(self, rate=0.02):
+        self.rate = rate
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if isinstance(self.rate, Exception):
+            raise self.rate
+        return self.rate
+
+
+def test_yield_curve_reads_latest_three_month_rate_as_decimal():
+    assert abs(parse_yield_curve(CURVE) - 0.0022) < 1e-12
+    assert parse_yield_curve("Date,1 Mo,2 Mo,3 Mo\n") is None
+
+
+def test_rate_is_fetched_once_a_day(tmp_path):
+    source = CountingSource()
+    provider = RiskFreeRateProvider(str(tmp_path / "rate.json"), source)
+
+    assert provider.get_rate() == 0.02
+    assert provider.get_rate() == 0.02
+    assert source.calls == 1
+
+
+def test_persisted_rate_survives_a_restart(tmp_path):
+    filename = str(tmp_path / "rate.json")
+    RiskFreeRateProvider(filename, CountingSource()).get_rate()
+
+    source = CountingSource(0.05)
+    assert RiskFreeRateProvider(filename, source).get_rate() == 0.02
+    assert source.calls == 0
+
+
+def test_failed_fetch_falls_back_to_last_known_rate(tmp_path):
+    provider = RiskFreeRateProvider(str(tmp_path / "rate.json"), CountingSource())
+    provider.get_rate()
+
+    # Yesterday's rate, and the source is down
+    provider.fetched_on = None
+    provider.source = CountingSource(ConnectionError("down"))
+
+    assert provider.get_rate() == 0.02
+
+    # With nothing known, the default is used
+    empty = RiskFreeRateProvider(
+        str(tmp_path / "empty.json"), CountingSource(None), default_rate=0.01
+    )
+    assert empty.get_rate() == 0.01
+
+
+def test_local_file_source_reads_plain_rates_and_curves(tmp_path):
+    plain = tmp_path / "rate.txt"
+    plain.write_text("0.031\n")
+    curve = tmp_path / "curve.csv"
+    curve.write_text(CURVE)
+
+    assert local_file_source(str(plain))() == 0.031
+    assert abs(local_file_source(str(curve))() - 0.0022) < 1e-12
+
+
+def test_rate_is_refreshed_on_the_clocks_next_day(tmp_path):
+    clock = SimulatedClock(dt.datetime(2022, 1, 10, 15, tzinfo=dt.timezone.utc))
+    source = CountingSource()
+    provider = RiskFreeRateProvider(str(tmp_path / "rate.json"), source, clock=clock)
+
+    provider.get_rate()
+    clock.advance(3600)
+    provider.get_rate()
+    assert source.calls == 1
+
+    clock.advance(24 * 3600)
+    provider.get_rate()
+    assert source.calls == 2
+    assert provider.fetched_on == dt.date(2022, 1, 11)
@@ -0,0 +1,61 @@
+import numpy as np
+from basetypes.Mediator.columnarChain import ColumnarExpirationDate
+from basetypes.Strategy.spreadsbydeltastrategy import SpreadsByDeltaStrategy
+from basetypes.Strategy.strikeIndex import StrikeIndex
+
+
+def build_expiration(strikes, deltas) -> ColumnarExpirationDate:
+    contracts = [
+        {
+            "strikePrice": strike,
+            "bid": 1.0,
+            "ask": 1.1,
+            "delta": delta,
+            "symbol": "SPX{}".format(strike),
+        }
+        for strike, delta in zip(strikes, deltas)
+    ]
+    return ColumnarExpirationDate.from_contracts(None, 3, contracts)
+
+
+def test_nearest_strike_prefers_the_lower_strike_on_ties():
+    index = StrikeIndex(np.array([4400.0, 4410.0, 4420.0]), np.zeros(3))
+
+    assert index.nearest_strike(4404.0) == 0
+    assert index.nearest_strike(4405.0) == 0
+    assert index.nearest_strike(4406.0) == 1
+    assert index.nearest_strike(3000.0) == 0
+    assert index.nearest_strike(5000.0) == 2
+
+
+def test_delta_queries_match_a_linear_scan():
+    rng = np.random.default_rng(7)
+    strikes = np.arange(500, dtype=float) * 5 + 3000
+    deltas = -rng.uniform(0, 0.5, 500)
+    deltas[::50] = np.nan
+    index = StrikeIndex(strikes, deltas)
+
+    band = sorted(index.delta_band(-0.03, -0.07))
+    expected = [i for i, delta in enumerate(deltas) if 0.03 <= abs(delta) <= 0.07]
+    assert band == expected
+
+    nearest = index.nearest_delta_at_most(-0.10)
+    candidates = [i for i, delta in enumerate(deltas) if abs(delta) <= 0.10]
+    assert nearest == max(candidates, key=lambda i: abs(deltas[i]))
+
+    assert index.nearest_delta_at_most(0.0) is None
+
+
+def test_spread_strikes_use_the_index():
+    strategy = SpreadsByDeltaStrategy(targetdelta=-0.10, width=20.0)
+    expiration = build_expiration(
+        [4400.0, 4410.0, 4420.0, 4430.0, 4440.0],
+        [-0.04, -0.06, -0.09, -0.12, "NaN"],
+    )
+    index = StrikeIndex.from_expiration(expiration)
+
+    short = strategy.get_short_strike(expiration, index)
+    long = strategy.get_long_strike(expiration, index, short.strike)
+
+    assert short.strike == 4420.0
+    assert long.strike == 4400.0